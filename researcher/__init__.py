@@ -2,7 +2,15 @@
 import os
 from pathlib import Path
 
-from .core import KnowledgeBase
+
+def __getattr__(name):
+    # KnowledgeBase is imported on first use so `import researcher.cli`
+    # (and commands like `kb init`) don't load core and its dependencies
+    if name == "KnowledgeBase":
+        from .core import KnowledgeBase
+        return KnowledgeBase
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 DEFAULT_DB_DIR = Path.home() / ".researcher"
 DEFAULT_DB_PATH = DEFAULT_DB_DIR / "kb.db"
@@ -10,10 +18,13 @@ DEFAULT_DB_PATH = DEFAULT_DB_DIR / "kb.db"
 
 def get_db_path():
     """Resolve DB path: KB_DB env var > local knowledge-base/kb.db > ~/.researcher/kb.db"""
+    # Not cached: `kb init` can create knowledge-base/ mid-process, and the
+    # exists() guards already skip the mkdir syscalls on repeat calls
     # Explicit env var
     if env := os.environ.get("KB_DB"):
         p = Path(env)
-        p.parent.mkdir(parents=True, exist_ok=True)
+        if not p.parent.exists():
+            p.parent.mkdir(parents=True, exist_ok=True)
         return str(p)
 
     # Local project DB (if knowledge-base/ exists in cwd)
@@ -22,7 +33,8 @@ def get_db_path():
         return str(local)
 
     # Global default
-    DEFAULT_DB_DIR.mkdir(parents=True, exist_ok=True)
+    if not DEFAULT_DB_DIR.exists():
+        DEFAULT_DB_DIR.mkdir(parents=True, exist_ok=True)
     return str(DEFAULT_DB_PATH)
 
 
@@ -0,0 +1,39 @@
+"""
+Numba-compiled MCDA kernels. Importing this module requires numba;
+kb_decisions loads it lazily and falls back to numpy when it is missing.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def sweep(S, w, totals, perturbation):
+    """Score every sensitivity scenario: criterion i nudged down (row 2i)
+    and up (row 2i + 1), clipped to [0, 1] and renormalized by totals[row],
+    the scenario's sum of all stored weights as computed by the caller.
+    Returns a (2 * n_criteria, n_alternatives) array of weighted scores.
+
+    Totals match the scalar path exactly and sums run in criteria order
+    without fastmath, but the weighted sums are not guaranteed to be
+    bit-identical to Python's sum() (which is compensated from 3.12), so
+    a near-tie can occasionally round to a different 4th decimal."""
+    n_alts, k = S.shape
+    R = np.empty((2 * k, n_alts))
+    test_w = np.empty(k)
+    for i in range(k):
+        for s in range(2):
+            direction = perturbation if s else -perturbation
+            nudged = min(1.0, max(0.0, w[i] + direction))
+            total = totals[2 * i + s]
+            if total <= 0:
+                total = 1.0
+            for c in range(k):
+                test_w[c] = w[c] / total
+            test_w[i] = nudged / total
+            for a in range(n_alts):
+                acc = 0.0
+                for c in range(k):
+                    acc += S[a, c] * test_w[c]
+                R[2 * i + s, a] = acc
+    return R
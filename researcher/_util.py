@@ -0,0 +1,60 @@
+"""
+Shared low-level helpers for the knowledge base modules.
+JSON encode/decode uses orjson when installed, stdlib json otherwise.
+Both encoders emit compact JSON (no spaces after separators).
+"""
+
+import json
+
+try:
+    import orjson
+
+    def loads(s):
+        """Parse a JSON string (orjson fast path, stdlib for NaN/Infinity)."""
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return json.loads(s)
+
+    def dumps(obj) -> str:
+        """Serialize to a JSON string (orjson fast path, stdlib for
+        non-string keys, big ints and other types orjson rejects)."""
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            return json.dumps(obj, separators=(',', ':'))
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+    def dumps(obj) -> str:
+        """Serialize to a compact JSON string."""
+        return json.dumps(obj, separators=(',', ':'))
+
+
+def dump_meta(meta) -> str:
+    """Encode a metadata dict; None and {} (the common case) skip the encoder."""
+    return dumps(meta) if meta else '{}'
+
+
+def load_meta(raw) -> dict:
+    """Decode a metadata column. Most rows hold the '{}' default (or NULL),
+    which skips the parser entirely. Always returns a fresh dict, since
+    callers mutate what they get back."""
+    if not raw or raw == '{}':
+        return {}
+    return loads(raw)
+
+
+def row_dict(row) -> dict:
+    """Convert one sqlite3.Row to a dict. zip() reads the values in
+    position order; row[k] would look each column up by name."""
+    return dict(zip(row.keys(), row))
+
+
+def rows_to_dicts(rows) -> list:
+    """Convert fetched sqlite3.Rows to dicts, reading column names once."""
+    if not rows:
+        return []
+    cols = rows[0].keys()
+    return [dict(zip(cols, r)) for r in rows]
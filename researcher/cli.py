@@ -3,368 +3,854 @@
 Knowledge Base CLI — consolidated interface for research agents.
 """
 
+import base64
+import os
 import sys
 import json
-from researcher import KnowledgeBase, get_db_path
 
-def main():
-    if len(sys.argv) < 2:
-        print_usage()
+from researcher._util import loads
+
+try:
+    import orjson
+
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _dumpb(obj, indent=False):
+        """Serialize command output to UTF-8 bytes — orjson, stdlib json
+        for what it rejects."""
+        option = _ORJSON_OPTS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTS
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except TypeError:
+            return json.dumps(obj, indent=2 if indent else None, default=str).encode()
+except ImportError:
+    def _dumpb(obj, indent=False):
+        """Serialize command output to UTF-8 bytes (stdlib json)."""
+        return json.dumps(obj, indent=2 if indent else None, default=str).encode()
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# KB_FORMAT=msgpack makes structured output MessagePack bytes for piping
+# between agents; JSON stays the default for humans
+_FORMAT = os.environ.get("KB_FORMAT", "json").lower()
+# KB_VEC_INT8=1 creates new sqlite-vec indexes with int8 (4x smaller) vectors
+_VEC_INT8 = os.environ.get("KB_VEC_INT8") == "1"
+
+
+def _stdout_write():
+    """Byte writer for stdout. Writes go straight to the binary buffer
+    (pending text flushed first), skipping print()'s text encoding; a
+    text-only stdout (an in-process StringIO capture) gets the bytes
+    decoded."""
+    buf = getattr(sys.stdout, "buffer", None)
+    if buf is None:
+        return lambda b: sys.stdout.write(b.decode())
+    sys.stdout.flush()
+    return buf.write
+
+
+def _emit(obj, indent=False):
+    """Write one command result to stdout in the selected output format.
+    msgpack needs a binary stdout; a text-only one gets JSON instead."""
+    if _FORMAT == "msgpack" and hasattr(sys.stdout, "buffer"):
+        _stdout_write()(msgpack.packb(obj, default=str))
+    else:
+        _stdout_write()(_dumpb(obj, indent) + b"\n")
+
+
+def _emit_text(text):
+    """Write a plain-text result (markdown, dot, summaries) as UTF-8 bytes."""
+    _stdout_write()(text.encode() + b"\n")
+
+
+def _emit_rows(rows):
+    """Stream an iterable of rows as an indented JSON array, one row at a
+    time, so large listings never exist as a whole list or string.
+    The bytes match _emit(list(rows), indent=True)."""
+    if _FORMAT == "msgpack":
+        _emit(list(rows))
+        return
+    write = _stdout_write()
+    sep = b"[\n  "
+    for row in rows:
+        write(sep)
+        write(_dumpb(row, True).replace(b"\n", b"\n  "))
+        sep = b",\n  "
+    write(b"[]\n" if sep == b"[\n  " else b"\n]\n")
+
+
+class Args:
+    """Positional command arguments with typed, defaulted accessors.
+    Missing optional values short-circuit to the default; "null" is read
+    as absent by opt()."""
+
+    __slots__ = ("a",)
+
+    def __init__(self, a):
+        self.a = a
+
+    def __len__(self):
+        return len(self.a)
+
+    def __getitem__(self, i):
+        return self.a[i]
+
+    def s(self, i, d=None):
+        return self.a[i] if i < len(self.a) else d
+
+    def opt(self, i):
+        v = self.s(i)
+        return None if v == "null" else v
+
+    def i(self, i, d=None):
+        v = self.s(i)
+        return int(v) if v is not None else d
+
+    def f(self, i, d=None):
+        v = self.s(i)
+        return float(v) if v is not None else d
+
+    def j(self, i, d=None):
+        v = self.s(i)
+        if not v:
+            return d
+        try:
+            return loads(v)
+        except ValueError as e:
+            print(f"Invalid JSON in argument {i + 1} ({v[:60]!r}): {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+def _batch_items(args):
+    """JSON array of item dicts for the *-batch commands, from args[0].
+    main() swaps an omitted or "-" argument for the client's stdin before
+    dispatch; handlers never read stdin, since under `kb serve` that would
+    be the daemon's."""
+    if args.s(0) == "-":
+        print("Batch input from stdin must be piped to the kb command itself", file=sys.stderr)
         sys.exit(1)
-    
-    cmd = sys.argv[1]
-    args = sys.argv[2:]
+    return args.j(0, [])
 
-    # ── Init (no DB needed) ──────────────────────────────────────
-    if cmd == "init":
-        _init_project()
+
+# ── Entity CRUD ──────────────────────────────────────────────
+
+def _cmd_add(kb, args):
+    title = args[0]
+    eid = kb.add_entity(title, args.s(1, ""), args.j(2, {}))
+    _emit({"id": eid, "title": title})
+
+
+def _cmd_get(kb, args):
+    _emit(kb.get_entity(args[0]), indent=True)
+
+
+def _cmd_update(kb, args):
+    eid = args[0]
+    kb.update_entity(eid, args.s(1), args.s(2), args.j(3))
+    _emit({"ok": True, "id": eid})
+
+
+def _cmd_list(kb, args):
+    _emit_rows(kb.iter_entities(args.i(0)))
+
+
+def _cmd_search(kb, args):
+    query = args[0]
+    if args.s(1) == '--all':
+        _emit(kb.find_prior_research(query), indent=True)
+    else:
+        _emit(kb.search_entities(query), indent=True)
+
+
+def _cmd_stats(kb, args):
+    _emit(kb.get_stats(), indent=True)
+
+
+def _cmd_export(kb, args):
+    md = kb.export_entity_markdown(args[0])
+    _emit_text(md if md else f"Not found: {args[0]}")
+
+
+def _cmd_graph(kb, args):
+    _emit_text(kb.visualize_graph(args.s(0, "dot")))
+
+
+# ── Links ────────────────────────────────────────────────────
+
+def _cmd_link(kb, args):
+    lt = args.s(2, "related")
+    lid = kb.add_link(args[0], args[1], lt)
+    _emit({"link_id": lid, "from": args[0], "to": args[1], "type": lt})
+
+
+def _cmd_links(kb, args):
+    fn = kb.get_links_to_full if args.s(1) == "to" else kb.get_links_from_full
+    _emit(fn(args[0]), indent=True)
+
+
+# ── Tasks ────────────────────────────────────────────────────
+
+def _cmd_add_task(kb, args):
+    title = args[0]
+    tid = kb.add_task(title, args.s(1, ""), args.opt(2), args.j(3, {}))
+    _emit({"task_id": tid, "title": title})
+
+
+def _cmd_tasks(kb, args):
+    _emit(kb.get_tasks(args.opt(0), args.s(1)), indent=True)
+
+
+def _cmd_add_tasks_batch(kb, args):
+    _emit({"ids": kb.add_tasks(_batch_items(args))})
+
+
+def _cmd_update_task(kb, args):
+    tid = int(args[0])
+    status = args[1]
+    kb.update_task_status(tid, status)
+    _emit({"task_id": tid, "status": status})
+
+
+# ── Sources ──────────────────────────────────────────────────
+
+def _cmd_add_source(kb, args):
+    url = args[0]
+    sid, cred = kb.add_source(url, args.s(1, ""), args.s(2, ""), args.s(3, "web"), args.j(4),
+                              details=True)
+    _emit({"source_id": sid, "url": url, "credibility": cred})
+
+
+def _cmd_add_sources_batch(kb, args):
+    _emit({"ids": kb.add_sources(_batch_items(args))})
+
+
+def _cmd_sources(kb, args):
+    _emit_rows(kb.iter_sources(args.opt(0), args.f(1, 0.0)))
+
+
+# ── Claims ───────────────────────────────────────────────────
+
+def _cmd_add_claim(kb, args):
+    cid, grade, confidence = kb.add_claim(args[0], args.opt(1), args.j(2), args.j(3), details=True)
+    _emit({"claim_id": cid, "grade": grade, "confidence": confidence})
+
+
+def _cmd_add_claims_batch(kb, args):
+    _emit({"ids": kb.add_claims(_batch_items(args))})
+
+
+def _cmd_add_claim_source(kb, args):
+    cid, sid = int(args[0]), int(args[1])
+    ok, grade = kb.add_claim_source(cid, sid, args.s(2, "supports"), details=True)
+    _emit({"ok": ok, "claim_id": cid, "grade": grade})
+
+
+def _cmd_claim(kb, args):
+    _emit(kb.get_claim(int(args[0])), indent=True)
+
+
+def _cmd_claims(kb, args):
+    _emit_rows(kb.iter_claims(args.opt(0), args.opt(1)))
+
+
+def _cmd_decompose(kb, args):
+    cid = int(args[0])
+    atom_ids = kb.decompose_claim(cid, args.s(1, 'auto'))
+    if atom_ids:
+        atoms = kb.iter_atomic_claims(cid, parse_metadata=False)
+        _emit({'parent_id': cid, 'atoms': [
+            {'id': a['id'], 'text': a['claim_text'], 'grade': a['evidence_grade']} for a in atoms
+        ]}, indent=True)
+    else:
+        _emit({'parent_id': cid, 'result': 'singleton'})
+
+
+def _cmd_quote(kb, args):
+    _emit(kb.extract_quotes(int(args[0])), indent=True)
+
+
+def _cmd_claim_from_quote(kb, args):
+    _emit(kb.claim_from_quote(args[0], int(args[1]), args.s(2), args.s(3)), indent=True)
+
+
+# ── Review (unified: reflect + critique + gaps + quantities) ─
+
+def _cmd_review(kb, args):
+    _emit(kb.review(args[0], args.s(1, 'full')), indent=True)
+
+
+# ── QA (unified: SC grading + SAFE verification) ────────────
+
+def _cmd_qa(kb, args):
+    _emit(kb.qa(args[0], n_samples=args.i(1, 5)), indent=True)
+
+
+def _cmd_verify(kb, args):
+    _emit(kb.verify_claim(int(args[0])), indent=True)
+
+
+def _cmd_grade_sc(kb, args):
+    _emit(kb.grade_claim_sc(int(args[0]), args.i(1, 5)), indent=True)
+
+
+# ── Report (unified: report + synthesize + outline) ──────────
+
+def _cmd_report(kb, args):
+    eid = args[0]
+    fmt = args.s(1, 'full')
+    if fmt == 'outline':
+        result = kb.generate_outline(eid)
+        if result:
+            _emit(result, indent=True)
+        else:
+            _emit_text("Not found")
+    elif fmt == 'synthesize':
+        _emit(kb.synthesize_entity(eid, args.s(2, 'technical')), indent=True)
+    else:
+        report = kb.generate_report(eid, include_children=True)
+        _emit_text(report if report else "Not found")
+
+
+# ── Evidence analysis ────────────────────────────────────────
+
+def _cmd_contradictions(kb, args):
+    _emit(kb.check_contradictions(args.s(0)), indent=True)
+
+
+def _cmd_corroboration(kb, args):
+    _emit(kb.check_corroboration(args.s(0)), indent=True)
+
+
+def _cmd_decay(kb, args):
+    affected = kb.apply_confidence_decay(args.i(0, 30), args.f(1, 0.02))
+    _emit({"affected": len(affected)}, indent=True)
+
+
+# ── Evaluation loop ──────────────────────────────────────────
+
+def _cmd_add_eval(kb, args):
+    pid = args[0]
+    eid = kb.add_evaluation(pid, args.i(1, 5), args.j(2))
+    _emit({"eval_id": eid, "parent_id": pid})
+
+
+def _cmd_eval(kb, args):
+    _emit(kb.get_evaluation(int(args[0])), indent=True)
+
+
+def _cmd_evals(kb, args):
+    _emit(kb.get_evaluations_for(args[0]), indent=True)
+
+
+def _cmd_update_eval(kb, args):
+    eid = int(args[0]); u = args.j(1, {})
+    kb.update_evaluation(eid, confidence=u.get('confidence'), gaps=u.get('gaps'),
+        contradictions=u.get('contradictions'), decision=u.get('decision'),
+        rationale=u.get('rationale'), status=u.get('status'), iteration=u.get('iteration'))
+    _emit({"ok": True, "eval_id": eid})
+
+
+def _cmd_converged(kb, args):
+    _emit(kb.check_convergence(int(args[0])), indent=True)
+
+
+# ── Traces ───────────────────────────────────────────────────
+
+def _cmd_trace(kb, args):
+    eid = args[0]
+    tid = kb.add_trace(eid, args[1], args.s(2, ""), args.s(3, ""), args.s(4, ""), args.s(5, ""))
+    _emit({"trace_id": tid, "entity_id": eid})
+
+
+def _cmd_trace_batch(kb, args):
+    _emit({"ids": kb.add_traces(_batch_items(args))})
+
+
+def _cmd_traces(kb, args):
+    eid = args[0]
+    if args.s(1) == '--summary':
+        _emit_text(kb.get_trace_summary(eid))
+    else:
+        _emit_rows(kb.iter_traces(eid))
+
+
+# ── Perspectives ─────────────────────────────────────────────
+
+def _cmd_perspectives(kb, args):
+    _emit(kb.discover_perspectives(args[0]), indent=True)
+
+
+# ── Router ───────────────────────────────────────────────────
+
+def _cmd_route(kb, args):
+    _emit(kb.route_task(args[0], args.j(1)), indent=True)
+
+
+# ── Spawning ─────────────────────────────────────────────────
+
+def _cmd_spawn(kb, args):
+    _emit(kb.record_spawn(args[0], args[1], args.s(2, ""), args.s(3, "researcher"),
+                          args.j(4, {})), indent=True)
+
+
+def _cmd_budget(kb, args):
+    _emit(kb.check_spawn_budget(args[0], args.i(1, 8), args.i(2, 400)), indent=True)
+
+
+def _cmd_context(kb, args):
+    _emit(kb.get_spawn_context(args[0]), indent=True)
+
+
+# ── Monitor ──────────────────────────────────────────────────
+
+def _cmd_monitor(kb, args):
+    _emit(kb.monitor_tree(args[0]), indent=True)
+
+
+# ── Domain Expert ────────────────────────────────────────────
+
+def _subcommand(table, group, args, default=None):
+    """Dispatch args[0] through a subcommand table (one dict lookup)."""
+    subcmd = args.s(0, default)
+    handler = table.get(subcmd)
+    if handler is None:
+        print(f"Unknown {group} subcommand: {subcmd}", file=sys.stderr)
         return
+    return handler
+
+
+def _expert_match(kb, args):
+    _emit(kb.match_domain_expert(args[1]), indent=True)
+
+
+def _expert_review(kb, args):
+    _emit(kb.domain_review(args[1], args[2]), indent=True)
+
+
+def _expert_list(kb, args):
+    _emit_text("\n".join(f"  {d:20s} | {p['role']}"
+                          for d, p in kb.DOMAIN_PROFILES.items()))
+
+
+_EXPERT_SUBCMDS = {"match": _expert_match, "review": _expert_review, "list": _expert_list}
+
+
+def _cmd_expert(kb, args):
+    handler = _subcommand(_EXPERT_SUBCMDS, "expert", args, "list")
+    if handler:
+        handler(kb, args)
+
+
+# ── Decisions (MCDA) ─────────────────────────────────────────
+
+def _decide_add(kb, args):
+    did = kb.add_decision(args[1], args.j(2), args.j(3),
+                          args.opt(4), args.j(5))
+    _emit({"decision_id": did})
+
+
+def _decide_score(kb, args):
+    _emit(kb.score_alternatives(int(args[1]), args.j(2)), indent=True)
+
+
+def _decide_sensitivity(kb, args):
+    _emit(kb.sensitivity_analysis(int(args[1]), args.f(2, 0.1)), indent=True)
+
+
+def _decide_get(kb, args):
+    _emit(kb.get_decision(int(args[1])), indent=True)
+
+
+_DECIDE_SUBCMDS = {"add": _decide_add, "score": _decide_score,
+                   "sensitivity": _decide_sensitivity, "get": _decide_get}
+
+
+def _cmd_decide(kb, args):
+    handler = _subcommand(_DECIDE_SUBCMDS, "decide", args)
+    if handler:
+        handler(kb, args)
+
+
+# ── Embed & Search ───────────────────────────────────────────
+
+def _embed_all(kb, args):
+    _emit(kb.embed_all(args.i(1, 64), args.i(2, 1)), indent=True)
 
-    kb = KnowledgeBase(get_db_path())
-    
-    try:
-        # ── Entity CRUD ──────────────────────────────────────────────
-
-        if cmd == "add":
-            title = args[0]
-            content = args[1] if len(args) > 1 else ""
-            metadata = json.loads(args[2]) if len(args) > 2 else {}
-            eid = kb.add_entity(title, content, metadata)
-            print(json.dumps({"id": eid, "title": title}))
-
-        elif cmd == "get":
-            print(json.dumps(kb.get_entity(args[0]), indent=2))
-
-        elif cmd == "update":
-            eid = args[0]
-            title = args[1] if len(args) > 1 else None
-            content = args[2] if len(args) > 2 else None
-            metadata = json.loads(args[3]) if len(args) > 3 else None
-            kb.update_entity(eid, title, content, metadata)
-            print(json.dumps({"ok": True, "id": eid}))
-
-        elif cmd == "list":
-            limit = int(args[0]) if args else None
-            print(json.dumps(kb.list_entities(limit), indent=2))
-
-        elif cmd == "search":
-            query = args[0]
-            if len(args) > 1 and args[1] == '--all':
-                print(json.dumps(kb.find_prior_research(query), indent=2))
-            else:
-                print(json.dumps(kb.search_entities(query), indent=2))
-
-        elif cmd == "stats":
-            print(json.dumps(kb.get_stats(), indent=2))
-
-        elif cmd == "export":
-            md = kb.export_entity_markdown(args[0])
-            print(md if md else f"Not found: {args[0]}")
-
-        elif cmd == "graph":
-            fmt = args[0] if args else "dot"
-            print(kb.visualize_graph(fmt))
-
-        # ── Links ────────────────────────────────────────────────────
-
-        elif cmd == "link":
-            lt = args[2] if len(args) > 2 else "related"
-            lid = kb.add_link(args[0], args[1], lt)
-            print(json.dumps({"link_id": lid, "from": args[0], "to": args[1], "type": lt}))
-
-        elif cmd == "links":
-            direction = args[1] if len(args) > 1 else "from"
-            fn = kb.get_links_to if direction == "to" else kb.get_links_from
-            print(json.dumps(fn(args[0]), indent=2))
-
-        # ── Tasks ────────────────────────────────────────────────────
-
-        elif cmd == "add-task":
-            title = args[0]
-            desc = args[1] if len(args) > 1 else ""
-            eid = args[2] if len(args) > 2 and args[2] != "null" else None
-            meta = json.loads(args[3]) if len(args) > 3 else {}
-            tid = kb.add_task(title, desc, eid, meta)
-            print(json.dumps({"task_id": tid, "title": title}))
-
-        elif cmd == "tasks":
-            status = args[0] if args and args[0] != "null" else None
-            eid = args[1] if len(args) > 1 else None
-            print(json.dumps(kb.get_tasks(status, eid), indent=2))
-
-        elif cmd == "update-task":
-            tid = int(args[0])
-            status = args[1]
-            kb.update_task_status(tid, status)
-            print(json.dumps({"task_id": tid, "status": status}))
-
-        # ── Sources ──────────────────────────────────────────────────
-
-        elif cmd == "add-source":
-            url = args[0]
-            title = args[1] if len(args) > 1 else ""
-            snippet = args[2] if len(args) > 2 else ""
-            stype = args[3] if len(args) > 3 else "web"
-            meta = json.loads(args[4]) if len(args) > 4 else None
-            sid = kb.add_source(url, title, snippet, stype, meta)
-            cred = kb.get_source(sid)['credibility']
-            print(json.dumps({"source_id": sid, "url": url, "credibility": cred}))
-
-        elif cmd == "sources":
-            eid = args[0] if args and args[0] != "null" else None
-            mc = float(args[1]) if len(args) > 1 else 0.0
-            print(json.dumps(kb.list_sources(eid, mc), indent=2))
-
-        # ── Claims ───────────────────────────────────────────────────
-
-        elif cmd == "add-claim":
-            text = args[0]
-            eid = args[1] if len(args) > 1 and args[1] != "null" else None
-            sids = json.loads(args[2]) if len(args) > 2 else None
-            meta = json.loads(args[3]) if len(args) > 3 else None
-            cid = kb.add_claim(text, eid, sids, meta)
-            c = kb.get_claim(cid)
-            print(json.dumps({"claim_id": cid, "grade": c['evidence_grade'], "confidence": c['confidence']}))
-
-        elif cmd == "add-claim-source":
-            cid, sid = int(args[0]), int(args[1])
-            rel = args[2] if len(args) > 2 else "supports"
-            ok = kb.add_claim_source(cid, sid, rel)
-            c = kb.get_claim(cid)
-            print(json.dumps({"ok": ok, "claim_id": cid, "grade": c['evidence_grade']}))
-
-        elif cmd == "claim":
-            print(json.dumps(kb.get_claim(int(args[0])), indent=2))
-
-        elif cmd == "claims":
-            eid = args[0] if args and args[0] != "null" else None
-            grade = args[1] if len(args) > 1 and args[1] != "null" else None
-            print(json.dumps(kb.list_claims(eid, grade), indent=2))
-
-        elif cmd == "decompose":
-            cid = int(args[0])
-            method = args[1] if len(args) > 1 else 'auto'
-            atom_ids = kb.decompose_claim(cid, method)
-            if atom_ids:
-                atoms = kb.get_atomic_claims(cid)
-                print(json.dumps({'parent_id': cid, 'atoms': [
-                    {'id': a['id'], 'text': a['claim_text'], 'grade': a['evidence_grade']} for a in atoms
-                ]}, indent=2))
-            else:
-                print(json.dumps({'parent_id': cid, 'result': 'singleton'}))
-
-        elif cmd == "quote":
-            print(json.dumps(kb.extract_quotes(int(args[0])), indent=2, default=str))
-
-        elif cmd == "claim-from-quote":
-            qt = args[0]; sid = int(args[1])
-            eid = args[2] if len(args) > 2 else None
-            ct = args[3] if len(args) > 3 else None
-            print(json.dumps(kb.claim_from_quote(qt, sid, eid, ct), indent=2, default=str))
-
-        # ── Review (unified: reflect + critique + gaps + quantities) ─
-
-        elif cmd == "review":
-            eid = args[0]
-            depth = args[1] if len(args) > 1 else 'full'
-            print(json.dumps(kb.review(eid, depth), indent=2, default=str))
-
-        # ── QA (unified: SC grading + SAFE verification) ────────────
-
-        elif cmd == "qa":
-            eid = args[0]
-            n = int(args[1]) if len(args) > 1 else 5
-            print(json.dumps(kb.qa(eid, n_samples=n), indent=2, default=str))
-
-        elif cmd == "verify":
-            print(json.dumps(kb.verify_claim(int(args[0])), indent=2, default=str))
-
-        elif cmd == "grade-sc":
-            cid = int(args[0])
-            n = int(args[1]) if len(args) > 1 else 5
-            print(json.dumps(kb.grade_claim_sc(cid, n), indent=2, default=str))
-
-        # ── Report (unified: report + synthesize + outline) ──────────
-
-        elif cmd == "report":
-            eid = args[0]
-            fmt = args[1] if len(args) > 1 else 'full'
-            audience = args[2] if len(args) > 2 else 'technical'
-            if fmt == 'outline':
-                result = kb.generate_outline(eid)
-                print(json.dumps(result, indent=2) if result else "Not found")
-            elif fmt == 'synthesize':
-                print(json.dumps(kb.synthesize_entity(eid, audience), indent=2, default=str))
-            else:
-                report = kb.generate_report(eid, include_children=True)
-                print(report if report else "Not found")
-
-        # ── Evidence analysis ────────────────────────────────────────
-
-        elif cmd == "contradictions":
-            eid = args[0] if args else None
-            print(json.dumps(kb.check_contradictions(eid), indent=2))
-
-        elif cmd == "corroboration":
-            eid = args[0] if args else None
-            print(json.dumps(kb.check_corroboration(eid), indent=2))
-
-        elif cmd == "decay":
-            days = int(args[0]) if args else 30
-            rate = float(args[1]) if len(args) > 1 else 0.02
-            affected = kb.apply_confidence_decay(days, rate)
-            print(json.dumps({"affected": len(affected)}, indent=2))
-
-        # ── Evaluation loop ──────────────────────────────────────────
-
-        elif cmd == "add-eval":
-            pid = args[0]
-            mi = int(args[1]) if len(args) > 1 else 5
-            crit = json.loads(args[2]) if len(args) > 2 else None
-            eid = kb.add_evaluation(pid, mi, crit)
-            print(json.dumps({"eval_id": eid, "parent_id": pid}))
-
-        elif cmd == "eval":
-            print(json.dumps(kb.get_evaluation(int(args[0])), indent=2))
-
-        elif cmd == "evals":
-            print(json.dumps(kb.get_evaluations_for(args[0]), indent=2))
-
-        elif cmd == "update-eval":
-            eid = int(args[0]); u = json.loads(args[1])
-            kb.update_evaluation(eid, confidence=u.get('confidence'), gaps=u.get('gaps'),
-                contradictions=u.get('contradictions'), decision=u.get('decision'),
-                rationale=u.get('rationale'), status=u.get('status'), iteration=u.get('iteration'))
-            print(json.dumps({"ok": True, "eval_id": eid}))
-
-        elif cmd == "converged":
-            print(json.dumps(kb.check_convergence(int(args[0])), indent=2))
-
-        # ── Traces ───────────────────────────────────────────────────
-
-        elif cmd == "trace":
-            eid = args[0]; action = args[1]
-            inp = args[2] if len(args) > 2 else ""
-            out = args[3] if len(args) > 3 else ""
-            reas = args[4] if len(args) > 4 else ""
-            tool = args[5] if len(args) > 5 else ""
-            tid = kb.add_trace(eid, action, inp, out, reas, tool)
-            print(json.dumps({"trace_id": tid, "entity_id": eid}))
-
-        elif cmd == "traces":
-            eid = args[0]
-            if len(args) > 1 and args[1] == '--summary':
-                print(kb.get_trace_summary(eid))
-            else:
-                print(json.dumps(kb.get_traces(eid), indent=2))
 
-        # ── Perspectives ─────────────────────────────────────────────
+def _embed_entity(kb, args):
+    _emit({"entity_id": args[1], "ok": kb.embed_entity(args[1])})
 
-        elif cmd == "perspectives":
-            print(json.dumps(kb.discover_perspectives(args[0]), indent=2))
 
-        # ── Router ───────────────────────────────────────────────────
+def _embed_claim(kb, args):
+    _emit({"claim_id": int(args[1]), "ok": kb.embed_claim(int(args[1]))})
 
-        elif cmd == "route":
-            desc = args[0]
-            meta = json.loads(args[1]) if len(args) > 1 else None
-            print(json.dumps(kb.route_task(desc, meta), indent=2))
 
-        # ── Spawning ─────────────────────────────────────────────────
+_EMBED_SUBCMDS = {"all": _embed_all, "entity": _embed_entity, "claim": _embed_claim}
 
-        elif cmd == "spawn":
-            pid = args[0]; title = args[1]
-            content = args[2] if len(args) > 2 else ""
-            atype = args[3] if len(args) > 3 else "researcher"
-            meta = json.loads(args[4]) if len(args) > 4 else {}
-            print(json.dumps(kb.record_spawn(pid, title, content, atype, meta), indent=2))
 
-        elif cmd == "budget":
-            eid = args[0]
-            md = int(args[1]) if len(args) > 1 else 8
-            mt = int(args[2]) if len(args) > 2 else 400
-            print(json.dumps(kb.check_spawn_budget(eid, md, mt), indent=2))
+def _cmd_embed(kb, args):
+    handler = _subcommand(_EMBED_SUBCMDS, "embed", args, "all")
+    if handler:
+        handler(kb, args)
 
-        elif cmd == "context":
-            print(json.dumps(kb.get_spawn_context(args[0]), indent=2))
 
-        # ── Monitor ──────────────────────────────────────────────────
+def _cmd_semantic(kb, args):
+    _emit(kb.semantic_search(args[0], args.i(1, 10)), indent=True)
 
-        elif cmd == "monitor":
-            print(json.dumps(kb.monitor_tree(args[0]), indent=2, default=str))
 
-        # ── Domain Expert ────────────────────────────────────────────
+def _cmd_hybrid(kb, args):
+    _emit(kb.hybrid_search(args[0], args.i(1, 10)), indent=True)
 
-        elif cmd == "expert":
-            subcmd = args[0] if args else "list"
-            if subcmd == "match":
-                print(json.dumps(kb.match_domain_expert(args[1]), indent=2, default=str))
-            elif subcmd == "review":
-                print(json.dumps(kb.domain_review(args[1], args[2]), indent=2, default=str))
-            elif subcmd == "list":
-                for d, p in kb.DOMAIN_PROFILES.items():
-                    print(f"  {d:20s} | {p['role']}")
+
+# ── Thompson Sampling ────────────────────────────────────────
+
+def _gaps_select(kb, args):
+    _emit(kb.select_next_gaps(int(args[1]), args.i(2, 3)), indent=True)
+
+
+def _gaps_register(kb, args):
+    kb.register_gap_topics(int(args[1]), args.j(2))
+    _emit({"ok": True})
+
+
+_GAPS_SUBCMDS = {"select": _gaps_select, "register": _gaps_register}
+
+
+def _cmd_gaps(kb, args):
+    handler = _subcommand(_GAPS_SUBCMDS, "gaps", args)
+    if handler:
+        handler(kb, args)
+
+
+# ── Daemon ───────────────────────────────────────────────────
+
+DEFAULT_SOCKET = os.path.expanduser("~/.kb.sock")
+
+# Commands that make no sense forwarded to / run inside the daemon
+_LOCAL_CMDS = {"init", "serve"}
+
+# Commands whose item array may come from stdin (see _batch_items)
+_BATCH_CMDS = {"add-tasks-batch", "add-sources-batch", "add-claims-batch", "trace-batch"}
+
+# Read-only commands whose output the daemon may replay until the next write
+_READ_CMDS = {"get", "claim", "claims", "list", "stats", "sources", "links",
+              "traces", "eval", "evals", "context", "monitor"}
+_CACHE_MAX = 1024
+
+
+def _socket_path(value=None):
+    """Resolve KB_SOCKET: unset/"1" means the default socket, else a path."""
+    value = value if value is not None else os.environ.get("KB_SOCKET", "")
+    return DEFAULT_SOCKET if value in ("", "1") else os.path.expanduser(value)
+
+
+def _dispatch(kb, cmd, args, fmt="json"):
+    """Run one command with stdout/stderr captured, emitting structured
+    output in the client's format fmt. Returns (exit_code, stdout_bytes,
+    stderr). stdout is a binary capture so msgpack output survives."""
+    global _FORMAT
+    import io
+    import traceback
+    from contextlib import redirect_stdout, redirect_stderr
+
+    raw, err = io.BytesIO(), io.StringIO()
+    out = io.TextIOWrapper(raw, encoding="utf-8", write_through=True)
+    code = 0
+    # The daemon runs one command at a time, so swapping the module-level
+    # format for the duration of the call is safe
+    served_format, _FORMAT = _FORMAT, fmt
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            handler = None if cmd in _LOCAL_CMDS else HANDLERS.get(cmd)
+            if fmt == "msgpack" and msgpack is None:
+                print("KB_FORMAT=msgpack requires the msgpack package on the kb server",
+                      file=sys.stderr)
+                code = 1
+            elif handler is None:
+                print(f"Unknown command: {cmd}", file=sys.stderr)
+                print_usage()
+                code = 1
             else:
-                print(f"Unknown expert subcommand: {subcmd}", file=sys.stderr)
-
-        # ── Decisions (MCDA) ─────────────────────────────────────────
-
-        elif cmd == "decide":
-            subcmd = args[0]
-            if subcmd == "add":
-                title = args[1]; crit = json.loads(args[2]); alts = json.loads(args[3])
-                eid = args[4] if len(args) > 4 and args[4] != "null" else None
-                w = json.loads(args[5]) if len(args) > 5 else None
-                did = kb.add_decision(title, crit, alts, eid, w)
-                print(json.dumps({"decision_id": did}))
-            elif subcmd == "score":
-                print(json.dumps(kb.score_alternatives(int(args[1]), json.loads(args[2])), indent=2))
-            elif subcmd == "sensitivity":
-                p = float(args[2]) if len(args) > 2 else 0.1
-                print(json.dumps(kb.sensitivity_analysis(int(args[1]), p), indent=2))
-            elif subcmd == "get":
-                print(json.dumps(kb.get_decision(int(args[1])), indent=2))
-
-        # ── Embed & Search ───────────────────────────────────────────
-
-        elif cmd == "embed":
-            subcmd = args[0] if args else "all"
-            if subcmd == "all":
-                print(json.dumps(kb.embed_all(), indent=2))
-            elif subcmd == "entity":
-                print(json.dumps({"entity_id": args[1], "ok": kb.embed_entity(args[1])}))
-            elif subcmd == "claim":
-                print(json.dumps({"claim_id": int(args[1]), "ok": kb.embed_claim(int(args[1]))}))
-
-        elif cmd == "semantic":
-            q = args[0]; lim = int(args[1]) if len(args) > 1 else 10
-            print(json.dumps(kb.semantic_search(q, lim), indent=2))
-
-        elif cmd == "hybrid":
-            q = args[0]; lim = int(args[1]) if len(args) > 1 else 10
-            print(json.dumps(kb.hybrid_search(q, lim), indent=2))
-
-        # ── Thompson Sampling ────────────────────────────────────────
-
-        elif cmd == "gaps":
-            subcmd = args[0]
-            if subcmd == "select":
-                eid = int(args[1]); n = int(args[2]) if len(args) > 2 else 3
-                print(json.dumps(kb.select_next_gaps(eid, n), indent=2))
-            elif subcmd == "register":
-                kb.register_gap_topics(int(args[1]), json.loads(args[2]))
-                print(json.dumps({"ok": True}))
+                handler(kb, Args(args))
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            _FORMAT = served_format
+    out.flush()
+    return code, raw.getvalue(), err.getvalue()
+
+
+def _cached_dispatch(kb, cache, cmd, args, fmt="json"):
+    """_dispatch with read-command memoization. Successful read results are
+    keyed by (cmd, args, fmt); any other command clears the cache. Writes
+    made outside the daemon are not seen until the next write through it."""
+    if cmd not in _READ_CMDS:
+        cache.clear()
+        return _dispatch(kb, cmd, args, fmt)
+    key = (cmd, tuple(args), fmt)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    result = _dispatch(kb, cmd, args, fmt)
+    if result[0] == 0:
+        if len(cache) >= _CACHE_MAX:
+            del cache[next(iter(cache))]
+        cache[key] = result
+    return result
+
+
+def _serve(kb, path):
+    """Serve newline-delimited {"cmd", "args", "db", "format"} requests on
+    a Unix socket, one JSON response line each (stdout base64-encoded, as
+    it may be msgpack), with a single KnowledgeBase kept open. A request whose "db" is not the served DB is refused with
+    "db_mismatch" set, so the client can run it against its own DB."""
+    import selectors
+    import socket
+
+    served = os.path.realpath(kb.db_path)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    server.setblocking(False)
+
+    sel = selectors.DefaultSelector()
+    sel.register(server, selectors.EVENT_READ)
+    buffers = {}
+    cache = {}
+
+    def drop(conn):
+        sel.unregister(conn)
+        buffers.pop(conn, None)
+        conn.close()
+
+    print(f"Serving {kb.db_path} on {path}", file=sys.stderr)
+    try:
+        while True:
+            for key, _ in sel.select():
+                sock = key.fileobj
+                if sock is server:
+                    conn, _ = server.accept()
+                    sel.register(conn, selectors.EVENT_READ)
+                    buffers[conn] = b""
+                    continue
+                try:
+                    data = sock.recv(65536)
+                except OSError:
+                    data = b""
+                if not data:
+                    drop(sock)
+                    continue
+                buf = buffers[sock] + data
+                *lines, buffers[sock] = buf.split(b"\n")
+                try:
+                    for line in lines:
+                        if not line.strip():
+                            continue
+                        try:
+                            req = loads(line)
+                            db = req.get("db")
+                            if db is not None and os.path.realpath(db) != served:
+                                resp = json.dumps({"code": 1, "stdout": "", "db_mismatch": True,
+                                                   "stderr": f"kb server serves {served}, not {db}\n"})
+                                sock.sendall(resp.encode() + b"\n")
+                                continue
+                            code, out, err = _cached_dispatch(
+                                kb, cache, req["cmd"], [str(a) for a in req.get("args", [])],
+                                str(req.get("format", "json")))
+                        except (ValueError, KeyError, TypeError) as e:
+                            code, out, err = 1, b"", f"Bad request: {e}\n"
+                        resp = json.dumps({"code": code, "stdout": base64.b64encode(out).decode(),
+                                           "stderr": err})
+                        sock.sendall(resp.encode() + b"\n")
+                except OSError:
+                    drop(sock)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for conn in list(buffers):
+            drop(conn)
+        sel.close()
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
 
-        else:
-            print(f"Unknown command: {cmd}", file=sys.stderr)
+
+def _forward(path, cmd, args, db):
+    """Send one command to a running `kb serve` for the DB at db. Returns
+    the exit code, None if no daemon is listening on path, or False if the
+    daemon serves a different DB (nothing is written in either case)."""
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    with sock:
+        sock.sendall(json.dumps({"cmd": cmd, "args": args, "db": db,
+                                 "format": _FORMAT}).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        return None
+    resp = json.loads(line)
+    if resp.get("db_mismatch"):
+        return False
+    _stdout_write()(base64.b64decode(resp["stdout"]))
+    sys.stderr.write(resp["stderr"])
+    return resp["code"]
+
+
+def _cmd_serve(kb, args):
+    _serve(kb, _socket_path(args.s(0)))
+
+
+# Command name → handler(kb, args)
+HANDLERS = {
+    "add": _cmd_add,
+    "get": _cmd_get,
+    "update": _cmd_update,
+    "list": _cmd_list,
+    "search": _cmd_search,
+    "stats": _cmd_stats,
+    "export": _cmd_export,
+    "graph": _cmd_graph,
+    "link": _cmd_link,
+    "links": _cmd_links,
+    "add-task": _cmd_add_task,
+    "add-tasks-batch": _cmd_add_tasks_batch,
+    "tasks": _cmd_tasks,
+    "update-task": _cmd_update_task,
+    "add-source": _cmd_add_source,
+    "add-sources-batch": _cmd_add_sources_batch,
+    "sources": _cmd_sources,
+    "add-claim": _cmd_add_claim,
+    "add-claims-batch": _cmd_add_claims_batch,
+    "add-claim-source": _cmd_add_claim_source,
+    "claim": _cmd_claim,
+    "claims": _cmd_claims,
+    "decompose": _cmd_decompose,
+    "quote": _cmd_quote,
+    "claim-from-quote": _cmd_claim_from_quote,
+    "review": _cmd_review,
+    "qa": _cmd_qa,
+    "verify": _cmd_verify,
+    "grade-sc": _cmd_grade_sc,
+    "report": _cmd_report,
+    "contradictions": _cmd_contradictions,
+    "corroboration": _cmd_corroboration,
+    "decay": _cmd_decay,
+    "add-eval": _cmd_add_eval,
+    "eval": _cmd_eval,
+    "evals": _cmd_evals,
+    "update-eval": _cmd_update_eval,
+    "converged": _cmd_converged,
+    "trace": _cmd_trace,
+    "trace-batch": _cmd_trace_batch,
+    "traces": _cmd_traces,
+    "perspectives": _cmd_perspectives,
+    "route": _cmd_route,
+    "spawn": _cmd_spawn,
+    "budget": _cmd_budget,
+    "context": _cmd_context,
+    "monitor": _cmd_monitor,
+    "expert": _cmd_expert,
+    "decide": _cmd_decide,
+    "embed": _cmd_embed,
+    "semantic": _cmd_semantic,
+    "hybrid": _cmd_hybrid,
+    "gaps": _cmd_gaps,
+    "serve": _cmd_serve,
+}
+
+_HELP_CMDS = {"help", "-h", "--help"}
+
+
+def main(argv=None):
+    """CLI entry point. argv defaults to sys.argv[1:]; passing a list lets
+    scripts and long-lived callers run commands in-process."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        print_usage()
+        sys.exit(1)
+    
+    if _FORMAT == "msgpack" and msgpack is None:
+        print("KB_FORMAT=msgpack requires the msgpack package (pip install msgpack)", file=sys.stderr)
+        sys.exit(1)
+
+    client = argv[0] == "--client"
+    if client:
+        argv = argv[1:]
+        if not argv:
             print_usage()
             sys.exit(1)
+    # Interned so the HANDLERS lookup hits CPython's identity fast path
+    cmd = sys.intern(argv[0])
+    args = argv[1:]
+
+    # ── Init / help / unknown (no DB needed) ─────────────────────
+    if cmd == "init":
+        _init_project()
+        return
+    if cmd in _HELP_CMDS:
+        print_usage()
+        return
+    handler = HANDLERS.get(cmd)
+    if handler is None:
+        print(f"Unknown command: {cmd}", file=sys.stderr)
+        print_usage()
+        sys.exit(1)
+
+    # Batch input is read here, in the client, so it travels as args[0]
+    if cmd in _BATCH_CMDS and (not args or args[0] == "-"):
+        args = [sys.stdin.read() or "[]"] + args[1:]
+
+    from researcher import get_db_path
+
+    # Resolved here, in the client, so KB_DB and a cwd-local
+    # knowledge-base/ pick the DB whether or not a daemon is running
+    db_path = get_db_path()
+
+    # ── Forward to a running `kb serve` ──────────────────────────
+    if (client or os.environ.get("KB_SOCKET")) and cmd not in _LOCAL_CMDS:
+        code = _forward(_socket_path(), cmd, args, os.path.abspath(db_path))
+        if code is None or code is False:
+            # No daemon, or one serving another DB: run locally on db_path
+            if client:
+                if code is None:
+                    print(f"No kb server listening on {_socket_path()}", file=sys.stderr)
+                else:
+                    print(f"kb server on {_socket_path()} serves a different DB than {db_path}",
+                          file=sys.stderr)
+                sys.exit(1)
+        else:
+            if code:
+                sys.exit(code)
+            return
 
+    # Deferred so `init` and forwarded commands don't pay for loading the
+    # KB stack
+    from researcher import KnowledgeBase
+
+    kb = KnowledgeBase(db_path, vec_int8=_VEC_INT8)
+    
+    try:
+        handler(kb, Args(args))
     finally:
         kb.close()
 
-def print_usage():
-    print("""
+_USAGE_BYTES = """
 Knowledge Base CLI — Research Agent Interface
 
 Usage: kb-cli <command> [args...]
@@ -383,15 +869,18 @@ LINKS
 
 TASKS
   add-task <title> [desc] [entity_id] [meta]      Create task
+  add-tasks-batch [json_array|-]                   Create many tasks in one transaction
   tasks [status] [entity_id]                       List tasks
   update-task <task_id> <status>                   Update task status
 
 SOURCES
   add-source <url> [title] [snippet] [type]        Add source (auto-scores)
+  add-sources-batch [json_array|-]                  Add many sources in one transaction
   sources [entity_id] [min_credibility]             List sources
 
 CLAIMS
   add-claim <text> [entity_id] [source_ids] [meta]  Add claim (auto-grades)
+  add-claims-batch [json_array|-]                    Add many claims in one transaction
   add-claim-source <claim_id> <source_id> [rel]      Link source to claim
   claim <id>                                          Get claim with sources
   claims [entity_id] [grade]                          List claims
@@ -425,6 +914,7 @@ EVALUATION LOOP
 
 TRACES
   trace <entity_id> <action> [in] [out] [reason]   Log reasoning step
+  trace-batch [json_array|-]                        Log many steps in one transaction
   traces <entity_id> [--summary]                    Get traces (--summary for compact)
 
 ROUTING & SPAWNING
@@ -451,7 +941,7 @@ DECISIONS (MCDA)
   decide get <id>                                  Get decision
 
 EMBEDDING & SEARCH
-  embed [all|entity <id>|claim <id>]               Vector embeddings
+  embed [all [batch] [workers]|entity <id>|claim <id>]  Vector embeddings
   semantic <query> [limit]                          Semantic search
   hybrid <query> [limit]                            FTS5 + vector RRF search
 
@@ -465,54 +955,21 @@ EXPORT
 
 SETUP
   init                                              Scaffold project with KB + agent guides
-""")
-
-
-_COPILOT_INSTRUCTIONS = """# Copilot Instructions — Researcher
-
-This project has a research knowledge base. Use the `kb` command to interact with it.
 
-## Quick Start
+DAEMON
+  serve [socket]                                    Hold the KB open on a Unix socket (~/.kb.sock)
+  --client <command> ...                            Run a command via the server (or set KB_SOCKET)
 
-```bash
-kb stats                                    # What's in the KB
-kb search "your topic"                      # Find existing research
-kb add "Research: Topic" "Description"      # Start new research
-kb add-claim <entity_id> "Finding" 0.8 0.9  # Add claims
-kb review <entity_id> full                  # Quality review
-kb report <entity_id> synthesize executive  # Generate report
-kb route "Task description"                 # Pick coordinator
-```
+Set KB_FORMAT=msgpack for MessagePack output instead of JSON (needs msgpack).
+Set KB_VEC_INT8=1 when the vector index is first created to store int8 vectors.
+*-batch commands read a JSON array of objects keyed like the Python API
+(e.g. {"claim_text", "entity_id", "source_ids"}); "-" or no argument reads stdin.
 
-## Key Commands
+""".encode()
 
-| Command | Purpose |
-|---------|---------|
-| `kb stats` | DB overview |
-| `kb search <q> [--all]` | Find existing research |
-| `kb add / get / update / list` | Entity CRUD |
-| `kb add-claim / claims` | Claim management |
-| `kb review <eid> full` | Quality review (4 checks) |
-| `kb qa <eid>` | Batch verification + grading |
-| `kb report <eid> synthesize` | Themed report |
-| `kb route <desc>` | Pick best coordinator |
-| `kb spawn / budget / context` | Sub-agent tracking |
-| `kb monitor <eid>` | Tree health |
-| `kb help` | Full command reference |
 
-All output is JSON. Entity IDs are 12-char hex strings. Run `kb help` for the full command list.
-
-## Agent Guides
-
-Agent behavior guides are in `.copilot/agents/`:
-
-| Directory | Agents |
-|-----------|--------|
-| `coordinators/` | Hierarchical Planner, Swarm Coordinator, Pipeline Manager |
-| `specialists/` | Code Analyzer, Critic, Decision Log, Domain Expert, Gap Detector, Learning Path, Monitor, Quantitative, Synthesizer |
-
-To use an agent, read its guide (e.g. `cat .copilot/agents/coordinators/SWARM_COORDINATOR_AGENT.md`) and follow the workflow described there.
-"""
+def print_usage():
+    _stdout_write()(_USAGE_BYTES)
 
 
 def _init_project():
@@ -528,10 +985,11 @@ def _init_project():
         kb_dir.mkdir()
         created.append("knowledge-base/")
 
-    # Create .copilot-instructions.md
+    # Create .copilot-instructions.md (template ships as package data)
     instructions = Path(".copilot-instructions.md")
     if not instructions.exists():
-        instructions.write_text(_COPILOT_INSTRUCTIONS)
+        template = Path(__file__).parent / "data" / "copilot_instructions.md"
+        instructions.write_text(template.read_text(encoding="utf-8"))
         created.append(".copilot-instructions.md")
     else:
         print(f"  exists: {instructions}")
@@ -553,7 +1011,8 @@ def _init_project():
     # Initialize DB
     db_path = kb_dir / "kb.db"
     if not db_path.exists():
-        kb = KnowledgeBase(str(db_path))
+        from researcher import KnowledgeBase
+        kb = KnowledgeBase(str(db_path), vec_int8=_VEC_INT8)
         kb.close()
         created.append("knowledge-base/kb.db")
 
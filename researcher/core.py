@@ -6,18 +6,537 @@ Agents just add entities, links, and tasks - system manages the rest.
 
 import sqlite3
 import json
-import uuid
+import sys
 import random
 import re
 import hashlib
+import heapq
+import io
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from functools import lru_cache
+from pathlib import Path
+from secrets import token_hex
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator
+
+from researcher._util import dump_meta, dumps, load_meta, loads, row_dict, rows_to_dicts
+# Dependency-free modules backing class constants, so they load with core
+# anyway; their wrappers call them directly instead of importing per call.
+from researcher import kb_domains, kb_router
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Hot-path SQL kept as module constants so every call reuses the same
+# prepared statement from the connection's statement cache.
+_SQL_INSERT_ENTITY = (
+    "INSERT INTO entities (id, title, content, metadata, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_LINK = (
+    "INSERT INTO links (from_id, to_id, link_type, created_at) VALUES (?, ?, ?, ?)"
+)
+_SQL_INSERT_LINK_IGNORE = (
+    "INSERT OR IGNORE INTO links (from_id, to_id, link_type, created_at) VALUES (?, ?, ?, ?)"
+)
+_SQL_INSERT_TASK = (
+    "INSERT INTO tasks (title, description, entity_id, metadata, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_CLAIM = (
+    "INSERT INTO claims (claim_text, entity_id, metadata, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_TRACE = (
+    "INSERT INTO traces (entity_id, step_num, action, input, output, reasoning, tool_used, "
+    "duration_ms, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# INSERT ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_SQL_LINK_CLAIM_SOURCE = (
+    "INSERT OR IGNORE INTO claim_sources (claim_id, source_id) "
+    "SELECT ?, id FROM sources WHERE id = ?"
+)
+_SQL_ADD_CLAIM_SOURCE = (
+    "INSERT OR IGNORE INTO claim_sources (claim_id, source_id, relationship) "
+    "SELECT c.id, s.id, ? FROM claims c, sources s WHERE c.id = ? AND s.id = ?"
+)
+_SQL_UPSERT_SOURCE = (
+    "INSERT INTO sources (url, title, domain, snippet, credibility, source_type, accessed_at, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(url) DO UPDATE SET title = excluded.title, snippet = excluded.snippet, "
+    "accessed_at = excluded.accessed_at WHERE excluded.title <> ''"
+) + (" RETURNING id, credibility" if _HAS_RETURNING else "")
+_SQL_INSERT_ATOMS = (
+    "INSERT INTO claims (claim_text, entity_id, metadata, parent_claim_id, "
+    "claim_type, is_atomic, created_at, updated_at) VALUES "
+)
+_SQL_ATOM_VALUES = "(?, ?, ?, ?, 'atomic', 1, ?, ?)"
+_SQL_UPDATE_TASK_STATUS = "UPDATE tasks SET status = ?, updated_at = ? WHERE id = ?"
+_SQL_PENDING_TASKS = (
+    "SELECT * FROM tasks INDEXED BY idx_tasks_pending "
+    "WHERE status = 'pending' ORDER BY created_at DESC"
+)
+_SQL_LIST_ENTITIES = (
+    "SELECT id, title, substr(content, 1, 101) AS content, metadata, created_at "
+    "FROM entities ORDER BY created_at DESC LIMIT ?"
+)
+_SQL_LINKS_FROM = (
+    "SELECT e.id, e.title, l.link_type FROM links l "
+    "JOIN entities e ON e.id = l.to_id WHERE l.from_id = ?"
+)
+_SQL_LINKS_TO = (
+    "SELECT e.id, e.title, l.link_type FROM links l "
+    "JOIN entities e ON e.id = l.from_id WHERE l.to_id = ?"
+)
+_SQL_GRAPH_NODES = "SELECT id, title FROM entities ORDER BY created_at DESC"
+_SQL_GRAPH_EDGES = "SELECT from_id, to_id, link_type FROM links"
+# visualize_graph: DOT label escaping, and one node/edge object of the JSON
+# format as json.dumps(indent=2) lays it out two levels deep
+_DOT_ESCAPE = str.maketrans({'"': '\\"'})
+_JSON_GRAPH_NODE = '{\n      "id": %s,\n      "title": %s\n    }'
+_JSON_GRAPH_EDGE = '{\n      "from": %s,\n      "to": %s,\n      "type": %s\n    }'
+
+# Claim complexity signals and decomposition split points
+_RE_CONJUNCTION = re.compile(r'\b(and|also|additionally|furthermore|moreover)\b', re.I)
+_RE_SENTENCE_END = re.compile(r'[.!?]+\s')
+_RE_QUANTITY = re.compile(r'\d+\.?\d*\s*(%|°|MW|GW|km|m\b|kg|ton|year|eV|keV|MeV)')
+_RE_RELATIVE = re.compile(r'\b(which|that|where|when|while|whereas)\b', re.I)
+_RE_SEMICOLON = re.compile(r'\s*;\s*')
+_RE_AND_CLAUSE = re.compile(r',?\s+and\s+(?=[A-Z])')
+
+# Beta(1, 1) uniform prior for a gap topic with no recorded attempts
+_GAP_PRIOR = {'alpha': 1.0, 'beta': 1.0, 'attempts': 0, 'total_gain': 0.0}
+
+_DEFAULT_CONVERGENCE_CRITERIA = {
+    "min_confidence": 0.7,
+    "max_gaps": 2,
+    "max_contradictions": 0,
+    "marginal_gain_threshold": 0.02,
+    "marginal_gain_patience": 2
+}
+_DEFAULT_CONVERGENCE_CRITERIA_JSON = dumps(_DEFAULT_CONVERGENCE_CRITERIA)
+_SQL_CONVERGENCE_STATE = (
+    "SELECT iteration, max_iterations, confidence, gaps, contradictions, "
+    "confidence_history, convergence_criteria FROM evaluations WHERE id = ?"
+)
+
+
+@lru_cache(maxsize=256)
+def _parse_criteria(raw: str) -> Dict[str, Any]:
+    """Decode a convergence_criteria column. Criteria are written once per
+    evaluation, so a convergence loop keeps hitting the same few strings.
+    Callers only read the returned dict."""
+    return loads(raw)
+
+# Append {iteration, confidence, delta} to confidence_history in place;
+# binds (confidence, confidence)
+_SQL_APPEND_CONFIDENCE = (
+    "confidence_history = json_insert(COALESCE(confidence_history, '[]'), '$[#]', "
+    "json_object('iteration', iteration, 'confidence', ?, 'delta', "
+    "? - COALESCE(json_extract(confidence_history, '$[#-1].confidence'), 0.0)))"
+)
+_SQL_STATS = """
+SELECT (SELECT COUNT(*) FROM entities),
+       (SELECT COUNT(*) FROM links),
+       t.n, t.pending, t.completed,
+       (SELECT COUNT(*) FROM sources),
+       c.n, c.strong, c.contested,
+       (SELECT COUNT(*) FROM traces),
+       (SELECT COUNT(*) FROM decisions)
+FROM (SELECT COUNT(*) AS n,
+             COALESCE(SUM(status = 'pending'), 0) AS pending,
+             COALESCE(SUM(status = 'completed'), 0) AS completed
+      FROM tasks) t,
+     (SELECT COUNT(*) AS n,
+             COALESCE(SUM(evidence_grade = 'strong'), 0) AS strong,
+             COALESCE(SUM(evidence_grade = 'contested'), 0) AS contested
+      FROM claims) c
+"""
+
+# Source tally for _grade_claim: (n_support, sum of supporting credibility,
+# n_contradict) in one row
+_SQL_GRADE_CLAIM = """
+SELECT COALESCE(SUM(cs.relationship IN ('supports', 'confirms')), 0),
+       TOTAL(CASE WHEN cs.relationship IN ('supports', 'confirms') THEN s.credibility END),
+       COALESCE(SUM(cs.relationship IN ('contradicts', 'refutes')), 0)
+FROM sources s JOIN claim_sources cs ON s.id = cs.source_id
+WHERE cs.claim_id = ?
+"""
+
+# Whole subtree in one query. The path column stops cycles; a node reached
+# along several paths keeps its shallowest depth, matching BFS visit order.
+# The recursive step is answered from the UNIQUE(from_id, to_id, link_type) index.
+_SQL_WALK_TREE = """
+WITH RECURSIVE walk(id, depth, path) AS (
+    SELECT ?1, 0, char(31) || ?1 || char(31)
+    UNION ALL
+    SELECT l.to_id, w.depth + 1, w.path || l.to_id || char(31)
+    FROM walk w JOIN links l ON l.from_id = w.id
+    WHERE l.link_type IN ('child', 'wave', 'spawned')
+      AND instr(w.path, char(31) || l.to_id || char(31)) = 0
+)
+SELECT id, MIN(depth) AS depth FROM walk
+GROUP BY id ORDER BY depth, MIN(path)
+"""
+
+# monitor_tree in one pass: every node of the subtree in depth-first order
+# (one row per path, as the old recursive walk did), tagged with the
+# top-level branch it hangs from, plus its claim count and last trace time.
+# Per-node figures come from correlated lookups on the entity_id indexes.
+_SQL_MONITOR_TREE = """
+WITH RECURSIVE subtree(id, depth, branch, path) AS (
+    SELECT ?1, 0, NULL, char(31) || ?1 || char(31)
+    UNION ALL
+    SELECT l.to_id, s.depth + 1, COALESCE(s.branch, l.to_id), s.path || l.to_id || char(31)
+    FROM subtree s JOIN links l ON l.from_id = s.id
+    JOIN entities c ON c.id = l.to_id
+    WHERE l.link_type IN ('child', 'wave', 'spawned')
+      AND instr(s.path, char(31) || l.to_id || char(31)) = 0
+)
+SELECT s.id, s.depth, s.branch, e.title, COALESCE(e.content, '') <> '',
+       COALESCE((SELECT MAX(created_at) FROM traces t WHERE t.entity_id = s.id), e.updated_at),
+       e.created_at,
+       (SELECT COUNT(*) FROM claims c WHERE c.entity_id = s.id)
+FROM subtree s JOIN entities e ON e.id = s.id
+ORDER BY s.path
+"""
+
+# monitor_tree: latest evaluation for a root, with the confidence_history
+# length, its last five entries and the stall check (last three deltas all
+# under 0.02, a missing delta counting as 0) worked out by JSON1, so the
+# full history is never parsed in Python
+_SQL_MONITOR_EVAL = """
+SELECT confidence, iteration, status, json_array_length(h) AS n,
+       (SELECT json_group_array(value) FROM json_each(h)
+        WHERE key >= json_array_length(h) - 5) AS trajectory,
+       json_array_length(h) >= 3
+       AND abs(COALESCE(json_extract(h, '$[#-1].delta'), 0)) < 0.02
+       AND abs(COALESCE(json_extract(h, '$[#-2].delta'), 0)) < 0.02
+       AND abs(COALESCE(json_extract(h, '$[#-3].delta'), 0)) < 0.02 AS stalled
+FROM (SELECT confidence, iteration, status, COALESCE(confidence_history, '[]') AS h
+      FROM evaluations WHERE parent_id = ? ORDER BY id DESC LIMIT 1)
+"""
+
+# update_entity variants, keyed by bitmask of the columns being set
+# (bit 0 = title, bit 1 = content, bit 2 = metadata)
+_ENTITY_UPDATE_FIELDS = ('title', 'content', 'metadata')
+_SQL_UPDATE_ENTITY = {
+    mask: "UPDATE entities SET {}, updated_at = ? WHERE id = ?".format(
+        ', '.join(f"{c} = ?" for i, c in enumerate(_ENTITY_UPDATE_FIELDS) if mask >> i & 1))
+    for mask in range(1, 1 << len(_ENTITY_UPDATE_FIELDS))
+}
+
+# Schema DDL, run by _init_tables() in one transaction
+_SQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    content TEXT,
+    metadata TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    from_id TEXT NOT NULL,
+    to_id TEXT NOT NULL,
+    link_type TEXT DEFAULT 'related',
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(from_id) REFERENCES entities(id) ON DELETE CASCADE,
+    FOREIGN KEY(to_id) REFERENCES entities(id) ON DELETE CASCADE,
+    UNIQUE(from_id, to_id, link_type)
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'pending',
+    entity_id TEXT,
+    metadata TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE SET NULL
+);
+
+-- UNIQUE(from_id, to_id, link_type) already covers outgoing lookups;
+-- this is its mirror for incoming ones. Both answer from the index.
+CREATE INDEX IF NOT EXISTS idx_links_to_from_type ON links(to_id, from_id, link_type);
+DROP INDEX IF EXISTS idx_links_from;
+DROP INDEX IF EXISTS idx_links_to;
+-- Pending backlog is the hot polling path; keep its index tiny
+CREATE INDEX IF NOT EXISTS idx_tasks_pending ON tasks(created_at DESC)
+    WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_tasks_status_entity
+    ON tasks(status, entity_id, created_at DESC);
+DROP INDEX IF EXISTS idx_tasks_status;
+-- Per-entity listing reads in created_at order straight off the index
+DROP INDEX IF EXISTS idx_tasks_entity;
+CREATE INDEX IF NOT EXISTS idx_tasks_entity_created ON tasks(entity_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    parent_id TEXT NOT NULL,
+    iteration INTEGER DEFAULT 1,
+    max_iterations INTEGER DEFAULT 5,
+    status TEXT DEFAULT 'evaluating',
+    confidence REAL DEFAULT 0.0,
+    gaps TEXT DEFAULT '[]',
+    contradictions TEXT DEFAULT '[]',
+    convergence_criteria TEXT DEFAULT '{}',
+    confidence_history TEXT DEFAULT '[]',
+    gap_thompson_params TEXT DEFAULT '{}',
+    decision TEXT,
+    rationale TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY(parent_id) REFERENCES entities(id) ON DELETE CASCADE
+);
+
+DROP INDEX IF EXISTS idx_evaluations_parent;
+CREATE INDEX IF NOT EXISTS idx_evaluations_parent_iter
+    ON evaluations(parent_id, iteration DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_status ON evaluations(status);
+
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    title TEXT,
+    domain TEXT,
+    snippet TEXT,
+    credibility REAL DEFAULT 0.5,
+    source_type TEXT DEFAULT 'web',
+    accessed_at TEXT NOT NULL,
+    metadata TEXT DEFAULT '{}',
+    UNIQUE(url)
+);
+
+CREATE TABLE IF NOT EXISTS claims (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    claim_text TEXT NOT NULL,
+    entity_id TEXT,
+    evidence_grade TEXT DEFAULT 'ungraded',
+    confidence REAL DEFAULT 0.5,
+    status TEXT DEFAULT 'active',
+    metadata TEXT DEFAULT '{}',
+    parent_claim_id INTEGER REFERENCES claims(id) ON DELETE CASCADE,
+    claim_type TEXT,
+    is_atomic INTEGER DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS claim_sources (
+    claim_id INTEGER NOT NULL,
+    source_id INTEGER NOT NULL,
+    relationship TEXT DEFAULT 'supports',
+    PRIMARY KEY(claim_id, source_id),
+    FOREIGN KEY(claim_id) REFERENCES claims(id) ON DELETE CASCADE,
+    FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_sources_domain ON sources(domain);
+CREATE INDEX IF NOT EXISTS idx_sources_credibility ON sources(credibility);
+DROP INDEX IF EXISTS idx_claims_entity;
+CREATE INDEX IF NOT EXISTS idx_claims_entity_status ON claims(entity_id, status);
+CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status);
+CREATE INDEX IF NOT EXISTS idx_claims_grade ON claims(evidence_grade);
+
+CREATE TABLE IF NOT EXISTS traces (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity_id TEXT,
+    step_num INTEGER DEFAULT 1,
+    action TEXT NOT NULL,
+    input TEXT,
+    output TEXT,
+    reasoning TEXT,
+    tool_used TEXT,
+    duration_ms INTEGER,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity_id TEXT,
+    title TEXT NOT NULL,
+    criteria TEXT DEFAULT '[]',
+    alternatives TEXT DEFAULT '[]',
+    scores TEXT DEFAULT '{}',
+    weights TEXT DEFAULT '{}',
+    recommendation TEXT,
+    rationale TEXT,
+    status TEXT DEFAULT 'draft',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE SET NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_traces_entity ON traces(entity_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_entity ON decisions(entity_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_status ON decisions(status);
+"""
+
+# Columns added to claims after the first release — ALTERed onto older DBs
+_CLAIMS_ADDED_COLUMNS = (
+    ('parent_claim_id', "INTEGER REFERENCES claims(id) ON DELETE CASCADE"),
+    ('claim_type', "TEXT"),
+    ('is_atomic', "INTEGER DEFAULT 0"),
+    ('updated_at', "TEXT"),
+)
+# Indexes on those columns run after the ALTERs. Partial: only atomic
+# children carry a parent, so the index stays a small fraction of claims.
+_SQL_CLAIMS_ADDED_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_claims_parent ON claims(parent_claim_id, is_atomic) "
+    "WHERE parent_claim_id IS NOT NULL;"
+)
+
+_SQL_SCHEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(
+    id UNINDEXED, title, content,
+    content='entities', content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS entities_fts_ai AFTER INSERT ON entities BEGIN
+    INSERT INTO entities_fts (rowid, id, title, content)
+    VALUES (new.rowid, new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_fts_ad AFTER DELETE ON entities BEGIN
+    INSERT INTO entities_fts (entities_fts, rowid, id, title, content)
+    VALUES ('delete', old.rowid, old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_fts_au AFTER UPDATE OF title, content ON entities BEGIN
+    INSERT INTO entities_fts (entities_fts, rowid, id, title, content)
+    VALUES ('delete', old.rowid, old.id, old.title, old.content);
+    INSERT INTO entities_fts (rowid, id, title, content)
+    VALUES (new.rowid, new.id, new.title, new.content);
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS claims_fts USING fts5(
+    claim_text,
+    content='claims', content_rowid='id',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS claims_fts_ai AFTER INSERT ON claims BEGIN
+    INSERT INTO claims_fts (rowid, claim_text) VALUES (new.id, new.claim_text);
+END;
+CREATE TRIGGER IF NOT EXISTS claims_fts_ad AFTER DELETE ON claims BEGIN
+    INSERT INTO claims_fts (claims_fts, rowid, claim_text)
+    VALUES ('delete', old.id, old.claim_text);
+END;
+CREATE TRIGGER IF NOT EXISTS claims_fts_au AFTER UPDATE OF claim_text ON claims BEGIN
+    INSERT INTO claims_fts (claims_fts, rowid, claim_text)
+    VALUES ('delete', old.id, old.claim_text);
+    INSERT INTO claims_fts (rowid, claim_text) VALUES (new.id, new.claim_text);
+END;
+"""
+
+_SQL_SCHEMA_EMBEDDING_MAP = """
+CREATE TABLE IF NOT EXISTS embedding_map (
+    vec_rowid INTEGER PRIMARY KEY,
+    source_table TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    text_hash TEXT,
+    embedded_at TEXT NOT NULL,
+    UNIQUE(source_table, source_id)
+);
+CREATE INDEX IF NOT EXISTS idx_embedding_map_source
+    ON embedding_map(source_table, source_id);
+"""
+
+# Per-connection prepared-statement cache. The KB issues a few hundred
+# distinct statements (dynamic WHERE clauses included); keep them all hot.
+_STATEMENT_CACHE_SIZE = 512
+
+# HNSW capacity for the vectorlite index (fixed when the table is created)
+_HNSW_MAX_ELEMENTS = 100_000
+
+
+def _sql_create_vectorlite(db_path):
+    """vectorlite table DDL. On-disk DBs persist the HNSW graph beside
+    the database file; in-memory DBs keep it in memory."""
+    index_file = ""
+    if db_path not in (":memory:", ""):
+        index_file = ", '{}'".format((str(db_path) + ".hnsw").replace("'", "''"))
+    return (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vectorlite("
+        f"embedding float32[384] cosine, hnsw(max_elements={_HNSW_MAX_ELEMENTS}){index_file});"
+    )
+
+
+def _close_connections(conn, readers, vec_buffer=None, vec_backend=None):
+    """Write any still-buffered embeddings, close readers, refresh planner
+    statistics, then close the writer. Runs once: from close(), on garbage
+    collection, or at interpreter exit."""
+    if vec_buffer:
+        _write_vec_buffer(conn, vec_buffer, vec_backend)
+    for reader in readers:
+        reader.close()
+    readers.clear()
+    # Refresh planner statistics for indexes this session leaned on
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+
+def _write_vec_buffer(conn, vec_buffer, vec_backend):
+    """Finalizer half of the embedding write-behind: write what an unclosed
+    KB buffered. Skipped, with a warning, if a transaction is still open
+    (a bulk() abandoned at exit), since committing would commit it too."""
+    from researcher.kb_vectors import _write_buffer
+    if conn.in_transaction:
+        reason = "a write transaction is still open"
+    else:
+        try:
+            with conn:
+                _write_buffer(conn, vec_backend, datetime.utcnow().isoformat(), vec_buffer)
+            vec_buffer.clear()
+            return
+        except sqlite3.Error as e:
+            reason = e
+    print(f"researcher: {len(vec_buffer)} buffered embeddings not written: {reason}",
+          file=sys.stderr)
+
+
+def _url_domain(url):
+    """Lowercased host of url with 'www.' removed. A plain split is all
+    that's needed here and is much cheaper than urllib's urlparse().
+    Protocol-relative URLs ('//host/path') have a host too, as in urlparse."""
+    if '://' not in url and not url.startswith('//'):
+        return ''
+    host = url.split('/', 3)[2].partition('?')[0].partition('#')[0]
+    return host.lower().replace('www.', '')
+
 
 class KnowledgeBase:
     """Minimal KB with entities, links, and task backlog."""
     
-    def __init__(self, db_path: str = "knowledge-base/kb.db"):
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path: str = "knowledge-base/kb.db", *, vec_int8: bool = False):
+        """vec_int8: when creating a new sqlite-vec table, store embeddings
+        as int8[384] (384 bytes) rather than float[384] (1536 bytes), ranked
+        by cosine distance. Existing vector tables keep their element type."""
+        self.db_path = db_path
+        self._vec_int8 = vec_int8
+        # Single writer connection, shareable across threads; writes are
+        # serialized by _write_lock. Reads go through per-thread read-only
+        # connections (see _reader) so they don't queue behind writers.
+        self.conn = sqlite3.connect(
+            db_path, cached_statements=_STATEMENT_CACHE_SIZE, check_same_thread=False
+        )
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = []
+        # Unclosed KBs still get PRAGMA optimize and a clean close
+        self._finalizer = weakref.finalize(self, _close_connections, self.conn, self._readers)
         self.conn.row_factory = sqlite3.Row
         # Enable WAL for concurrent read+write and faster writes
         self.conn.execute("PRAGMA journal_mode=WAL")
@@ -25,192 +544,210 @@ class KnowledgeBase:
         self.conn.execute("PRAGMA foreign_keys=ON")
         # Balanced durability — safe with WAL
         self.conn.execute("PRAGMA synchronous=NORMAL")
-        # Load sqlite-vec extension if available
-        self._vec_available = False
+        # Keep temp B-trees (sorts, GROUP BY) off disk
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        # Memory-map up to 256 MB of the DB file for reads
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        # 64 MB page cache (negative value = KiB)
+        self.conn.execute("PRAGMA cache_size=-65536")
+        # Checkpoint the WAL every ~40 MB of pages rather than every ~4 MB
+        self.conn.execute("PRAGMA wal_autocheckpoint=10000")
+        # Vector index extensions, if installed: vectorlite (HNSW) and
+        # sqlite-vec (brute-force vec0). _init_tables picks the backend.
+        self._vec_modules = set()
+        try:
+            import vectorlite_py
+            self.conn.enable_load_extension(True)
+            self.conn.load_extension(vectorlite_py.vectorlite_path())
+            self.conn.enable_load_extension(False)
+            self._vec_modules.add('vectorlite')
+        except (ImportError, Exception):
+            pass
         try:
             import sqlite_vec
             sqlite_vec.load(self.conn)
-            self._vec_available = True
+            self._vec_modules.add('vec0')
         except (ImportError, Exception):
             pass
+        self._vec_backend = None
+        self._vec_available = False
         self._embedding_model = None
+        # Per-instance Thompson sampling RNG: a numpy Generator draws all gap
+        # scores in one vectorized call; without numpy, a private Random
+        self._rng = np.random.default_rng() if np is not None else random.Random()
+        # Write-behind buffer for single embeds: (table, source_id) -> (hash, vector).
+        # Written at _VEC_FLUSH_SIZE entries, by flush_embeddings()/close(),
+        # or by the finalizer (see below); unwritten on a hard exit.
+        self._vec_buffer = {}
+        # Nesting depth of bulk() blocks, and the thread that opened the
+        # outermost one. Only that thread's writes join its transaction.
+        self._in_bulk = 0
+        self._bulk_owner = None
+        self._bulk_now = None
         self._init_tables()
+        if self._vec_available:
+            # Now that the backend is known, let the finalizer also write
+            # embeddings still buffered when an unclosed KB goes away
+            self._finalizer.detach()
+            self._finalizer = weakref.finalize(
+                self, _close_connections, self.conn, self._readers, self._vec_buffer, self._vec_backend
+            )
+        # Analyze any table whose indexes lack statistics (cheap when they
+        # exist); close() refreshes them again for long-lived sessions.
+        self.conn.execute("PRAGMA optimize=0x10002")
     
     def _init_tables(self):
-        """Create tables if they don't exist."""
-        self.conn.executescript("""
-            CREATE TABLE IF NOT EXISTS entities (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                content TEXT,
-                metadata TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            );
-            
-            CREATE TABLE IF NOT EXISTS links (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_id TEXT NOT NULL,
-                to_id TEXT NOT NULL,
-                link_type TEXT DEFAULT 'related',
-                created_at TEXT NOT NULL,
-                FOREIGN KEY(from_id) REFERENCES entities(id) ON DELETE CASCADE,
-                FOREIGN KEY(to_id) REFERENCES entities(id) ON DELETE CASCADE,
-                UNIQUE(from_id, to_id, link_type)
-            );
-            
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                status TEXT DEFAULT 'pending',
-                entity_id TEXT,
-                metadata TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE SET NULL
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_links_from ON links(from_id);
-            CREATE INDEX IF NOT EXISTS idx_links_to ON links(to_id);
-            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
-            CREATE INDEX IF NOT EXISTS idx_tasks_entity ON tasks(entity_id);
-            
-            CREATE TABLE IF NOT EXISTS evaluations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                parent_id TEXT NOT NULL,
-                iteration INTEGER DEFAULT 1,
-                max_iterations INTEGER DEFAULT 5,
-                status TEXT DEFAULT 'evaluating',
-                confidence REAL DEFAULT 0.0,
-                gaps TEXT DEFAULT '[]',
-                contradictions TEXT DEFAULT '[]',
-                convergence_criteria TEXT DEFAULT '{}',
-                confidence_history TEXT DEFAULT '[]',
-                gap_thompson_params TEXT DEFAULT '{}',
-                decision TEXT,
-                rationale TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY(parent_id) REFERENCES entities(id) ON DELETE CASCADE
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_evaluations_parent ON evaluations(parent_id);
-            CREATE INDEX IF NOT EXISTS idx_evaluations_status ON evaluations(status);
-            
-            CREATE TABLE IF NOT EXISTS sources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT NOT NULL,
-                title TEXT,
-                domain TEXT,
-                snippet TEXT,
-                credibility REAL DEFAULT 0.5,
-                source_type TEXT DEFAULT 'web',
-                accessed_at TEXT NOT NULL,
-                metadata TEXT DEFAULT '{}',
-                UNIQUE(url)
-            );
-            
-            CREATE TABLE IF NOT EXISTS claims (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                claim_text TEXT NOT NULL,
-                entity_id TEXT,
-                evidence_grade TEXT DEFAULT 'ungraded',
-                confidence REAL DEFAULT 0.5,
-                status TEXT DEFAULT 'active',
-                metadata TEXT DEFAULT '{}',
-                created_at TEXT NOT NULL,
-                FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE SET NULL
-            );
-            
-            CREATE TABLE IF NOT EXISTS claim_sources (
-                claim_id INTEGER NOT NULL,
-                source_id INTEGER NOT NULL,
-                relationship TEXT DEFAULT 'supports',
-                PRIMARY KEY(claim_id, source_id),
-                FOREIGN KEY(claim_id) REFERENCES claims(id) ON DELETE CASCADE,
-                FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_sources_domain ON sources(domain);
-            CREATE INDEX IF NOT EXISTS idx_sources_credibility ON sources(credibility);
-            CREATE INDEX IF NOT EXISTS idx_claims_entity ON claims(entity_id);
-            CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status);
-            CREATE INDEX IF NOT EXISTS idx_claims_grade ON claims(evidence_grade);
-            
-            CREATE TABLE IF NOT EXISTS traces (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entity_id TEXT,
-                step_num INTEGER DEFAULT 1,
-                action TEXT NOT NULL,
-                input TEXT,
-                output TEXT,
-                reasoning TEXT,
-                tool_used TEXT,
-                duration_ms INTEGER,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS decisions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entity_id TEXT,
-                title TEXT NOT NULL,
-                criteria TEXT DEFAULT '[]',
-                alternatives TEXT DEFAULT '[]',
-                scores TEXT DEFAULT '{}',
-                weights TEXT DEFAULT '{}',
-                recommendation TEXT,
-                rationale TEXT,
-                status TEXT DEFAULT 'draft',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE SET NULL
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_traces_entity ON traces(entity_id);
-            CREATE INDEX IF NOT EXISTS idx_decisions_entity ON decisions(entity_id);
-            CREATE INDEX IF NOT EXISTS idx_decisions_status ON decisions(status);
-        """)
-        # FTS5 virtual table for full-text search with porter stemming
-        self.conn.executescript("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(
-                title, content, entity_id UNINDEXED,
-                tokenize='porter unicode61'
-            );
-            CREATE VIRTUAL TABLE IF NOT EXISTS claims_fts USING fts5(
-                claim_text, claim_id UNINDEXED,
-                tokenize='porter unicode61'
-            );
-        """)
-        # sqlite-vec tables (only if extension loaded)
+        """Create tables if they don't exist.
+
+        All DDL runs as one script inside a single BEGIN/COMMIT, so a
+        first open pays for one commit instead of one per statement."""
+        # Both FTS5 indexes are external-content over their base tables (no
+        # duplicate text) and kept in sync by triggers. Older DBs carry
+        # standalone copies keyed by id — drop them and rebuild in bulk.
+        fts_sql = dict(self.conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE name IN ('entities_fts', 'claims_fts')"
+        ).fetchall())
+        rebuild_fts = [
+            name for name, base in (('entities_fts', 'entities'), ('claims_fts', 'claims'))
+            if f"content='{base}'" not in fts_sql.get(name, '')
+        ]
+        script = ["BEGIN;", _SQL_SCHEMA]
+        claim_cols = {r[1] for r in self.conn.execute("PRAGMA table_info(claims)")}
+        if claim_cols:
+            script.extend(
+                f"ALTER TABLE claims ADD COLUMN {name} {decl};"
+                for name, decl in _CLAIMS_ADDED_COLUMNS if name not in claim_cols
+            )
+        script.append(_SQL_CLAIMS_ADDED_INDEXES)
+        script.extend(f"DROP TABLE {name};" for name in rebuild_fts if name in fts_sql)
+        # FTS5 virtual tables for full-text search with porter stemming
+        script.append(_SQL_SCHEMA_FTS)
+        # Vector tables (only if an extension loaded). An existing table
+        # keeps its backend; new ones prefer the HNSW index over vec0.
+        vec_row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'vec_embeddings'"
+        ).fetchone()
+        if vec_row is not None:
+            sql = vec_row[0].lower()
+            module = 'vectorlite' if 'vectorlite' in sql else 'vec0'
+            backend = 'vec0_int8' if 'int8[' in sql else module
+            self._vec_backend = backend if module in self._vec_modules else None
+        elif 'vectorlite' in self._vec_modules:
+            self._vec_backend = 'vectorlite'
+            script.append(_sql_create_vectorlite(self.db_path))
+        elif 'vec0' in self._vec_modules and self._vec_int8:
+            self._vec_backend = 'vec0_int8'
+            script.append(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings "
+                "USING vec0(embedding int8[384] distance_metric=cosine);"
+            )
+        elif 'vec0' in self._vec_modules:
+            self._vec_backend = 'vec0'
+            script.append("CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0(embedding float[384]);")
+        self._vec_available = self._vec_backend is not None
         if self._vec_available:
-            try:
-                self.conn.execute("SELECT rowid FROM vec_embeddings LIMIT 0")
-            except sqlite3.OperationalError:
-                self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0(embedding float[384])")
-            self.conn.executescript("""
-                CREATE TABLE IF NOT EXISTS embedding_map (
-                    vec_rowid INTEGER PRIMARY KEY,
-                    source_table TEXT NOT NULL,
-                    source_id TEXT NOT NULL,
-                    text_hash TEXT,
-                    embedded_at TEXT NOT NULL,
-                    UNIQUE(source_table, source_id)
-                );
-                CREATE INDEX IF NOT EXISTS idx_embedding_map_source
-                    ON embedding_map(source_table, source_id);
-            """)
-        self.conn.commit()
-        # Populate FTS indexes from existing data if empty
-        self._sync_fts_indexes()
+            script.append(_SQL_SCHEMA_EMBEDDING_MAP)
+        script.extend(f"INSERT INTO {name} ({name}) VALUES ('rebuild');" for name in rebuild_fts)
+        script.append("COMMIT;")
+        try:
+            self.conn.executescript("\n".join(script))
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
 
     # ── Helper abstractions ─────────────────────────────────────────────
 
     def _now(self):
-        """Timestamp helper — single source for UTC ISO timestamps."""
+        """Timestamp helper — single source for UTC ISO timestamps.
+        Inside bulk() the whole transaction shares one timestamp."""
+        if self._bulk_owner == threading.get_ident():
+            if self._bulk_now is None:
+                self._bulk_now = datetime.utcnow().isoformat()
+            return self._bulk_now
         return datetime.utcnow().isoformat()
 
+    def _reader(self):
+        """Connection for read-only queries on the calling thread.
+
+        Returns a lazily opened per-thread read-only connection. Falls back
+        to the writer inside the calling thread's own bulk() block, so it
+        sees its uncommitted writes; other threads keep their readers and
+        see only committed data. In-memory DBs have just the one connection,
+        so every thread reads through the writer there."""
+        if self._bulk_owner == threading.get_ident() or self.db_path in (":memory:", ""):
+            return self.conn
+        reader = getattr(self._local, 'conn', None)
+        if reader is None:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            reader = sqlite3.connect(
+                uri, uri=True, cached_statements=_STATEMENT_CACHE_SIZE, check_same_thread=False
+            )
+            reader.row_factory = sqlite3.Row
+            # Belt and braces on top of mode=ro: refuse writes at the
+            # connection level too
+            reader.execute("PRAGMA query_only=ON")
+            reader.execute("PRAGMA temp_store=MEMORY")
+            reader.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = reader
+            self._readers.append(reader)
+        return reader
+
+    def _raw_execute(self, sql, params=(), conn=None):
+        """Execute on a cursor that yields plain tuples, skipping sqlite3.Row
+        construction. For scalar and id-only queries (counts, tree walks)."""
+        cur = (conn or self.conn).cursor()
+        cur.row_factory = None
+        return cur.execute(sql, params)
+
+    @contextmanager
+    def bulk(self):
+        """Group many writes into one transaction (one fsync).
+
+            with kb.bulk():
+                for note in notes:
+                    kb.add_entity(note['title'], note['content'])
+
+        Nested bulk() blocks join the outermost transaction. Any exception
+        rolls the whole transaction back. Holds the write lock throughout;
+        every mutator writes inside bulk(), so other threads' writes wait
+        for the lock instead of landing in this transaction."""
+        with self._write_lock:
+            if not self._in_bulk:
+                self._bulk_now = None
+                if not self.conn.in_transaction:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                self._bulk_owner = threading.get_ident()
+            self._in_bulk += 1
+            try:
+                yield self
+            except BaseException:
+                self._in_bulk -= 1
+                if not self._in_bulk:
+                    self._bulk_owner = None
+                    self.conn.rollback()
+                raise
+            self._in_bulk -= 1
+            if not self._in_bulk:
+                self._bulk_owner = None
+                self.conn.commit()
+
+    # Mixed-write batches read better as a transaction than a "bulk" load:
+    #   with kb.transaction():
+    #       eid = kb.add_entity(...); kb.add_link(parent, eid); kb.add_claim(...)
+    transaction = bulk
+
+    @staticmethod
+    def _iter_rows(cursor, mapper, batch_size=512):
+        """Stream cursor rows through mapper in fetchmany() batches, so the
+        raw result set is never materialized alongside the mapped one."""
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            for row in batch:
+                yield mapper(row)
+
     def _require_entity(self, entity_id):
         """Guard helper — returns entity dict or None."""
         return self.get_entity(entity_id)
@@ -219,53 +756,42 @@ class KnowledgeBase:
         """Generic BFS tree walker over child/wave/spawned links.
         Calls visitor_fn(entity_id, depth) at each node. Returns collected results."""
         results = []
-        visited = {root_id}
-        queue = [(root_id, 0)]
-        while queue:
-            current, depth = queue.pop(0)
-            result = visitor_fn(current, depth)
+        for node_id, depth in self._raw_execute(_SQL_WALK_TREE, (root_id,)):
+            result = visitor_fn(node_id, depth)
             if result is not None:
                 results.append(result)
-            children = self.conn.execute(
-                "SELECT to_id FROM links WHERE from_id = ? AND link_type IN ('child', 'wave', 'spawned')",
-                (current,)
-            ).fetchall()
-            for row in children:
-                child_id = row['to_id']
-                if child_id not in visited:
-                    visited.add(child_id)
-                    queue.append((child_id, depth + 1))
         return results
 
     def _fts_query(self, table, query, limit=20):
         """Unified FTS search with LIKE fallback.
         table: 'entities' or 'claims'. Returns list of sqlite3.Row."""
+        db = self._reader()
         if table == 'entities':
             try:
-                return self.conn.execute("""
-                    SELECT e.* FROM entities e
-                    JOIN entities_fts f ON f.entity_id = e.id
+                return db.execute("""
+                    SELECT e.* FROM entities_fts f
+                    JOIN entities e ON e.rowid = f.rowid
                     WHERE entities_fts MATCH ?
                     ORDER BY rank LIMIT ?
                 """, (query, limit)).fetchall()
             except sqlite3.OperationalError:
                 search_term = f"%{query}%"
-                return self.conn.execute("""
+                return db.execute("""
                     SELECT * FROM entities
                     WHERE title LIKE ? OR content LIKE ?
                     ORDER BY created_at DESC LIMIT ?
                 """, (search_term, search_term, limit)).fetchall()
         elif table == 'claims':
             try:
-                return self.conn.execute("""
+                return db.execute("""
                     SELECT c.* FROM claims c
-                    JOIN claims_fts f ON CAST(f.claim_id AS INTEGER) = c.id
+                    JOIN claims_fts f ON f.rowid = c.id
                     WHERE claims_fts MATCH ?
                     ORDER BY rank LIMIT ?
                 """, (query, limit)).fetchall()
             except sqlite3.OperationalError:
                 search_term = f"%{query}%"
-                return self.conn.execute("""
+                return db.execute("""
                     SELECT * FROM claims
                     WHERE claim_text LIKE ?
                     ORDER BY created_at DESC LIMIT ?
@@ -282,28 +808,6 @@ class KnowledgeBase:
         children = self.get_links_from(entity_id)
         return entity, claims, children
 
-    def _sync_fts_indexes(self):
-        """Rebuild FTS indexes from existing data if they're empty."""
-        fts_count = self.conn.execute("SELECT COUNT(*) FROM entities_fts").fetchone()[0]
-        entity_count = self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
-        if entity_count > 0 and fts_count == 0:
-            rows = self.conn.execute("SELECT id, title, content FROM entities").fetchall()
-            for r in rows:
-                self.conn.execute(
-                    "INSERT INTO entities_fts (title, content, entity_id) VALUES (?, ?, ?)",
-                    (r['title'], r['content'], r['id'])
-                )
-        fts_count = self.conn.execute("SELECT COUNT(*) FROM claims_fts").fetchone()[0]
-        claim_count = self.conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
-        if claim_count > 0 and fts_count == 0:
-            rows = self.conn.execute("SELECT id, claim_text FROM claims").fetchall()
-            for r in rows:
-                self.conn.execute(
-                    "INSERT INTO claims_fts (claim_text, claim_id) VALUES (?, ?)",
-                    (r['claim_text'], str(r['id']))
-                )
-        self.conn.commit()
-    
     def add_entity(
         self, 
         title: str, 
@@ -311,22 +815,29 @@ class KnowledgeBase:
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """Add an entity (research note). Returns entity ID."""
-        entity_id = str(uuid.uuid4())[:12]
-        now = self._now()
-        meta_json = json.dumps(metadata or {})
-        
-        self.conn.execute(
-            "INSERT INTO entities (id, title, content, metadata, created_at, updated_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (entity_id, title, content, meta_json, now, now)
-        )
-        # Update FTS index
-        self.conn.execute(
-            "INSERT INTO entities_fts (title, content, entity_id) VALUES (?, ?, ?)",
-            (title, content, entity_id)
-        )
-        self.conn.commit()
-        return entity_id
+        return self.add_entities([
+            {'title': title, 'content': content, 'metadata': metadata}
+        ])[0]
+
+    def add_entities(self, items: Iterable[Dict[str, Any]]) -> List[str]:
+        """Add many entities in one transaction. Returns entity IDs in order.
+
+        Each item is a dict with 'title' and optional 'content'/'metadata'.
+        items may be any iterable (e.g. a generator over a file); rows are
+        streamed into executemany() rather than built up front.
+        Prefer this over repeated add_entity() calls for bulk ingest."""
+        ids = []
+
+        def rows(now):
+            for item in items:
+                eid = token_hex(6)
+                ids.append(eid)
+                yield (eid, item['title'], item.get('content', ""),
+                       dump_meta(item.get('metadata')), now, now)
+
+        with self.bulk():
+            self.conn.executemany(_SQL_INSERT_ENTITY, rows(self._now()))
+        return ids
     
     def update_entity(
         self, 
@@ -336,42 +847,27 @@ class KnowledgeBase:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """Update an existing entity."""
-        updates = []
+        mask = 0
         params = []
-        
         if title is not None:
-            updates.append("title = ?")
+            mask |= 0b001
             params.append(title)
         if content is not None:
-            updates.append("content = ?")
+            mask |= 0b010
             params.append(content)
         if metadata is not None:
-            updates.append("metadata = ?")
-            params.append(json.dumps(metadata))
+            mask |= 0b100
+            params.append(dump_meta(metadata))
         
-        if updates:
-            updates.append("updated_at = ?")
+        if mask:
             params.append(self._now())
             params.append(entity_id)
-            
-            query = f"UPDATE entities SET {', '.join(updates)} WHERE id = ?"
-            self.conn.execute(query, params)
-            # Update FTS index
-            if title is not None or content is not None:
-                entity = self.get_entity(entity_id)
-                if entity:
-                    self.conn.execute(
-                        "DELETE FROM entities_fts WHERE entity_id = ?", (entity_id,)
-                    )
-                    self.conn.execute(
-                        "INSERT INTO entities_fts (title, content, entity_id) VALUES (?, ?, ?)",
-                        (entity['title'], entity['content'], entity_id)
-                    )
-            self.conn.commit()
+            with self.bulk():
+                self.conn.execute(_SQL_UPDATE_ENTITY[mask], params)
     
     def get_entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
         """Get an entity by ID."""
-        row = self.conn.execute(
+        row = self._reader().execute(
             "SELECT * FROM entities WHERE id = ?", (entity_id,)
         ).fetchone()
         
@@ -380,7 +876,7 @@ class KnowledgeBase:
                 'id': row['id'],
                 'title': row['title'],
                 'content': row['content'],
-                'metadata': json.loads(row['metadata']),
+                'metadata': load_meta(row['metadata']),
                 'created_at': row['created_at'],
                 'updated_at': row['updated_at']
             }
@@ -394,56 +890,122 @@ class KnowledgeBase:
     ) -> Optional[int]:
         """Add a link between entities. Returns link ID or None if already exists."""
         try:
-            cursor = self.conn.execute(
-                "INSERT INTO links (from_id, to_id, link_type, created_at) "
-                "VALUES (?, ?, ?, ?)",
-                (from_id, to_id, link_type, self._now())
-            )
-            self.conn.commit()
+            # bulk() rolls the failed INSERT back, so a duplicate doesn't
+            # leave the write transaction open
+            with self.bulk():
+                cursor = self.conn.execute(
+                    _SQL_INSERT_LINK,
+                    (from_id, to_id, link_type, self._now())
+                )
             return cursor.lastrowid
         except sqlite3.IntegrityError:
             # Link already exists
             return None
     
+    def add_links(self, items: Iterable[Tuple]) -> int:
+        """Add many links in one transaction. Items are (from_id, to_id[, link_type])
+        from any iterable. Existing links are skipped. Returns number of links created."""
+        with self.bulk():
+            now = self._now()
+            before = self.conn.total_changes
+            self.conn.executemany(_SQL_INSERT_LINK_IGNORE, (
+                (it[0], it[1], it[2] if len(it) > 2 else "related", now)
+                for it in items
+            ))
+            return self.conn.total_changes - before
+    
     def get_links_from(self, entity_id: str) -> List[Dict[str, Any]]:
-        """Get all entities linked FROM this entity."""
-        rows = self.conn.execute("""
+        """Get all entities linked FROM this entity (id, title, link_type).
+        Use get_links_from_full() when content/metadata are needed."""
+        cursor = self._reader().execute(_SQL_LINKS_FROM, (entity_id,))
+        return list(self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'link_type': row['link_type']
+        }))
+    
+    def get_links_to(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Get all entities that link TO this entity (id, title, link_type).
+        Use get_links_to_full() when content/metadata are needed."""
+        cursor = self._reader().execute(_SQL_LINKS_TO, (entity_id,))
+        return list(self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'link_type': row['link_type']
+        }))
+
+    def get_links_from_full(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Like get_links_from(), with each entity's content and metadata."""
+        cursor = self._reader().execute("""
             SELECT e.*, l.link_type
             FROM entities e
             JOIN links l ON e.id = l.to_id
             WHERE l.from_id = ?
-        """, (entity_id,)).fetchall()
-        
-        return [
-            {
-                'id': row['id'],
-                'title': row['title'],
-                'content': row['content'],
-                'metadata': json.loads(row['metadata']),
-                'link_type': row['link_type']
-            }
-            for row in rows
-        ]
+        """, (entity_id,))
+
+        return list(self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'],
+            'metadata': load_meta(row['metadata']),
+            'link_type': row['link_type']
+        }))
     
-    def get_links_to(self, entity_id: str) -> List[Dict[str, Any]]:
-        """Get all entities that link TO this entity."""
-        rows = self.conn.execute("""
+    def get_links_to_full(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Like get_links_to(), with each entity's content and metadata."""
+        cursor = self._reader().execute("""
             SELECT e.*, l.link_type
             FROM entities e
             JOIN links l ON e.id = l.from_id
             WHERE l.to_id = ?
-        """, (entity_id,)).fetchall()
-        
-        return [
-            {
+        """, (entity_id,))
+
+        return list(self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'],
+            'metadata': load_meta(row['metadata']),
+            'link_type': row['link_type']
+        }))
+    
+    def get_entity_with_neighbors(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Get an entity plus both link directions in one query.
+        Returns the get_entity() dict with 'links_from' and 'links_to' lists
+        shaped like get_links_from()/get_links_to(), or None."""
+        rows = self._reader().execute("""
+            SELECT 'self' AS rel, NULL AS link_type, e.id, e.title,
+                   e.content, e.metadata, e.created_at, e.updated_at
+            FROM entities e WHERE e.id = ?
+            UNION ALL
+            SELECT 'from', l.link_type, e.id, e.title, NULL, NULL, NULL, NULL
+            FROM links l JOIN entities e ON e.id = l.to_id
+            WHERE l.from_id = ?
+            UNION ALL
+            SELECT 'to', l.link_type, e.id, e.title, NULL, NULL, NULL, NULL
+            FROM links l JOIN entities e ON e.id = l.from_id
+            WHERE l.to_id = ?
+        """, (entity_id, entity_id, entity_id)).fetchall()
+        if not rows or rows[0]['rel'] != 'self':
+            return None
+
+        node = rows[0]
+        entity = {
+            'id': node['id'],
+            'title': node['title'],
+            'content': node['content'],
+            'metadata': load_meta(node['metadata']),
+            'created_at': node['created_at'],
+            'updated_at': node['updated_at'],
+            'links_from': [],
+            'links_to': []
+        }
+        for row in rows[1:]:
+            entity['links_from' if row['rel'] == 'from' else 'links_to'].append({
                 'id': row['id'],
                 'title': row['title'],
-                'content': row['content'],
-                'metadata': json.loads(row['metadata']),
                 'link_type': row['link_type']
-            }
-            for row in rows
-        ]
+            })
+        return entity
     
     def add_task(
         self,
@@ -453,24 +1015,38 @@ class KnowledgeBase:
         metadata: Optional[Dict[str, Any]] = None
     ) -> int:
         """Add a task to the backlog. Returns task ID."""
-        now = self._now()
-        meta_json = json.dumps(metadata or {})
-        
-        cursor = self.conn.execute(
-            "INSERT INTO tasks (title, description, entity_id, metadata, created_at, updated_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (title, description, entity_id, meta_json, now, now)
-        )
-        self.conn.commit()
-        return cursor.lastrowid
+        return self.add_tasks([{
+            'title': title, 'description': description,
+            'entity_id': entity_id, 'metadata': metadata
+        }])[0]
+
+    def add_tasks(self, items: Iterable[Dict[str, Any]]) -> List[int]:
+        """Add many tasks in one transaction. Returns task IDs in order.
+
+        Each item is a dict with 'title' and optional 'description',
+        'entity_id' and 'metadata'; items may be any iterable."""
+        with self.bulk():
+            now = self._now()
+            count = self.conn.executemany(_SQL_INSERT_TASK, (
+                (item['title'], item.get('description', ""), item.get('entity_id'),
+                 dump_meta(item.get('metadata')), now, now)
+                for item in items
+            )).rowcount
+            if count <= 0:
+                return []
+            # AUTOINCREMENT ids are consecutive within a single write transaction
+            last = self.conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'"
+            ).fetchone()[0]
+        return list(range(last - count + 1, last + 1))
     
     def update_task_status(self, task_id: int, status: str):
         """Update task status (pending, in_progress, completed, cancelled)."""
-        self.conn.execute(
-            "UPDATE tasks SET status = ?, updated_at = ? WHERE id = ?",
-            (status, self._now(), task_id)
-        )
-        self.conn.commit()
+        with self.bulk():
+            self.conn.execute(
+                _SQL_UPDATE_TASK_STATUS,
+                (status, self._now(), task_id)
+            )
     
     def get_tasks(
         self, 
@@ -481,98 +1057,85 @@ class KnowledgeBase:
         query = "SELECT * FROM tasks WHERE 1=1"
         params = []
         
-        if status:
-            query += " AND status = ?"
-            params.append(status)
-        if entity_id:
-            query += " AND entity_id = ?"
-            params.append(entity_id)
-        
-        query += " ORDER BY created_at DESC"
+        if status == 'pending' and not entity_id:
+            # Backlog polling — walk the small partial index, already sorted
+            query = _SQL_PENDING_TASKS
+        else:
+            if status:
+                query += " AND status = ?"
+                params.append(status)
+            if entity_id:
+                query += " AND entity_id = ?"
+                params.append(entity_id)
+            
+            query += " ORDER BY created_at DESC"
         
-        rows = self.conn.execute(query, params).fetchall()
-        return [
-            {
-                'id': row['id'],
-                'title': row['title'],
-                'description': row['description'],
-                'status': row['status'],
-                'entity_id': row['entity_id'],
-                'metadata': json.loads(row['metadata']),
-                'created_at': row['created_at'],
-                'updated_at': row['updated_at']
-            }
-            for row in rows
-        ]
+        cursor = self._reader().execute(query, params)
+        return list(self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'status': row['status'],
+            'entity_id': row['entity_id'],
+            'metadata': load_meta(row['metadata']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }))
     
     def search_entities(self, query: str) -> List[Dict[str, Any]]:
         """Full-text search across entity titles and content using FTS5."""
+        # Only a 200-char preview is returned; substr() keeps the rest of a
+        # long content value (and its overflow pages) inside SQLite. One
+        # extra char is fetched to know whether to append '...'.
         try:
-            rows = self.conn.execute("""
-                SELECT e.* FROM entities e
-                JOIN entities_fts f ON f.entity_id = e.id
+            cursor = self._reader().execute("""
+                SELECT e.id, e.title, substr(e.content, 1, 201) AS content, e.metadata
+                FROM entities_fts f
+                JOIN entities e ON e.rowid = f.rowid
                 WHERE entities_fts MATCH ?
                 ORDER BY rank
-            """, (query,)).fetchall()
+            """, (query,))
         except sqlite3.OperationalError:
             # Fallback to LIKE if FTS fails (special chars, etc.)
             search_term = f"%{query}%"
-            rows = self.conn.execute("""
-                SELECT * FROM entities 
+            cursor = self._reader().execute("""
+                SELECT id, title, substr(content, 1, 201) AS content, metadata
+                FROM entities 
                 WHERE title LIKE ? OR content LIKE ?
                 ORDER BY created_at DESC
-            """, (search_term, search_term)).fetchall()
+            """, (search_term, search_term))
         
-        return [
-            {
-                'id': row['id'],
-                'title': row['title'],
-                'content': row['content'][:200] + '...' if len(row['content']) > 200 else row['content'],
-                'metadata': json.loads(row['metadata'])
-            }
-            for row in rows
-        ]
+        return list(self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'][:200] + '...' if len(row['content']) > 200 else row['content'],
+            'metadata': load_meta(row['metadata'])
+        }))
     
     def list_entities(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """List all entities, optionally limited."""
-        query = "SELECT * FROM entities ORDER BY created_at DESC"
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        rows = self.conn.execute(query).fetchall()
-        return [
-            {
-                'id': row['id'],
-                'title': row['title'],
-                'content': row['content'][:100] + '...' if len(row['content']) > 100 else row['content'],
-                'metadata': json.loads(row['metadata']),
-                'created_at': row['created_at']
-            }
-            for row in rows
-        ]
+        return list(self.iter_entities(limit))
+
+    def iter_entities(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Generator form of list_entities() — rows are mapped as fetched."""
+        # LIMIT -1 means no limit — one cached statement for every call
+        cursor = self._reader().execute(_SQL_LIST_ENTITIES, (limit if limit else -1,))
+        return self._iter_rows(cursor, lambda row: {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'][:100] + '...' if len(row['content']) > 100 else row['content'],
+            'metadata': load_meta(row['metadata']),
+            'created_at': row['created_at']
+        })
     
     def get_stats(self) -> Dict[str, int]:
         """Get knowledge base statistics."""
-        entity_count = self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
-        link_count = self.conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
-        task_count = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
-        pending_tasks = self.conn.execute(
-            "SELECT COUNT(*) FROM tasks WHERE status = 'pending'"
-        ).fetchone()[0]
-        completed_tasks = self.conn.execute(
-            "SELECT COUNT(*) FROM tasks WHERE status = 'completed'"
-        ).fetchone()[0]
-        source_count = self.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
-        claim_count = self.conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
-        strong_claims = self.conn.execute(
-            "SELECT COUNT(*) FROM claims WHERE evidence_grade = 'strong'"
-        ).fetchone()[0]
-        contested_claims = self.conn.execute(
-            "SELECT COUNT(*) FROM claims WHERE evidence_grade = 'contested'"
-        ).fetchone()[0]
-        trace_count = self.conn.execute("SELECT COUNT(*) FROM traces").fetchone()[0]
-        decision_count = self.conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
-        
+        db = self._reader()
+        # Every counter in one round-trip; tasks and claims each take one pass
+        (entity_count, link_count, task_count, pending_tasks, completed_tasks,
+         source_count, claim_count, strong_claims, contested_claims,
+         trace_count, decision_count) = self._raw_execute(_SQL_STATS, conn=db).fetchone()
+
         return {
             'entities': entity_count,
             'links': link_count,
@@ -595,28 +1158,22 @@ class KnowledgeBase:
     ) -> int:
         """Add an evaluation loop tracker for a plan/swarm/pipeline. Returns eval ID."""
         now = self._now()
-        default_criteria = {
-            "min_confidence": 0.7,
-            "max_gaps": 2,
-            "max_contradictions": 0,
-            "marginal_gain_threshold": 0.02,
-            "marginal_gain_patience": 2
-        }
         if convergence_criteria:
-            default_criteria.update(convergence_criteria)
-        criteria = json.dumps(default_criteria)
-        cursor = self.conn.execute(
-            "INSERT INTO evaluations (parent_id, max_iterations, convergence_criteria, "
-            "confidence_history, gap_thompson_params, created_at, updated_at) "
-            "VALUES (?, ?, ?, '[]', '{}', ?, ?)",
-            (parent_id, max_iterations, criteria, now, now)
-        )
-        self.conn.commit()
+            criteria = dumps({**_DEFAULT_CONVERGENCE_CRITERIA, **convergence_criteria})
+        else:
+            criteria = _DEFAULT_CONVERGENCE_CRITERIA_JSON
+        with self.bulk():
+            cursor = self.conn.execute(
+                "INSERT INTO evaluations (parent_id, max_iterations, convergence_criteria, "
+                "confidence_history, gap_thompson_params, created_at, updated_at) "
+                "VALUES (?, ?, ?, '[]', '{}', ?, ?)",
+                (parent_id, max_iterations, criteria, now, now)
+            )
         return cursor.lastrowid
     
     def get_evaluation(self, eval_id: int) -> Optional[Dict[str, Any]]:
         """Get an evaluation by ID."""
-        row = self.conn.execute(
+        row = self._reader().execute(
             "SELECT * FROM evaluations WHERE id = ?", (eval_id,)
         ).fetchone()
         if row:
@@ -627,11 +1184,11 @@ class KnowledgeBase:
                 'max_iterations': row['max_iterations'],
                 'status': row['status'],
                 'confidence': row['confidence'],
-                'gaps': json.loads(row['gaps']),
-                'contradictions': json.loads(row['contradictions']),
-                'convergence_criteria': json.loads(row['convergence_criteria']),
-                'confidence_history': json.loads(row['confidence_history'] or '[]'),
-                'gap_thompson_params': json.loads(row['gap_thompson_params'] or '{}'),
+                'gaps': loads(row['gaps']),
+                'contradictions': loads(row['contradictions']),
+                'convergence_criteria': loads(row['convergence_criteria']),
+                'confidence_history': loads(row['confidence_history'] or '[]'),
+                'gap_thompson_params': loads(row['gap_thompson_params'] or '{}'),
                 'decision': row['decision'],
                 'rationale': row['rationale'],
                 'created_at': row['created_at'],
@@ -641,7 +1198,7 @@ class KnowledgeBase:
     
     def get_evaluations_for(self, parent_id: str) -> List[Dict[str, Any]]:
         """Get all evaluations for a parent entity."""
-        rows = self.conn.execute(
+        rows = self._reader().execute(
             "SELECT * FROM evaluations WHERE parent_id = ? ORDER BY iteration DESC",
             (parent_id,)
         ).fetchall()
@@ -652,8 +1209,8 @@ class KnowledgeBase:
                 'iteration': row['iteration'],
                 'status': row['status'],
                 'confidence': row['confidence'],
-                'gaps': json.loads(row['gaps']),
-                'contradictions': json.loads(row['contradictions']),
+                'gaps': loads(row['gaps']),
+                'contradictions': loads(row['contradictions']),
                 'decision': row['decision'],
                 'rationale': row['rationale']
             }
@@ -681,27 +1238,20 @@ class KnowledgeBase:
         updates = []
         params = []
         
-        # Track confidence history for marginal-gain stopping
+        # Track confidence history for marginal-gain stopping. The entry is
+        # appended in SQL (JSON1), so no read of the evaluation is needed;
+        # `iteration` here is the pre-update value.
         if confidence is not None:
             updates.append("confidence = ?")
             params.append(confidence)
-            # Append to confidence_history
-            ev = self.get_evaluation(eval_id)
-            if ev:
-                history = ev.get('confidence_history', [])
-                history.append({
-                    'iteration': ev['iteration'],
-                    'confidence': confidence,
-                    'delta': confidence - (history[-1]['confidence'] if history else 0.0)
-                })
-                updates.append("confidence_history = ?")
-                params.append(json.dumps(history))
+            updates.append(_SQL_APPEND_CONFIDENCE)
+            params.extend((confidence, confidence))
         if gaps is not None:
             updates.append("gaps = ?")
-            params.append(json.dumps(gaps))
+            params.append(dumps(gaps))
         if contradictions is not None:
             updates.append("contradictions = ?")
-            params.append(json.dumps(contradictions))
+            params.append(dumps(contradictions))
         if decision is not None:
             updates.append("decision = ?")
             params.append(decision)
@@ -715,32 +1265,38 @@ class KnowledgeBase:
             updates.append("iteration = ?")
             params.append(iteration)
         
-        # Update Thompson sampling parameters for gap topics
-        if gap_results is not None:
-            ev = ev if (confidence is not None and ev) else self.get_evaluation(eval_id)
-            if ev:
-                thompson = ev.get('gap_thompson_params', {})
-                for topic, delta in gap_results.items():
-                    if topic not in thompson:
-                        thompson[topic] = {'alpha': 1.0, 'beta': 1.0, 'attempts': 0, 'total_gain': 0.0}
-                    thompson[topic]['attempts'] += 1
-                    thompson[topic]['total_gain'] += delta
-                    # Treat delta > threshold as "success", else "failure"
-                    threshold = ev['convergence_criteria'].get('marginal_gain_threshold', 0.02)
-                    if delta >= threshold:
-                        thompson[topic]['alpha'] += 1.0
-                    else:
-                        thompson[topic]['beta'] += 1.0
-                updates.append("gap_thompson_params = ?")
-                params.append(json.dumps(thompson))
-        
-        if updates:
-            updates.append("updated_at = ?")
-            params.append(self._now())
-            params.append(eval_id)
-            query = f"UPDATE evaluations SET {', '.join(updates)} WHERE id = ?"
-            self.conn.execute(query, params)
-            self.conn.commit()
+        if not updates and gap_results is None:
+            return
+        with self.bulk():
+            # Update Thompson sampling parameters for gap topics — read and
+            # write inside one transaction, fetching only the two columns used
+            if gap_results is not None:
+                row = self.conn.execute(
+                    "SELECT gap_thompson_params, convergence_criteria FROM evaluations WHERE id = ?",
+                    (eval_id,)
+                ).fetchone()
+                if row:
+                    thompson = loads(row['gap_thompson_params'] or '{}')
+                    threshold = loads(row['convergence_criteria']).get('marginal_gain_threshold', 0.02)
+                    for topic, delta in gap_results.items():
+                        if topic not in thompson:
+                            thompson[topic] = dict(_GAP_PRIOR)
+                        thompson[topic]['attempts'] += 1
+                        thompson[topic]['total_gain'] += delta
+                        # Treat delta > threshold as "success", else "failure"
+                        if delta >= threshold:
+                            thompson[topic]['alpha'] += 1.0
+                        else:
+                            thompson[topic]['beta'] += 1.0
+                    updates.append("gap_thompson_params = ?")
+                    params.append(dumps(thompson))
+
+            if updates:
+                updates.append("updated_at = ?")
+                params.append(self._now())
+                params.append(eval_id)
+                query = f"UPDATE evaluations SET {', '.join(updates)} WHERE id = ?"
+                self.conn.execute(query, params)
     
     def check_convergence(self, eval_id: int) -> Dict[str, Any]:
         """Check if evaluation meets convergence criteria. Returns verdict.
@@ -748,11 +1304,21 @@ class KnowledgeBase:
         Includes marginal-gain stopping: stops early when confidence delta
         plateaus below threshold for `patience` consecutive iterations.
         """
-        ev = self.get_evaluation(eval_id)
-        if not ev:
+        # Only the columns the verdict uses — skips decoding the Thompson
+        # params, which grow with every gap topic
+        row = self._reader().execute(_SQL_CONVERGENCE_STATE, (eval_id,)).fetchone()
+        if not row:
             return {"converged": False, "reason": "evaluation not found"}
+        ev = {
+            'iteration': row['iteration'],
+            'max_iterations': row['max_iterations'],
+            'confidence': row['confidence'],
+            'gaps': loads(row['gaps']),
+            'contradictions': loads(row['contradictions']),
+            'confidence_history': loads(row['confidence_history'] or '[]'),
+        }
         
-        criteria = ev['convergence_criteria']
+        criteria = _parse_criteria(row['convergence_criteria'])
         min_conf = criteria.get('min_confidence', 0.7)
         max_gaps = criteria.get('max_gaps', 2)
         max_contradictions = criteria.get('max_contradictions', 0)
@@ -766,8 +1332,8 @@ class KnowledgeBase:
         # Marginal-gain stopping: check if recent deltas are all below threshold
         history = ev.get('confidence_history', [])
         marginal_gain_stop = False
+        recent_deltas = [h['delta'] for h in history[-mg_patience:]]
         if len(history) >= mg_patience:
-            recent_deltas = [h['delta'] for h in history[-mg_patience:]]
             if all(abs(d) < mg_threshold for d in recent_deltas):
                 marginal_gain_stop = True
         
@@ -787,7 +1353,6 @@ class KnowledgeBase:
         
         # Early stop on marginal gain plateau (even if not all criteria met)
         if marginal_gain_stop and not converged:
-            recent_deltas = [h['delta'] for h in history[-mg_patience:]]
             return {
                 "converged": True,
                 "reason": f"marginal_gain_plateau: last {mg_patience} deltas {recent_deltas} all < {mg_threshold}",
@@ -834,36 +1399,62 @@ class KnowledgeBase:
             List of dicts with 'topic', 'thompson_score', 'alpha', 'beta', 'attempts'.
             Ordered by descending Thompson sample score.
         """
-        ev = self.get_evaluation(eval_id)
-        if not ev:
+        row = self._reader().execute(
+            "SELECT gaps, gap_thompson_params FROM evaluations WHERE id = ?", (eval_id,)
+        ).fetchone()
+        if not row:
             return []
         
-        gaps = ev.get('gaps', [])
+        gaps = loads(row['gaps'])
         if not gaps:
             return []
         
-        thompson = ev.get('gap_thompson_params', {})
-        scored_gaps = []
-        
-        for topic in gaps:
-            params = thompson.get(topic, {'alpha': 1.0, 'beta': 1.0, 'attempts': 0, 'total_gain': 0.0})
-            alpha = params['alpha']
-            beta_param = params['beta'] + exploration_bonus
-            # Thompson sample: draw from Beta(α, β) posterior
-            score = random.betavariate(max(alpha, 0.01), max(beta_param, 0.01))
-            scored_gaps.append({
-                'topic': topic,
-                'thompson_score': round(score, 4),
-                'alpha': alpha,
-                'beta': params['beta'],
-                'attempts': params['attempts'],
-                'total_gain': params.get('total_gain', 0.0),
-                'expected_value': round(alpha / (alpha + params['beta']), 4)
-            })
-        
-        # Sort by Thompson sample (stochastic ranking)
-        scored_gaps.sort(key=lambda x: x['thompson_score'], reverse=True)
-        return scored_gaps[:n]
+        thompson = loads(row['gap_thompson_params'] or '{}')
+        arms = [thompson.get(topic, _GAP_PRIOR) for topic in gaps]
+        if np is not None:
+            # One Beta draw per arm in C, then partition out the top n
+            k = len(gaps)
+            if n <= 0:
+                return []
+            alphas = np.fromiter((a['alpha'] for a in arms), np.float64, k)
+            betas = np.fromiter((a['beta'] for a in arms), np.float64, k) + exploration_bonus
+            scores = self._rng.beta(np.maximum(alphas, 0.01), np.maximum(betas, 0.01))
+            if n == 1:
+                # Common single-arm step: just the winning draw
+                i = int(scores.argmax())
+                return [self._gap_arm(gaps[i], arms[i], scores[i])]
+            top = np.argpartition(-scores, n - 1)[:n] if n < k else np.arange(k)
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [self._gap_arm(gaps[i], arms[i], scores[i]) for i in top.tolist()]
+
+        # Thompson sample: draw from each Beta(α, β) posterior
+        betavariate = self._rng.betavariate
+        scores = [
+            betavariate(max(params['alpha'], 0.01),
+                        max(params['beta'] + exploration_bonus, 0.01))
+            for params in arms
+        ]
+        # Stochastic ranking: keep the n best draws (O(k log n)), building
+        # result entries only for those
+        if n == 1:
+            top = [max(range(len(scores)), key=scores.__getitem__)]
+        else:
+            top = heapq.nlargest(n, range(len(scores)), key=scores.__getitem__)
+        return [self._gap_arm(gaps[i], arms[i], scores[i]) for i in top]
+
+    @staticmethod
+    def _gap_arm(topic, params, score):
+        """Result entry for one gap topic and its Thompson sample."""
+        alpha = params['alpha']
+        return {
+            'topic': topic,
+            'thompson_score': round(float(score), 4),
+            'alpha': alpha,
+            'beta': params['beta'],
+            'attempts': params['attempts'],
+            'total_gain': params.get('total_gain', 0.0),
+            'expected_value': round(alpha / (alpha + params['beta']), 4)
+        }
     
     def register_gap_topics(self, eval_id: int, topics: List[str]):
         """Initialize Thompson sampling priors for a set of gap topics.
@@ -871,22 +1462,26 @@ class KnowledgeBase:
         Call this when gaps are first identified to set up Beta(1,1) uniform priors.
         Existing topics are not overwritten.
         """
-        ev = self.get_evaluation(eval_id)
-        if not ev:
-            return
-        thompson = ev.get('gap_thompson_params', {})
-        for topic in topics:
-            if topic not in thompson:
-                thompson[topic] = {'alpha': 1.0, 'beta': 1.0, 'attempts': 0, 'total_gain': 0.0}
-        self.conn.execute(
-            "UPDATE evaluations SET gap_thompson_params = ?, updated_at = ? WHERE id = ?",
-            (json.dumps(thompson), self._now(), eval_id)
-        )
-        self.conn.commit()
+        with self.bulk():
+            row = self.conn.execute(
+                "SELECT gap_thompson_params FROM evaluations WHERE id = ?", (eval_id,)
+            ).fetchone()
+            if not row:
+                return
+            thompson = loads(row['gap_thompson_params'] or '{}')
+            for topic in topics:
+                if topic not in thompson:
+                    thompson[topic] = dict(_GAP_PRIOR)
+            self.conn.execute(
+                "UPDATE evaluations SET gap_thompson_params = ?, updated_at = ? WHERE id = ?",
+                (dumps(thompson), self._now(), eval_id)
+            )
     
     # ── Domain credibility heuristics ──────────────────────────────────
 
-    DOMAIN_CREDIBILITY = {
+    # Read-only: _domain_trie() snapshots it once per class, so in-place
+    # edits would silently never be scored. Subclasses override wholesale.
+    DOMAIN_CREDIBILITY = MappingProxyType({
         # Tier 1: Primary academic / institutional (0.9-1.0)
         'nature.com': 0.95, 'science.org': 0.95, 'sciencedirect.com': 0.93,
         'arxiv.org': 0.88, 'pubmed.ncbi.nlm.nih.gov': 0.92, 'nih.gov': 0.92,
@@ -909,31 +1504,52 @@ class KnowledgeBase:
         # Tier 4: Blogs / unknown (0.3-0.5)
         'medium.com': 0.45, 'substack.com': 0.45,
         'reddit.com': 0.35, 'quora.com': 0.35,
-    }
+    })
 
     # Delegated constants (defined in extracted modules)
-    from researcher.kb_router import COORDINATOR_PROFILES
-    from researcher.kb_domains import DOMAIN_PROFILES
+    COORDINATOR_PROFILES = kb_router.COORDINATOR_PROFILES
+    DOMAIN_PROFILES = kb_domains.DOMAIN_PROFILES
+
+    @classmethod
+    def _domain_trie(cls) -> Dict[Any, Any]:
+        """DOMAIN_CREDIBILITY as a trie over reversed labels ('nature.com' ->
+        com -> nature), built once per class. A node's score sits under the
+        None key, which no label can collide with."""
+        trie = cls.__dict__.get('_DOMAIN_TRIE')
+        if trie is None:
+            trie = {}
+            for known, score in cls.DOMAIN_CREDIBILITY.items():
+                node = trie
+                for label in reversed(known.split('.')):
+                    node = node.setdefault(label, {})
+                node[None] = score
+            cls._DOMAIN_TRIE = trie
+        return trie
 
     def _score_domain(self, url: str) -> float:
         """Score a URL's domain credibility. Returns 0.0-1.0."""
-        from urllib.parse import urlparse
-        try:
-            domain = urlparse(url).netloc.lower().replace('www.', '')
-        except Exception:
-            return 0.4
-        # Exact match
-        if domain in self.DOMAIN_CREDIBILITY:
-            return self.DOMAIN_CREDIBILITY[domain]
-        # TLD match (.gov, .edu)
-        tld = domain.split('.')[-1]
-        if tld in self.DOMAIN_CREDIBILITY:
-            return self.DOMAIN_CREDIBILITY[tld]
-        # Partial match (e.g., 'something.nature.com')
-        for known, score in self.DOMAIN_CREDIBILITY.items():
-            if domain.endswith('.' + known):
-                return score
-        return 0.5  # Unknown domain default
+        return self._score_domain_of(_url_domain(url))
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _score_domain_of(cls, domain: str) -> float:
+        """Score an already-parsed domain (see _url_domain).
+        The most specific known suffix wins: exact domain, then parent
+        domains (e.g. 'something.nature.com'), then TLD (.gov, .edu).
+        Memoized per (class, domain): ingests repeat the same few hosts,
+        and the table is read-only."""
+        # An exact hit is the most specific match possible: one dict probe
+        score = cls.DOMAIN_CREDIBILITY.get(domain)
+        if score is not None:
+            return score
+        node = cls._domain_trie()
+        score = 0.5  # Unknown domain default
+        for label in reversed(domain.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            score = node.get(None, score)
+        return score
 
     # ── Source management ───────────────────────────────────────────────
 
@@ -943,59 +1559,76 @@ class KnowledgeBase:
         title: str = "",
         snippet: str = "",
         source_type: str = "web",
-        metadata: Optional[Dict[str, Any]] = None
-    ) -> int:
-        """Add a source. Auto-scores domain credibility. Returns source ID."""
-        from urllib.parse import urlparse
-        try:
-            domain = urlparse(url).netloc.lower().replace('www.', '')
-        except Exception:
-            domain = "unknown"
-        
-        credibility = self._score_domain(url)
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        details: bool = False
+    ) -> Any:
+        """Add a source. Auto-scores domain credibility. Returns source ID,
+        or (source_id, credibility) with details=True."""
+        with self.bulk():
+            source_id, credibility = self._insert_source(url, title, snippet, source_type, metadata)
+        return (source_id, credibility) if details else source_id
+
+    def add_sources(self, items: Iterable[Dict[str, Any]]) -> List[int]:
+        """Add many sources in one transaction. Returns source IDs in order.
+
+        Each item is a dict with 'url' and optional 'title', 'snippet',
+        'source_type' and 'metadata'. Known URLs return the existing ID."""
+        with self.bulk():
+            return [
+                self._insert_source(item['url'], item.get('title', ""), item.get('snippet', ""),
+                                    item.get('source_type', "web"), item.get('metadata'))[0]
+                for item in items
+            ]
+
+    def _insert_source(self, url, title, snippet, source_type, metadata) -> Tuple[int, float]:
+        """Insert (or refresh) one source row without committing.
+        Returns (source_id, credibility)."""
+        domain = _url_domain(url)
+        credibility = self._score_domain_of(domain)
         now = self._now()
-        meta_json = json.dumps(metadata or {})
+        meta_json = dump_meta(metadata)
         
-        try:
-            cursor = self.conn.execute(
-                "INSERT INTO sources (url, title, domain, snippet, credibility, source_type, accessed_at, metadata) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (url, title, domain, snippet, credibility, source_type, now, meta_json)
-            )
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # URL already exists — update and return existing
-            row = self.conn.execute("SELECT id FROM sources WHERE url = ?", (url,)).fetchone()
-            if title:
-                self.conn.execute("UPDATE sources SET title = ?, snippet = ?, accessed_at = ? WHERE url = ?",
-                                  (title, snippet, now, url))
-                self.conn.commit()
-            return row['id']
+        # New URL: inserted. Known URL with a title: refreshed in place.
+        # Either way RETURNING yields the stored (id, credibility); only a
+        # known URL without a title (or SQLite < 3.35) needs the SELECT.
+        row = self._raw_execute(
+            _SQL_UPSERT_SOURCE,
+            (url, title, domain, snippet, credibility, source_type, now, meta_json)
+        ).fetchone()
+        if row is None:
+            row = self._raw_execute(
+                "SELECT id, credibility FROM sources WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0], row[1]
     
     def get_source(self, source_id: int) -> Optional[Dict[str, Any]]:
         """Get a source by ID."""
-        row = self.conn.execute("SELECT * FROM sources WHERE id = ?", (source_id,)).fetchone()
+        row = self._reader().execute("SELECT * FROM sources WHERE id = ?", (source_id,)).fetchone()
         if row:
-            return {k: row[k] for k in row.keys()}
+            return row_dict(row)
         return None
     
     def list_sources(self, entity_id: Optional[str] = None, min_credibility: float = 0.0) -> List[Dict[str, Any]]:
         """List sources, optionally filtered by entity (via claims) and minimum credibility."""
+        return list(self.iter_sources(entity_id, min_credibility))
+
+    def iter_sources(self, entity_id: Optional[str] = None, min_credibility: float = 0.0) -> Iterator[Dict[str, Any]]:
+        """Generator form of list_sources()."""
         if entity_id:
-            rows = self.conn.execute("""
+            cursor = self._reader().execute("""
                 SELECT DISTINCT s.* FROM sources s
                 JOIN claim_sources cs ON s.id = cs.source_id
                 JOIN claims c ON cs.claim_id = c.id
                 WHERE c.entity_id = ? AND s.credibility >= ?
                 ORDER BY s.credibility DESC
-            """, (entity_id, min_credibility)).fetchall()
+            """, (entity_id, min_credibility))
         else:
-            rows = self.conn.execute(
+            cursor = self._reader().execute(
                 "SELECT * FROM sources WHERE credibility >= ? ORDER BY credibility DESC",
                 (min_credibility,)
-            ).fetchall()
-        return [{k: row[k] for k in row.keys()} for row in rows]
+            )
+        return self._iter_rows(cursor, row_dict)
 
     # ── Claim management ────────────────────────────────────────────────
 
@@ -1012,105 +1645,119 @@ class KnowledgeBase:
         claim_text: str,
         entity_id: Optional[str] = None,
         source_ids: Optional[List[int]] = None,
-        metadata: Optional[Dict[str, Any]] = None
-    ) -> int:
-        """Add a claim. Optionally link to sources. Auto-grades evidence. Returns claim ID."""
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        details: bool = False
+    ) -> Any:
+        """Add a claim. Optionally link to sources. Auto-grades evidence.
+        Returns claim ID, or (claim_id, grade, confidence) with details=True."""
+        # Claim row, FTS row (trigger), source links and grade: one commit
+        with self.bulk():
+            claim_id = self._insert_claim(claim_text, entity_id, source_ids, metadata)
+            # Auto-grade
+            grade, confidence = self._grade_claim(claim_id)
+        return (claim_id, grade, confidence) if details else claim_id
+
+    def add_claims(self, items: Iterable[Dict[str, Any]]) -> List[int]:
+        """Add many claims in one transaction, grading each. Returns claim IDs in order.
+
+        Each item is a dict with 'claim_text' and optional 'entity_id',
+        'source_ids' and 'metadata'."""
+        with self.bulk():
+            ids = [
+                self._insert_claim(item['claim_text'], item.get('entity_id'),
+                                   item.get('source_ids'), item.get('metadata'))
+                for item in items
+            ]
+            for claim_id in ids:
+                self._grade_claim(claim_id)
+        return ids
+
+    def _insert_claim(self, claim_text, entity_id, source_ids, metadata) -> int:
+        """Insert one claim and its source links without committing."""
         now = self._now()
-        meta_json = json.dumps(metadata or {})
-        
         cursor = self.conn.execute(
-            "INSERT INTO claims (claim_text, entity_id, metadata, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
-            (claim_text, entity_id, meta_json, now, now)
+            _SQL_INSERT_CLAIM,
+            (claim_text, entity_id, dump_meta(metadata), now, now)
         )
         claim_id = cursor.lastrowid
         
-        # Update FTS index
-        self.conn.execute(
-            "INSERT INTO claims_fts (claim_text, claim_id) VALUES (?, ?)",
-            (claim_text, str(claim_id))
-        )
-        
-        # Link sources
+        # Link sources. Duplicates and unknown source ids are skipped in the
+        # engine: OR IGNORE covers the primary key, the SELECT the foreign key.
         if source_ids:
-            for sid in source_ids:
-                try:
-                    self.conn.execute(
-                        "INSERT INTO claim_sources (claim_id, source_id) VALUES (?, ?)",
-                        (claim_id, sid)
-                    )
-                except sqlite3.IntegrityError:
-                    pass
-        
-        self.conn.commit()
-        # Auto-grade
-        self._grade_claim(claim_id)
+            self.conn.executemany(_SQL_LINK_CLAIM_SOURCE, [(claim_id, sid) for sid in source_ids])
         return claim_id
     
-    def add_claim_source(self, claim_id: int, source_id: int, relationship: str = "supports") -> bool:
-        """Link a source to a claim. Re-grades the claim. Returns success."""
-        try:
-            self.conn.execute(
-                "INSERT INTO claim_sources (claim_id, source_id, relationship) VALUES (?, ?, ?)",
-                (claim_id, source_id, relationship)
-            )
-            self.conn.commit()
-            self._grade_claim(claim_id)
-            return True
-        except sqlite3.IntegrityError:
-            return False
+    def add_claim_source(
+        self, claim_id: int, source_id: int, relationship: str = "supports", *, details: bool = False
+    ) -> Any:
+        """Link a source to a claim. Re-grades the claim. Returns success,
+        or (success, grade) with details=True."""
+        # One transaction for the link and the re-grade; returning early
+        # out of bulk() still commits, releasing the write lock
+        with self.bulk():
+            # Nothing inserted: already linked, or either id is unknown
+            if not self.conn.execute(
+                _SQL_ADD_CLAIM_SOURCE, (relationship, claim_id, source_id)
+            ).rowcount:
+                if not details:
+                    return False
+                row = self.conn.execute(
+                    "SELECT evidence_grade FROM claims WHERE id = ?", (claim_id,)
+                ).fetchone()
+                return False, row['evidence_grade'] if row else None
+            grade, _ = self._grade_claim(claim_id)
+        return (True, grade) if details else True
     
-    def _grade_claim(self, claim_id: int):
-        """Auto-grade a claim based on its linked sources."""
-        rows = self.conn.execute("""
-            SELECT s.credibility, cs.relationship FROM sources s
-            JOIN claim_sources cs ON s.id = cs.source_id
-            WHERE cs.claim_id = ?
-        """, (claim_id,)).fetchall()
-        
-        supporting = [r['credibility'] for r in rows if r['relationship'] in ('supports', 'confirms')]
-        contradicting = [r['credibility'] for r in rows if r['relationship'] in ('contradicts', 'refutes')]
-        
-        n_support = len(supporting)
-        n_contradict = len(contradicting)
-        
-        if n_contradict > 0 and n_support > 0:
-            grade = 'contested'
-            confidence = 0.2 + (0.3 * (n_support / (n_support + n_contradict)))
-        elif n_support == 0:
-            grade = 'ungraded'
-            confidence = 0.3
-        else:
-            avg_cred = sum(supporting) / n_support
-            if n_support >= 3 and avg_cred >= 0.7:
-                grade = 'strong'
-                confidence = min(0.95, 0.7 + (n_support * 0.05) + (avg_cred * 0.1))
-            elif n_support >= 2 and avg_cred >= 0.5:
-                grade = 'moderate'
-                confidence = 0.5 + (n_support * 0.05) + (avg_cred * 0.1)
+    def _grade_claim(self, claim_id: int, *, _skip_parent_regrade: bool = False) -> Tuple[str, float]:
+        """Auto-grade a claim based on its linked sources.
+        Returns the stored (grade, confidence). Batch callers grading every
+        atom of one parent pass _skip_parent_regrade and roll up once."""
+        with self.bulk():
+            n_support, sum_support, n_contradict = self._raw_execute(
+                _SQL_GRADE_CLAIM, (claim_id,)).fetchone()
+
+            if n_contradict > 0 and n_support > 0:
+                grade = 'contested'
+                confidence = 0.2 + (0.3 * (n_support / (n_support + n_contradict)))
+            elif n_support == 0:
+                grade = 'ungraded'
+                confidence = 0.3
             else:
-                grade = 'weak'
-                confidence = 0.3 + (avg_cred * 0.15)
+                avg_cred = sum_support / n_support
+                if n_support >= 3 and avg_cred >= 0.7:
+                    grade = 'strong'
+                    confidence = min(0.95, 0.7 + (n_support * 0.05) + (avg_cred * 0.1))
+                elif n_support >= 2 and avg_cred >= 0.5:
+                    grade = 'moderate'
+                    confidence = 0.5 + (n_support * 0.05) + (avg_cred * 0.1)
+                else:
+                    grade = 'weak'
+                    confidence = 0.3 + (avg_cred * 0.15)
+            confidence = round(confidence, 3)
         
-        self.conn.execute(
-            "UPDATE claims SET evidence_grade = ?, confidence = ?, updated_at = ? WHERE id = ?",
-            (grade, round(confidence, 3), self._now(), claim_id)
-        )
-        self.conn.commit()
-        # If this is an atomic child, re-grade the composite parent
-        row = self.conn.execute("SELECT parent_claim_id FROM claims WHERE id = ?", (claim_id,)).fetchone()
-        if row and row['parent_claim_id']:
-            self._grade_composite_claim(row['parent_claim_id'])
+            self.conn.execute(
+                "UPDATE claims SET evidence_grade = ?, confidence = ?, updated_at = ? WHERE id = ?",
+                (grade, confidence, self._now(), claim_id)
+            )
+            if _skip_parent_regrade:
+                return grade, confidence
+            # If this is an atomic child, re-grade the composite parent
+            row = self.conn.execute("SELECT parent_claim_id FROM claims WHERE id = ?", (claim_id,)).fetchone()
+            if row and row['parent_claim_id']:
+                self._grade_composite_claim(row['parent_claim_id'])
+            return grade, confidence
     
     # ── Atomic Claim Decomposition ──────────────────────────────────────
 
     def _claim_complexity(self, text: str) -> Dict[str, Any]:
         """Score how complex a claim is. Higher = more likely to need decomposition."""
         words = text.split()
-        conjunctions = len(re.findall(r'\b(and|also|additionally|furthermore|moreover)\b', text, re.I))
+        conjunctions = len(_RE_CONJUNCTION.findall(text))
         semicolons = text.count(';')
-        sentences = len(re.findall(r'[.!?]+\s', text)) + 1
-        numerics = len(re.findall(r'\d+\.?\d*\s*(%|°|MW|GW|km|m\b|kg|ton|year|eV|keV|MeV)', text))
-        relative_clauses = len(re.findall(r'\b(which|that|where|when|while|whereas)\b', text, re.I))
+        sentences = len(_RE_SENTENCE_END.findall(text)) + 1
+        numerics = len(_RE_QUANTITY.findall(text))
+        relative_clauses = len(_RE_RELATIVE.findall(text))
 
         score = (conjunctions * 1.0 + semicolons * 1.5 + relative_clauses * 0.8
                  + max(0, sentences - 1) * 1.2 + max(0, numerics - 1) * 0.7
@@ -1130,13 +1777,13 @@ class KnowledgeBase:
         """Fast rule-based decomposition: split on semicolons and independent 'and' clauses."""
         parts = []
         # Split on semicolons first
-        segments = re.split(r'\s*;\s*', text)
+        segments = _RE_SEMICOLON.split(text)
         for seg in segments:
             seg = seg.strip().rstrip('.')
             if not seg:
                 continue
             # Split on 'and' connecting independent clauses (has subject+verb on both sides)
-            and_parts = re.split(r',?\s+and\s+(?=[A-Z])', seg)
+            and_parts = _RE_AND_CLAUSE.split(seg)
             if len(and_parts) > 1:
                 parts.extend(p.strip().rstrip('.') for p in and_parts if p.strip())
             else:
@@ -1151,153 +1798,167 @@ class KnowledgeBase:
         Returns list of atomic claim IDs. Empty if claim is already atomic/singleton.
         Idempotent: returns existing atomic IDs if already decomposed.
         """
-        claim = self.get_claim(claim_id)
-        if not claim:
-            return []
-
-        # Idempotency: if already decomposed, return existing atomic IDs
-        existing = self.conn.execute(
-            "SELECT id FROM claims WHERE parent_claim_id = ? AND is_atomic = 1", (claim_id,)
-        ).fetchall()
-        if existing:
-            return [r['id'] for r in existing]
-
-        text = claim['claim_text']
-        complexity = self._claim_complexity(text)
-
-        if method == 'none':
-            self.conn.execute("UPDATE claims SET claim_type = 'singleton' WHERE id = ?", (claim_id,))
-            self.conn.commit()
-            return []
+        # One transaction from the already-decomposed check to the last
+        # grade: concurrent calls can't both insert children, and children,
+        # copied source links and every grade commit together
+        with self.bulk():
+            claim = self.get_claim(claim_id)
+            if not claim:
+                return []
+
+            # Idempotency: if already decomposed, return existing atomic IDs
+            existing = self.conn.execute(
+                "SELECT id FROM claims WHERE parent_claim_id = ? AND is_atomic = 1", (claim_id,)
+            ).fetchall()
+            if existing:
+                return [r['id'] for r in existing]
 
-        if not complexity['needs_decomposition']:
-            self.conn.execute("UPDATE claims SET claim_type = 'singleton' WHERE id = ?", (claim_id,))
-            self.conn.commit()
-            return []
+            text = claim['claim_text']
+            complexity = self._claim_complexity(text)
 
-        # Decompose
-        parts = self._heuristic_decompose(text)
-        if len(parts) <= 1:
-            self.conn.execute("UPDATE claims SET claim_type = 'singleton' WHERE id = ?", (claim_id,))
-            self.conn.commit()
-            return []
+            if method == 'none':
+                self._mark_singleton(claim_id)
+                return []
 
-        # Mark parent as composite
-        self.conn.execute(
-            "UPDATE claims SET claim_type = 'composite' WHERE id = ?", (claim_id,))
+            if not complexity['needs_decomposition']:
+                self._mark_singleton(claim_id)
+                return []
 
-        # Create atomic children, inheriting parent's entity and sources
-        atomic_ids = []
-        now = self._now()
-        parent_sources = self.conn.execute(
-            "SELECT source_id, relationship FROM claim_sources WHERE claim_id = ?",
-            (claim_id,)
-        ).fetchall()
+            # Decompose
+            parts = self._heuristic_decompose(text)
+            if len(parts) <= 1:
+                self._mark_singleton(claim_id)
+                return []
 
-        for part in parts:
-            cursor = self.conn.execute(
-                "INSERT INTO claims (claim_text, entity_id, metadata, parent_claim_id, claim_type, is_atomic, created_at, updated_at) "
-                "VALUES (?, ?, ?, ?, 'atomic', 1, ?, ?)",
-                (part, claim.get('entity_id'), json.dumps({'decomposed_from': claim_id}), claim_id, now, now)
-            )
-            atomic_id = cursor.lastrowid
-            # Copy parent's source links to atomic child
-            for src in parent_sources:
-                try:
-                    self.conn.execute(
-                        "INSERT INTO claim_sources (claim_id, source_id, relationship) VALUES (?, ?, ?)",
-                        (atomic_id, src['source_id'], src['relationship'])
-                    )
-                except sqlite3.IntegrityError:
-                    pass
-            # FTS
+            # Mark parent as composite
             self.conn.execute(
-                "INSERT INTO claims_fts (claim_text, claim_id) VALUES (?, ?)",
-                (part, str(atomic_id))
+                "UPDATE claims SET claim_type = 'composite' WHERE id = ?", (claim_id,))
+
+            # Create atomic children, inheriting parent's entity and sources
+            now = self._now()
+            meta_json = dumps({'decomposed_from': claim_id})
+            entity_id = claim.get('entity_id')
+            rows = [(part, entity_id, meta_json, claim_id, now, now) for part in parts]
+            if _HAS_RETURNING:
+                # One multi-row INSERT hands back every new id. RETURNING
+                # order is unspecified; AUTOINCREMENT ids follow VALUES order.
+                atomic_ids = sorted(r[0] for r in self._raw_execute(
+                    _SQL_INSERT_ATOMS + ", ".join([_SQL_ATOM_VALUES] * len(rows)) + " RETURNING id",
+                    [v for row in rows for v in row]
+                ))
+            else:
+                self.conn.executemany(_SQL_INSERT_ATOMS + _SQL_ATOM_VALUES, rows)
+                # No children existed before (checked above), so these are exactly the new rows
+                atomic_ids = [r[0] for r in self._raw_execute(
+                    "SELECT id FROM claims WHERE parent_claim_id = ? AND is_atomic = 1 ORDER BY id",
+                    (claim_id,)
+                )]
+            self.conn.execute(
+                "INSERT OR IGNORE INTO claim_sources (claim_id, source_id, relationship) "
+                "SELECT c.id, cs.source_id, cs.relationship FROM claims c "
+                "JOIN claim_sources cs ON cs.claim_id = c.parent_claim_id "
+                "WHERE c.parent_claim_id = ? AND c.is_atomic = 1",
+                (claim_id,)
             )
-            atomic_ids.append(atomic_id)
 
-        self.conn.commit()
-        # Grade each atomic child, then composite parent
-        for aid in atomic_ids:
-            self._grade_claim(aid)
-        self._grade_composite_claim(claim_id)
-        return atomic_ids
+            # Grade each atomic child, then the composite parent once
+            for aid in atomic_ids:
+                self._grade_claim(aid, _skip_parent_regrade=True)
+            self._grade_composite_claim(claim_id)
+            return atomic_ids
+
+    def _mark_singleton(self, claim_id: int):
+        """Record that a claim was checked and needs no decomposition."""
+        with self.bulk():
+            self.conn.execute("UPDATE claims SET claim_type = 'singleton' WHERE id = ?", (claim_id,))
 
     def _grade_composite_claim(self, claim_id: int):
         """FActScore-style rollup: supported_atoms / total_atoms."""
-        children = self.conn.execute(
-            "SELECT id, evidence_grade, confidence FROM claims WHERE parent_claim_id = ? AND is_atomic = 1",
-            (claim_id,)
-        ).fetchall()
-        if not children:
-            return
+        with self.bulk():
+            children = self.conn.execute(
+                "SELECT id, evidence_grade, confidence FROM claims WHERE parent_claim_id = ? AND is_atomic = 1",
+                (claim_id,)
+            ).fetchall()
+            if not children:
+                return
 
-        total = len(children)
-        supported = sum(1 for c in children if c['evidence_grade'] in ('strong', 'moderate'))
-        factscore = supported / total if total > 0 else 0
-        avg_child_conf = sum(c['confidence'] for c in children) / total
-
-        if factscore >= 0.9:
-            grade = 'strong'
-        elif factscore >= 0.6:
-            grade = 'moderate'
-        elif factscore >= 0.3:
-            grade = 'weak'
-        else:
-            grade = 'contested'
+            total = len(children)
+            supported = sum(1 for c in children if c['evidence_grade'] in ('strong', 'moderate'))
+            factscore = supported / total if total > 0 else 0
+            avg_child_conf = sum(c['confidence'] for c in children) / total
 
-        confidence = round(factscore * 0.6 + avg_child_conf * 0.4, 3)
+            if factscore >= 0.9:
+                grade = 'strong'
+            elif factscore >= 0.6:
+                grade = 'moderate'
+            elif factscore >= 0.3:
+                grade = 'weak'
+            else:
+                grade = 'contested'
 
-        # Store factscore in metadata
-        meta_row = self.conn.execute("SELECT metadata FROM claims WHERE id = ?", (claim_id,)).fetchone()
-        meta = json.loads(meta_row['metadata'] or '{}') if meta_row else {}
-        meta['factscore'] = round(factscore, 3)
-        meta['atomic_count'] = total
-        meta['supported_count'] = supported
+            confidence = round(factscore * 0.6 + avg_child_conf * 0.4, 3)
 
-        self.conn.execute(
-            "UPDATE claims SET evidence_grade = ?, confidence = ?, metadata = ?, updated_at = ? WHERE id = ?",
-            (grade, confidence, json.dumps(meta), self._now(), claim_id)
-        )
-        self.conn.commit()
+            # Store factscore in metadata
+            meta_row = self.conn.execute("SELECT metadata FROM claims WHERE id = ?", (claim_id,)).fetchone()
+            meta = load_meta(meta_row['metadata']) if meta_row else {}
+            meta['factscore'] = round(factscore, 3)
+            meta['atomic_count'] = total
+            meta['supported_count'] = supported
+
+            self.conn.execute(
+                "UPDATE claims SET evidence_grade = ?, confidence = ?, metadata = ?, updated_at = ? WHERE id = ?",
+                (grade, confidence, dumps(meta), self._now(), claim_id)
+            )
 
-    def get_atomic_claims(self, parent_claim_id: int) -> List[Dict[str, Any]]:
-        """Get atomic sub-claims of a composite claim."""
-        rows = self.conn.execute(
+    def get_atomic_claims(self, parent_claim_id: int,
+                          parse_metadata: bool = True) -> List[Dict[str, Any]]:
+        """Get atomic sub-claims of a composite claim. See _claim_row for
+        parse_metadata."""
+        return list(self.iter_atomic_claims(parent_claim_id, parse_metadata))
+
+    def iter_atomic_claims(self, parent_claim_id: int,
+                           parse_metadata: bool = True) -> Iterator[Dict[str, Any]]:
+        """Generator form of get_atomic_claims()."""
+        cursor = self._reader().execute(
             "SELECT * FROM claims WHERE parent_claim_id = ? AND is_atomic = 1 ORDER BY id",
             (parent_claim_id,)
-        ).fetchall()
-        results = []
-        for row in rows:
-            c = {k: row[k] for k in row.keys()}
-            c['metadata'] = json.loads(c['metadata'])
-            results.append(c)
-        return results
+        )
+        return self._iter_rows(cursor, self._claim_row if parse_metadata else self._claim_row_raw)
     
     def get_claim(self, claim_id: int) -> Optional[Dict[str, Any]]:
         """Get a claim with its sources."""
-        row = self.conn.execute("SELECT * FROM claims WHERE id = ?", (claim_id,)).fetchone()
+        row = self._reader().execute("SELECT * FROM claims WHERE id = ?", (claim_id,)).fetchone()
         if not row:
             return None
-        claim = {k: row[k] for k in row.keys()}
-        claim['metadata'] = json.loads(claim['metadata'])
+        claim = row_dict(row)
+        claim['metadata'] = load_meta(claim['metadata'])
         # Attach sources
-        sources = self.conn.execute("""
+        sources = self._reader().execute("""
             SELECT s.*, cs.relationship FROM sources s
             JOIN claim_sources cs ON s.id = cs.source_id
             WHERE cs.claim_id = ?
         """, (claim_id,)).fetchall()
-        claim['sources'] = [{k: r[k] for k in r.keys()} for r in sources]
+        claim['sources'] = rows_to_dicts(sources)
         return claim
     
     def list_claims(
         self,
         entity_id: Optional[str] = None,
         grade: Optional[str] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        parse_metadata: bool = True
     ) -> List[Dict[str, Any]]:
-        """List claims with optional filters."""
+        """List claims with optional filters. See _claim_row for parse_metadata."""
+        return list(self.iter_claims(entity_id, grade, status, parse_metadata))
+
+    def iter_claims(
+        self,
+        entity_id: Optional[str] = None,
+        grade: Optional[str] = None,
+        status: Optional[str] = None,
+        parse_metadata: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """Generator form of list_claims()."""
         query = """
             SELECT c.*, COUNT(cs.source_id) as source_count
             FROM claims c
@@ -1316,13 +1977,22 @@ class KnowledgeBase:
             params.append(status)
         query += " GROUP BY c.id ORDER BY c.confidence DESC"
         
-        rows = self.conn.execute(query, params).fetchall()
-        results = []
-        for row in rows:
-            c = {k: row[k] for k in row.keys()}
-            c['metadata'] = json.loads(c['metadata'])
-            results.append(c)
-        return results
+        cursor = self._reader().execute(query, params)
+        return self._iter_rows(cursor, self._claim_row if parse_metadata else self._claim_row_raw)
+
+    @staticmethod
+    def _claim_row(row) -> Dict[str, Any]:
+        c = row_dict(row)
+        c['metadata'] = load_meta(c['metadata'])
+        return c
+
+    @staticmethod
+    def _claim_row_raw(row) -> Dict[str, Any]:
+        """parse_metadata=False mapper: the undecoded JSON text is kept as
+        'metadata_raw' (no 'metadata' key), for callers that never read it."""
+        c = row_dict(row)
+        c['metadata_raw'] = c.pop('metadata')
+        return c
 
     def verify_claim(self, claim_id: int, search_fn=None) -> Dict[str, Any]:
         """SAFE-style search-augmented claim verification."""
@@ -1355,10 +2025,11 @@ class KnowledgeBase:
         from researcher.kb_analysis import check_contradictions
         return check_contradictions(self, entity_id)
 
-    def check_corroboration(self, entity_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Score how well-corroborated each claim is."""
+    def check_corroboration(self, entity_id: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Score how well-corroborated each claim is, best-corroborated first."""
         from researcher.kb_analysis import check_corroboration
-        return check_corroboration(self, entity_id)
+        return check_corroboration(self, entity_id, limit)
 
     def apply_confidence_decay(self, days_threshold: int = 30, decay_rate: float = 0.02) -> List[Dict[str, Any]]:
         """Decay confidence on claims older than threshold."""
@@ -1391,29 +2062,54 @@ class KnowledgeBase:
         duration_ms: int = 0
     ) -> int:
         """Log a reasoning trace step. Returns trace ID."""
-        # Auto-increment step_num per entity
-        row = self.conn.execute(
-            "SELECT COALESCE(MAX(step_num), 0) FROM traces WHERE entity_id = ?",
-            (entity_id,)
-        ).fetchone()
-        step_num = row[0] + 1
-        
-        now = self._now()
-        cursor = self.conn.execute(
-            "INSERT INTO traces (entity_id, step_num, action, input, output, reasoning, tool_used, duration_ms, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (entity_id, step_num, action, input_text, output_text, reasoning, tool_used, duration_ms, now)
-        )
-        self.conn.commit()
-        return cursor.lastrowid
+        return self.add_traces([{
+            'entity_id': entity_id, 'action': action, 'input_text': input_text,
+            'output_text': output_text, 'reasoning': reasoning,
+            'tool_used': tool_used, 'duration_ms': duration_ms
+        }])[0]
+
+    def add_traces(self, items: Iterable[Dict[str, Any]]) -> List[int]:
+        """Log many trace steps in one transaction. Returns trace IDs in order.
+
+        Each item is a dict with 'entity_id' and 'action' plus optional
+        'input_text', 'output_text', 'reasoning', 'tool_used' and
+        'duration_ms'. Steps are numbered per entity in item order."""
+        with self.bulk():
+            now = self._now()
+            # Auto-increment step_num per entity — one MAX() lookup each
+            steps = {}
+            rows = []
+            for item in items:
+                eid = item['entity_id']
+                if eid not in steps:
+                    steps[eid] = self.conn.execute(
+                        "SELECT COALESCE(MAX(step_num), 0) FROM traces WHERE entity_id = ?",
+                        (eid,)
+                    ).fetchone()[0]
+                steps[eid] += 1
+                rows.append((eid, steps[eid], item['action'], item.get('input_text', ""),
+                             item.get('output_text', ""), item.get('reasoning', ""),
+                             item.get('tool_used', ""), item.get('duration_ms', 0), now))
+            if not rows:
+                return []
+            self.conn.executemany(_SQL_INSERT_TRACE, rows)
+            # AUTOINCREMENT ids are consecutive within a single write transaction
+            last = self.conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'traces'"
+            ).fetchone()[0]
+        return list(range(last - len(rows) + 1, last + 1))
 
     def get_traces(self, entity_id: str) -> List[Dict[str, Any]]:
         """Get all trace steps for an entity, ordered by step."""
-        rows = self.conn.execute(
+        return list(self.iter_traces(entity_id))
+
+    def iter_traces(self, entity_id: str) -> Iterator[Dict[str, Any]]:
+        """Generator form of get_traces()."""
+        cursor = self._reader().execute(
             "SELECT * FROM traces WHERE entity_id = ? ORDER BY step_num",
             (entity_id,)
-        ).fetchall()
-        return [{k: r[k] for k in r.keys()} for r in rows]
+        )
+        return self._iter_rows(cursor, row_dict)
 
     def get_trace_summary(self, entity_id: str) -> str:
         """Get a compact reasoning trace summary for an entity."""
@@ -1437,23 +2133,19 @@ class KnowledgeBase:
 
     def extract_task_features(self, description: str, metadata: Optional[Dict] = None) -> Dict[str, float]:
         """Extract task feature dimensions for coordinator routing."""
-        from researcher.kb_router import extract_task_features
-        return extract_task_features(self, description, metadata)
+        return kb_router.extract_task_features(self, description, metadata)
 
     def route_task(self, description: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
         """Route a task to the best coordinator."""
-        from researcher.kb_router import route_task
-        return route_task(self, description, metadata)
+        return kb_router.route_task(self, description, metadata)
 
     def _suggest_config(self, coordinator: str, features: Dict[str, float]) -> Dict[str, Any]:
         """Suggest coordinator-specific configuration."""
-        from researcher.kb_router import _suggest_config
-        return _suggest_config(coordinator, features)
+        return kb_router._suggest_config(coordinator, features)
 
     def _routing_reasoning(self, best: str, features: Dict, ranked: list) -> str:
         """Generate brief reasoning for routing decision."""
-        from researcher.kb_router import _routing_reasoning
-        return _routing_reasoning(best, features, ranked)
+        return kb_router._routing_reasoning(best, features, ranked)
 
     def add_decision(self, title: str, criteria: List[Dict[str, Any]],
                      alternatives: List[str], entity_id: Optional[str] = None,
@@ -1489,45 +2181,59 @@ class KnowledgeBase:
 
     def visualize_graph(self, format: str = "dot") -> str:
         """Generate a visualization of the knowledge graph."""
+        if format not in ("dot", "json"):
+            return f"Unknown format: {format}"
+
+        # Only id/title/endpoints are rendered — skip content and metadata
+        db = self._reader()
+        nodes = db.execute(_SQL_GRAPH_NODES)
+        edges = db.execute(_SQL_GRAPH_EDGES)
+        out = io.StringIO()
         if format == "dot":
-            # GraphViz DOT format
-            output = "digraph KnowledgeBase {\n"
-            output += '  node [shape=box, style=rounded];\n\n'
+            # GraphViz DOT format — streamed into a buffer row by row
+            out.write("digraph KnowledgeBase {\n")
+            out.write('  node [shape=box, style=rounded];\n\n')
             
             # Add nodes
-            entities = self.list_entities()
-            for entity in entities:
-                label = entity['title'].replace('"', '\\"')[:50]
-                output += f'  "{entity["id"]}" [label="{label}"];\n'
+            for node_id, title in nodes:
+                label = title.translate(_DOT_ESCAPE)[:50]
+                out.write(f'  "{node_id}" [label="{label}"];\n')
             
             # Add edges
-            output += "\n"
-            links = self.conn.execute("SELECT * FROM links").fetchall()
-            for link in links:
-                output += f'  "{link["from_id"]}" -> "{link["to_id"]}" [label="{link["link_type"]}"];\n'
+            out.write("\n")
+            for from_id, to_id, link_type in edges:
+                out.write(f'  "{from_id}" -> "{to_id}" [label="{link_type}"];\n')
             
-            output += "}\n"
-            return output
-        
-        elif format == "json":
-            # JSON graph format
-            entities = self.list_entities()
-            links = self.conn.execute("SELECT * FROM links").fetchall()
-            
-            return json.dumps({
-                'nodes': [{'id': e['id'], 'title': e['title']} for e in entities],
-                'edges': [
-                    {
-                        'from': link['from_id'],
-                        'to': link['to_id'],
-                        'type': link['link_type']
-                    }
-                    for link in links
-                ]
-            }, indent=2)
-        
+            out.write("}\n")
         else:
-            return f"Unknown format: {format}"
+            # JSON graph format — same layout as json.dumps(indent=2),
+            # written one element at a time. Only the scalars go through
+            # the encoder (its C path); the indented layout is a template.
+            q = json.dumps
+            out.write('{\n  "nodes": [')
+            self._write_json_items(out, (
+                _JSON_GRAPH_NODE % (q(node_id), q(title)) for node_id, title in nodes
+            ))
+            out.write(',\n  "edges": [')
+            self._write_json_items(out, (
+                _JSON_GRAPH_EDGE % (q(from_id), q(to_id), q(link_type))
+                for from_id, to_id, link_type in edges
+            ))
+            out.write('\n}')
+        return out.getvalue()
+
+    @staticmethod
+    def _write_json_items(out, items):
+        """Write the body of an indent=2 JSON array nested one level deep
+        from pre-encoded items and close it, e.g. for "nodes": [ ... ]."""
+        sep = "\n    "
+        wrote = False
+        for item in items:
+            out.write(sep)
+            out.write(item)
+            sep = ",\n    "
+            wrote = True
+        out.write("\n  ]" if wrote else "]")
     
     def check_spawn_budget(self, entity_id: str, max_depth: int = 8, max_total: int = 400) -> Dict[str, Any]:
         """Check if an agent can spawn sub-agents from this entity."""
@@ -1576,10 +2282,17 @@ class KnowledgeBase:
         from researcher.kb_vectors import embed_claim
         return embed_claim(self, claim_id)
 
-    def embed_all(self) -> Dict[str, int]:
-        """Embed all entities and claims."""
+    def flush_embeddings(self) -> int:
+        """Write embeddings buffered by embed_entity/embed_claim now.
+        Returns how many were written."""
+        from researcher.kb_vectors import flush_embeddings
+        return flush_embeddings(self)
+
+    def embed_all(self, batch_size: int = 64, workers: int = 1) -> Dict[str, int]:
+        """Embed all entities and claims, batch_size texts per model call,
+        optionally across a pool of worker processes."""
         from researcher.kb_vectors import embed_all
-        return embed_all(self)
+        return embed_all(self, batch_size, workers)
 
     def semantic_search(self, query: str, limit: int = 10, source_table: Optional[str] = None) -> List[Dict[str, Any]]:
         """Search by semantic similarity."""
@@ -1602,34 +2315,22 @@ class KnowledgeBase:
         if entity is None:
             return {"error": "entity not found"}
 
-        children = self.get_links_from(root_entity_id)
-
-        def walk_tree(eid, depth=0):
-            nodes = []
-            e = self.get_entity(eid)
-            if not e:
-                return nodes
-            claims = self.list_claims(entity_id=eid)
-            traces = self.conn.execute(
-                "SELECT * FROM traces WHERE entity_id = ? ORDER BY created_at DESC LIMIT 1",
-                (eid,)
-            ).fetchone()
-            last_activity = traces['created_at'] if traces else e['updated_at']
-            nodes.append({
+        db = self._reader()
+        all_nodes = []
+        branch_sizes = {}
+        for eid, depth, branch, title, has_content, last_activity, created_at, n_claims in \
+                self._raw_execute(_SQL_MONITOR_TREE, (root_entity_id,), conn=db):
+            all_nodes.append({
                 'entity_id': eid,
-                'title': e['title'][:50],
+                'title': title[:50],
                 'depth': depth,
-                'claim_count': len(claims),
-                'has_content': bool(e.get('content')),
+                'claim_count': n_claims,
+                'has_content': bool(has_content),
                 'last_activity': last_activity,
-                'created_at': e['created_at']
+                'created_at': created_at
             })
-            for child in self.get_links_from(eid):
-                if child.get('link_type') in ('child', 'wave', 'spawned'):
-                    nodes.extend(walk_tree(child['id'], depth + 1))
-            return nodes
-
-        all_nodes = walk_tree(root_entity_id)
+            if branch is not None:
+                branch_sizes[branch] = branch_sizes.get(branch, 0) + 1
         alerts = []
 
         empty_nodes = [n for n in all_nodes if n['claim_count'] == 0 and not n['has_content'] and n['depth'] > 0]
@@ -1642,37 +2343,26 @@ class KnowledgeBase:
             alerts.append({'type': 'deep_tree', 'severity': 'info', 'max_depth': max_depth,
                           'detail': f'Tree has {max_depth} levels — consider consolidation'})
 
-        if children:
-            child_sizes = []
-            for child in children:
-                subtree = walk_tree(child['id'])
-                child_sizes.append((child['title'][:30], len(subtree)))
-            if child_sizes:
-                sizes = [s for _, s in child_sizes]
-                avg_size = sum(sizes) / len(sizes)
-                max_size = max(sizes)
-                if max_size > avg_size * 3 and avg_size > 1:
-                    alerts.append({'type': 'imbalanced_tree', 'severity': 'info',
-                                  'detail': f'Largest branch ({max_size} nodes) is {max_size/avg_size:.1f}x average ({avg_size:.0f})'})
-
-        evals = self.conn.execute(
-            "SELECT * FROM evaluations WHERE parent_id = ? ORDER BY id DESC LIMIT 1",
-            (root_entity_id,)
-        ).fetchone()
+        if branch_sizes:
+            sizes = list(branch_sizes.values())
+            avg_size = sum(sizes) / len(sizes)
+            max_size = max(sizes)
+            if max_size > avg_size * 3 and avg_size > 1:
+                alerts.append({'type': 'imbalanced_tree', 'severity': 'info',
+                              'detail': f'Largest branch ({max_size} nodes) is {max_size/avg_size:.1f}x average ({avg_size:.0f})'})
+
+        evals = db.execute(_SQL_MONITOR_EVAL, (root_entity_id,)).fetchone()
         eval_info = None
         if evals:
-            history = json.loads(evals['confidence_history'] or '[]')
             eval_info = {
                 'confidence': evals['confidence'], 'iteration': evals['iteration'],
                 'status': evals['status'],
-                'trajectory': history[-5:] if history else [],
-                'stalled': len(history) >= 3 and all(
-                    abs(h.get('delta', 0)) < 0.02 for h in history[-3:]
-                ) if history else False
+                'trajectory': loads(evals['trajectory']),
+                'stalled': bool(evals['stalled'])
             }
             if eval_info['stalled']:
                 alerts.append({'type': 'confidence_stalled', 'severity': 'warning',
-                              'detail': f'Confidence stalled at {evals["confidence"]:.2f} for {len(history)} iterations'})
+                              'detail': f'Confidence stalled at {evals["confidence"]:.2f} for {evals["n"]} iterations'})
 
         total_claims = sum(n['claim_count'] for n in all_nodes)
         nodes_with_content = sum(1 for n in all_nodes if n['has_content'])
@@ -1697,22 +2387,24 @@ class KnowledgeBase:
 
     def get_domain_profile(self, domain: str) -> Optional[Dict[str, Any]]:
         """Get a domain expert profile by name."""
-        from researcher.kb_domains import get_domain_profile
-        return get_domain_profile(self, domain)
+        return kb_domains.get_domain_profile(self, domain)
 
     def match_domain_expert(self, text: str) -> List[Dict[str, Any]]:
         """Match text to relevant domain expert profiles."""
-        from researcher.kb_domains import match_domain_expert
-        return match_domain_expert(self, text)
+        return kb_domains.match_domain_expert(self, text)
 
     def domain_review(self, entity_id: str, domain: str) -> Dict[str, Any]:
         """Apply domain-specific review to an entity's claims."""
-        from researcher.kb_domains import domain_review
-        return domain_review(self, entity_id, domain)
+        return kb_domains.domain_review(self, entity_id, domain)
 
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Close database connections (writer and any per-thread readers).
+        Buffered embeddings are written first. A KB that is never closed
+        writes them from its finalizer, on garbage collection or at exit;
+        only a hard exit (os._exit, a kill signal) loses them."""
+        if self._vec_buffer and self._finalizer.alive:
+            self.flush_embeddings()
+        self._finalizer()
 
 
 # Example usage
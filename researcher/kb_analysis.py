@@ -1,161 +1,233 @@
 """Analysis functions extracted from KnowledgeBase."""
 
-import json
 import re
 import sqlite3
 from datetime import datetime, timedelta
 
+from researcher._util import load_meta, rows_to_dicts
+
+# check_contradictions / check_corroboration: each comes in a fixed
+# all-claims and per-entity variant, so the statement text never changes
+# between calls and stays in the connection's statement cache. (An
+# "? IS NULL OR c.entity_id = ?" filter would also be constant, but it
+# keeps the planner off idx_claims_entity_status.)
+_SQL_CONTRADICTIONS_BASE = """
+SELECT c.id as claim_id, c.claim_text, c.entity_id, c.evidence_grade, c.confidence,
+       cs.relationship, s.id as source_id, s.url, s.title as source_title, s.credibility
+FROM claims c
+JOIN claim_sources cs ON c.id = cs.claim_id
+JOIN sources s ON cs.source_id = s.id
+WHERE cs.relationship IN ('contradicts', 'refutes') {}
+ORDER BY s.credibility DESC
+"""
+_SQL_CONTRADICTIONS = _SQL_CONTRADICTIONS_BASE.format("")
+_SQL_CONTRADICTIONS_FOR_ENTITY = _SQL_CONTRADICTIONS_BASE.format("AND c.entity_id = ?")
+
+# Per-claim support/contradiction counts and the count-weighted
+# credibility balance, scored in SQL so ORDER BY and LIMIT apply to it
+_SQL_CORROBORATION_BASE = """
+SELECT claim_id, claim_text, entity_id, evidence_grade,
+       supporting_sources, contradicting_sources,
+       CASE WHEN supporting_sources + contradicting_sources = 0 THEN 0.0
+            ELSE round((supporting_sources * avg_sup - contradicting_sources * avg_con)
+                       / (supporting_sources + contradicting_sources), 3)
+       END AS corroboration_score,
+       confidence
+FROM (
+    SELECT c.id AS claim_id, c.claim_text, c.entity_id, c.evidence_grade, c.confidence,
+           COUNT(CASE WHEN cs.relationship IN ('supports','confirms') THEN 1 END) AS supporting_sources,
+           COUNT(CASE WHEN cs.relationship IN ('contradicts','refutes') THEN 1 END) AS contradicting_sources,
+           COALESCE(AVG(CASE WHEN cs.relationship IN ('supports','confirms') THEN s.credibility END), 0.0) AS avg_sup,
+           COALESCE(AVG(CASE WHEN cs.relationship IN ('contradicts','refutes') THEN s.credibility END), 0.0) AS avg_con
+    FROM claims c
+    LEFT JOIN claim_sources cs ON c.id = cs.claim_id
+    LEFT JOIN sources s ON cs.source_id = s.id
+    {}
+    GROUP BY c.id
+)
+ORDER BY corroboration_score DESC, supporting_sources DESC
+LIMIT ?
+"""
+_SQL_CORROBORATION = _SQL_CORROBORATION_BASE.format("")
+_SQL_CORROBORATION_FOR_ENTITY = _SQL_CORROBORATION_BASE.format("WHERE c.entity_id = ?")
+
+# apply_confidence_decay: stale active claims whose decayed confidence
+# (kb_decayed, registered per call) is lower than the stored one
+_SQL_DECAY_CANDIDATES = """
+SELECT id, substr(claim_text, 1, 80) AS claim_text, confidence, created_at,
+       kb_decayed(confidence, created_at) AS new_confidence
+FROM claims
+WHERE created_at < ? AND status = 'active' AND new_confidence < confidence
+"""
+
+# find_prior_research: top entities and top claims in one round trip. Each
+# branch keeps its own order and limit; rk orders within a kind (BM25 with
+# titles weighted over content for entities, confidence for claims).
+_SQL_PRIOR_RESEARCH_FTS = """
+SELECT * FROM (
+    SELECT 'e' AS kind, e.id, e.title AS text, substr(e.content, 1, 200) AS preview,
+           e.created_at, NULL AS grade, NULL AS confidence, NULL AS entity_id,
+           bm25(entities_fts, 0.0, 2.0, 1.0) AS rk
+    FROM entities_fts f JOIN entities e ON e.rowid = f.rowid
+    WHERE entities_fts MATCH ?1
+    ORDER BY rk LIMIT 10
+)
+UNION ALL
+SELECT * FROM (
+    SELECT 'c', c.id, c.claim_text, NULL, NULL, c.evidence_grade, c.confidence,
+           c.entity_id, -c.confidence
+    FROM claims_fts f JOIN claims c ON c.id = f.rowid
+    WHERE claims_fts MATCH ?1 AND c.confidence >= ?2 AND c.status = 'active'
+    ORDER BY c.confidence DESC LIMIT 20
+)
+ORDER BY kind DESC, rk
+"""
+# Same shape for when the query is not valid FTS5 syntax
+_SQL_PRIOR_RESEARCH_LIKE = """
+SELECT * FROM (
+    SELECT 'e' AS kind, id, title AS text, substr(content, 1, 200) AS preview,
+           created_at, NULL AS grade, NULL AS confidence, NULL AS entity_id
+    FROM entities
+    WHERE (title LIKE ?1 OR content LIKE ?1)
+    ORDER BY updated_at DESC LIMIT 10
+)
+UNION ALL
+SELECT * FROM (
+    SELECT 'c', id, claim_text, NULL, NULL, evidence_grade, confidence, entity_id
+    FROM claims
+    WHERE claim_text LIKE ?1 AND confidence >= ?2 AND status = 'active'
+    ORDER BY confidence DESC LIMIT 20
+)
+"""
+
+# discover_perspectives: the 20 most recently updated matching entities,
+# and counts over the top 30 matching active claims
+_SQL_PERSPECTIVE_ENTITIES_FTS = """
+SELECT e.id, e.title, e.metadata
+FROM entities_fts f JOIN entities e ON e.rowid = f.rowid
+WHERE entities_fts MATCH ?1
+ORDER BY e.updated_at DESC LIMIT 20
+"""
+_SQL_PERSPECTIVE_CLAIMS_FTS = """
+SELECT COUNT(*), SUM(evidence_grade IN ('strong', 'moderate')) FROM (
+    SELECT c.evidence_grade FROM claims c
+    WHERE c.status = 'active' AND (
+        c.id IN (SELECT rowid FROM claims_fts WHERE claims_fts MATCH ?1)
+        OR c.entity_id IN (SELECT e.id FROM entities_fts f JOIN entities e ON e.rowid = f.rowid
+                           WHERE entities_fts MATCH ?1))
+    ORDER BY c.confidence DESC LIMIT 30
+)
+"""
+_SQL_PERSPECTIVE_ENTITIES_LIKE = """
+SELECT id, title, metadata FROM entities
+WHERE (title LIKE ?1 OR content LIKE ?1)
+ORDER BY updated_at DESC LIMIT 20
+"""
+_SQL_PERSPECTIVE_CLAIMS_LIKE = """
+SELECT COUNT(*), SUM(evidence_grade IN ('strong', 'moderate')) FROM (
+    SELECT c.evidence_grade FROM claims c
+    JOIN entities e ON c.entity_id = e.id
+    WHERE (e.title LIKE ?1 OR e.content LIKE ?1 OR c.claim_text LIKE ?1)
+    AND c.status = 'active'
+    ORDER BY c.confidence DESC LIMIT 30
+)
+"""
+
+_STANDARD_PERSPECTIVES = (
+    'technical_feasibility', 'economic_analysis', 'risk_assessment',
+    'competitive_landscape', 'historical_context', 'future_projections',
+    'stakeholder_impact', 'regulatory_environment', 'implementation_challenges',
+    'alternative_approaches', 'environmental_impact', 'scalability'
+)
+# Perspective -> its keywords, matched against the words of an angle
+# (split on underscores too, since angles are often snake_case)
+_ANGLE_WORD = re.compile(r'[a-z0-9]+')
+_PERSPECTIVE_KEYWORDS = {p: frozenset(p.split('_')) for p in _STANDARD_PERSPECTIVES}
+
 
 def check_contradictions(kb, entity_id=None):
     """Find claims that are contradicted by sources."""
-    query = """
-        SELECT c.id as claim_id, c.claim_text, c.entity_id, c.evidence_grade, c.confidence,
-               cs.relationship, s.id as source_id, s.url, s.title as source_title, s.credibility
-        FROM claims c
-        JOIN claim_sources cs ON c.id = cs.claim_id
-        JOIN sources s ON cs.source_id = s.id
-        WHERE cs.relationship IN ('contradicts', 'refutes')
-    """
-    params = []
     if entity_id:
-        query += " AND c.entity_id = ?"
-        params.append(entity_id)
-    query += " ORDER BY s.credibility DESC"
-
-    rows = kb.conn.execute(query, params).fetchall()
-    return [{k: r[k] for k in r.keys()} for r in rows]
-
-
-def check_corroboration(kb, entity_id=None):
-    """Score how well-corroborated each claim is."""
-    query = """
-        SELECT c.id, c.claim_text, c.entity_id, c.evidence_grade, c.confidence,
-               COUNT(CASE WHEN cs.relationship IN ('supports','confirms') THEN 1 END) as supporting_sources,
-               COUNT(CASE WHEN cs.relationship IN ('contradicts','refutes') THEN 1 END) as contradicting_sources,
-               AVG(CASE WHEN cs.relationship IN ('supports','confirms') THEN s.credibility END) as avg_support_credibility,
-               AVG(CASE WHEN cs.relationship IN ('contradicts','refutes') THEN s.credibility END) as avg_contradict_credibility
-        FROM claims c
-        LEFT JOIN claim_sources cs ON c.id = cs.claim_id
-        LEFT JOIN sources s ON cs.source_id = s.id
-    """
-    params = []
-    if entity_id:
-        query += " WHERE c.entity_id = ?"
-        params.append(entity_id)
-    query += " GROUP BY c.id ORDER BY supporting_sources DESC"
-
-    rows = kb.conn.execute(query, params).fetchall()
-    results = []
-    for r in rows:
-        n_sup = r['supporting_sources'] or 0
-        n_con = r['contradicting_sources'] or 0
-        avg_sup = r['avg_support_credibility'] or 0
-        avg_con = r['avg_contradict_credibility'] or 0
+        rows = kb._reader().execute(_SQL_CONTRADICTIONS_FOR_ENTITY, (entity_id,)).fetchall()
+    else:
+        rows = kb._reader().execute(_SQL_CONTRADICTIONS).fetchall()
+    return rows_to_dicts(rows)
 
-        if n_sup + n_con == 0:
-            corroboration = 0.0
-        else:
-            corroboration = round((n_sup * avg_sup - n_con * avg_con) / (n_sup + n_con), 3)
 
-        results.append({
-            'claim_id': r['id'],
-            'claim_text': r['claim_text'],
-            'entity_id': r['entity_id'],
-            'evidence_grade': r['evidence_grade'],
-            'supporting_sources': n_sup,
-            'contradicting_sources': n_con,
-            'corroboration_score': corroboration,
-            'confidence': r['confidence']
-        })
-    return results
+def check_corroboration(kb, entity_id=None, limit=None):
+    """Score how well-corroborated each claim is, best-corroborated first."""
+    # A negative LIMIT means no limit in SQLite
+    limit = -1 if limit is None else limit
+    if entity_id:
+        rows = kb._reader().execute(_SQL_CORROBORATION_FOR_ENTITY, (entity_id, limit)).fetchall()
+    else:
+        rows = kb._reader().execute(_SQL_CORROBORATION, (limit,)).fetchall()
+    return rows_to_dicts(rows)
 
 
 def apply_confidence_decay(kb, days_threshold=30, decay_rate=0.02):
     """Decay confidence on claims older than threshold."""
     if days_threshold <= 0:
         days_threshold = 1
-    cutoff = (datetime.utcnow() - timedelta(days=days_threshold)).isoformat()
-
-    rows = kb.conn.execute(
-        "SELECT id, claim_text, confidence, created_at FROM claims WHERE created_at < ? AND status = 'active'",
-        (cutoff,)
-    ).fetchall()
-
-    affected = []
-    for row in rows:
-        created = datetime.fromisoformat(row['created_at'])
-        age_days = (datetime.utcnow() - created).days
-        periods = (age_days - days_threshold) // days_threshold + 1
-        new_conf = max(0.1, round(row['confidence'] * ((1 - decay_rate) ** periods), 3))
-
-        if new_conf < row['confidence']:
-            kb.conn.execute(
+    now = datetime.utcnow()
+    cutoff = (now - timedelta(days=days_threshold)).isoformat()
+
+    def decayed(confidence, created_at):
+        periods = ((now - datetime.fromisoformat(created_at)).days - days_threshold) // days_threshold + 1
+        return max(0.1, round(confidence * ((1 - decay_rate) ** periods), 3))
+
+    # The decay is scored inside the SELECT, so only claims whose
+    # confidence actually drops come back to Python. Registering, reading
+    # and updating share one transaction so no other writer can change a
+    # confidence between the SELECT and its UPDATE.
+    with kb.bulk():
+        kb.conn.create_function("kb_decayed", 2, decayed, deterministic=True)
+        rows = kb.conn.execute(_SQL_DECAY_CANDIDATES, (cutoff,)).fetchall()
+        if rows:
+            kb.conn.executemany(
                 "UPDATE claims SET confidence = ? WHERE id = ?",
-                (new_conf, row['id'])
+                [(r['new_confidence'], r['id']) for r in rows]
             )
-            affected.append({
-                'claim_id': row['id'],
-                'claim_text': row['claim_text'][:80],
-                'old_confidence': row['confidence'],
-                'new_confidence': new_conf,
-                'age_days': age_days
-            })
-
-    kb.conn.commit()
-    return affected
+    return [
+        {
+            'claim_id': r['id'],
+            'claim_text': r['claim_text'],
+            'old_confidence': r['confidence'],
+            'new_confidence': r['new_confidence'],
+            'age_days': (now - datetime.fromisoformat(r['created_at'])).days
+        }
+        for r in rows
+    ]
 
 
 def find_prior_research(kb, query, min_confidence=0.4):
     """Search existing KB for relevant prior entities and claims using FTS5."""
-    fts_query = ' OR '.join(query.split())
+    # Any-term match, ranked by BM25. Each term is quoted so punctuation
+    # and bare keywords (AND, NOT, NEAR) cannot break the MATCH syntax.
+    fts_query = ' OR '.join('"%s"' % t.replace('"', '""') for t in query.split())
 
+    db = kb._reader()
     try:
-        entities = kb.conn.execute("""
-            SELECT e.id, e.title, e.content, e.metadata, e.created_at
-            FROM entities e
-            JOIN entities_fts f ON f.entity_id = e.id
-            WHERE entities_fts MATCH ?
-            ORDER BY rank LIMIT 10
-        """, (fts_query,)).fetchall()
+        rows = db.execute(_SQL_PRIOR_RESEARCH_FTS, (fts_query, min_confidence)).fetchall()
     except sqlite3.OperationalError:
-        search_term = f"%{query}%"
-        entities = kb.conn.execute("""
-            SELECT id, title, content, metadata, created_at FROM entities
-            WHERE (title LIKE ? OR content LIKE ?)
-            ORDER BY updated_at DESC LIMIT 10
-        """, (search_term, search_term)).fetchall()
+        rows = db.execute(_SQL_PRIOR_RESEARCH_LIKE, (f"%{query}%", min_confidence)).fetchall()
 
-    try:
-        claims = kb.conn.execute("""
-            SELECT c.id, c.claim_text, c.evidence_grade, c.confidence, c.entity_id
-            FROM claims c
-            JOIN claims_fts f ON CAST(f.claim_id AS INTEGER) = c.id
-            WHERE claims_fts MATCH ? AND c.confidence >= ? AND c.status = 'active'
-            ORDER BY c.confidence DESC LIMIT 20
-        """, (fts_query, min_confidence)).fetchall()
-    except sqlite3.OperationalError:
-        search_term = f"%{query}%"
-        claims = kb.conn.execute("""
-            SELECT c.id, c.claim_text, c.evidence_grade, c.confidence, c.entity_id
-            FROM claims c
-            WHERE c.claim_text LIKE ? AND c.confidence >= ? AND c.status = 'active'
-            ORDER BY c.confidence DESC LIMIT 20
-        """, (search_term, min_confidence)).fetchall()
+    entities = []
+    claims = []
+    for r in rows:
+        if r['kind'] == 'e':
+            entities.append({'id': r['id'], 'title': r['text'],
+                             'content_preview': r['preview'] or '',
+                             'created_at': r['created_at']})
+        else:
+            claims.append({'id': r['id'], 'claim_text': r['text'],
+                           'grade': r['grade'], 'confidence': r['confidence'],
+                           'entity_id': r['entity_id']})
 
     return {
         'query': query,
-        'prior_entities': [
-            {'id': e['id'], 'title': e['title'],
-             'content_preview': (e['content'] or '')[:200],
-             'created_at': e['created_at']}
-            for e in entities
-        ],
-        'prior_claims': [
-            {'id': c['id'], 'claim_text': c['claim_text'],
-             'grade': c['evidence_grade'], 'confidence': c['confidence'],
-             'entity_id': c['entity_id']}
-            for c in claims
-        ],
+        'prior_entities': entities,
+        'prior_claims': claims,
         'entity_count': len(entities),
         'claim_count': len(claims)
     }
@@ -163,53 +235,46 @@ def find_prior_research(kb, query, min_confidence=0.4):
 
 def discover_perspectives(kb, topic):
     """Discover research perspectives from existing KB entities on a topic."""
-    search_term = f"%{topic}%"
-    entities = kb.conn.execute("""
-        SELECT id, title, content, metadata FROM entities
-        WHERE (title LIKE ? OR content LIKE ?)
-        ORDER BY updated_at DESC LIMIT 20
-    """, (search_term, search_term)).fetchall()
+    # The topic is matched as one quoted phrase, the FTS counterpart of
+    # the LIKE '%topic%' fallback. A blank topic keeps the LIKE path,
+    # where it matches everything rather than nothing.
+    db = kb._reader()
+    entities = None
+    if topic.strip():
+        phrase = '"%s"' % topic.replace('"', '""')
+        try:
+            entities = db.execute(_SQL_PERSPECTIVE_ENTITIES_FTS, (phrase,)).fetchall()
+            claims = db.execute(_SQL_PERSPECTIVE_CLAIMS_FTS, (phrase,)).fetchone()
+        except sqlite3.OperationalError:
+            entities = None
+    if entities is None:
+        search_term = f"%{topic}%"
+        entities = db.execute(_SQL_PERSPECTIVE_ENTITIES_LIKE, (search_term,)).fetchall()
+        claims = db.execute(_SQL_PERSPECTIVE_CLAIMS_LIKE, (search_term,)).fetchone()
 
     existing_angles = set()
     entity_angles = []
     for e in entities:
-        meta = json.loads(e['metadata'] or '{}')
+        meta = load_meta(e['metadata'])
         angle = meta.get('angle', '')
         if angle:
             existing_angles.add(angle)
             entity_angles.append({'id': e['id'], 'title': e['title'], 'angle': angle})
 
-    claims = kb.conn.execute("""
-        SELECT c.claim_text, c.evidence_grade, c.entity_id FROM claims c
-        JOIN entities e ON c.entity_id = e.id
-        WHERE (e.title LIKE ? OR e.content LIKE ? OR c.claim_text LIKE ?)
-        AND c.status = 'active'
-        ORDER BY c.confidence DESC LIMIT 30
-    """, (search_term, search_term, search_term)).fetchall()
-
-    standard_perspectives = [
-        'technical_feasibility', 'economic_analysis', 'risk_assessment',
-        'competitive_landscape', 'historical_context', 'future_projections',
-        'stakeholder_impact', 'regulatory_environment', 'implementation_challenges',
-        'alternative_approaches', 'environmental_impact', 'scalability'
-    ]
-
     covered = set()
     for angle in existing_angles:
-        angle_lower = angle.lower()
-        for sp in standard_perspectives:
-            if any(word in angle_lower for word in sp.split('_')):
-                covered.add(sp)
+        toks = set(_ANGLE_WORD.findall(angle.lower()))
+        covered.update(p for p, kw in _PERSPECTIVE_KEYWORDS.items() if not kw.isdisjoint(toks))
 
-    uncovered = [p for p in standard_perspectives if p not in covered]
+    uncovered = [p for p in _STANDARD_PERSPECTIVES if p not in covered]
 
     return {
         'topic': topic,
         'existing_entities': len(entities),
         'existing_angles': list(existing_angles),
         'entity_angles': entity_angles[:10],
-        'existing_claims': len(claims),
-        'strong_claims': len([c for c in claims if c['evidence_grade'] in ('strong', 'moderate')]),
+        'existing_claims': claims[0],
+        'strong_claims': claims[1] or 0,
         'suggested_perspectives': uncovered[:6],
-        'coverage_ratio': f"{len(covered)}/{len(standard_perspectives)}"
+        'coverage_ratio': f"{len(covered)}/{len(_STANDARD_PERSPECTIVES)}"
     }
@@ -1,7 +1,54 @@
 """Decision framework (MCDA) functions extracted from KnowledgeBase."""
 
-import json
 from datetime import datetime
+from functools import lru_cache
+
+from researcher._util import dumps, loads, row_dict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Columns of a decisions row stored as JSON text
+_JSON_FIELDS = ('criteria', 'alternatives', 'scores', 'weights')
+
+
+_SQL_DECISION_INPUTS = (
+    "SELECT criteria, weights, scores, recommendation FROM decisions WHERE id = ?"
+)
+
+
+@lru_cache(maxsize=256)
+def _parse_inputs(criteria, weights, scores):
+    """Decode a decision's criteria, weights and scores columns. Keyed on
+    the JSON text itself, so a repeat sweep over an unchanged decision
+    skips the parser and any UPDATE is a miss. The decoded values are
+    shared between calls: read them, never mutate them."""
+    return loads(criteria), loads(weights), loads(scores)
+
+
+@lru_cache(maxsize=None)
+def _numba_sweep():
+    """The JIT-compiled sensitivity kernel, or None without numba.
+    Imported on first use so numba's startup cost is only paid here."""
+    try:
+        from researcher._mcda_kernels import sweep
+    except ImportError:
+        return None
+    return sweep
+
+
+def _pack(criteria, weights, scores):
+    """Lay a decision out as matrices: alternative names, the (alternatives x
+    criteria) score matrix S (missing scores are 0) and the weight vector w
+    in criteria order (missing weights are 0)."""
+    names = [c['name'] for c in criteria]
+    alts = list(scores)
+    S = np.array([[alt_scores.get(n, 0.0) for n in names] for alt_scores in scores.values()],
+                 dtype=np.float64).reshape(len(alts), len(names))
+    w = np.array([weights.get(n, 0.0) for n in names], dtype=np.float64)
+    return alts, names, S, w
 
 
 def add_decision(kb, title, criteria, alternatives, entity_id=None, weights=None):
@@ -12,33 +59,37 @@ def add_decision(kb, title, criteria, alternatives, entity_id=None, weights=None
         w = 1.0 / len(criteria)
         weights = {c['name']: round(w, 4) for c in criteria}
 
-    cursor = kb.conn.execute(
-        "INSERT INTO decisions (entity_id, title, criteria, alternatives, weights, created_at, updated_at) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (entity_id, title, json.dumps(criteria), json.dumps(alternatives),
-         json.dumps(weights), now, now)
-    )
-    kb.conn.commit()
+    with kb.bulk():
+        cursor = kb.conn.execute(
+            "INSERT INTO decisions (entity_id, title, criteria, alternatives, weights, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (entity_id, title, dumps(criteria), dumps(alternatives),
+             dumps(weights), now, now)
+        )
     return cursor.lastrowid
 
 
 def score_alternatives(kb, decision_id, scores):
     """Score alternatives against criteria. Auto-computes weighted recommendation."""
-    row = kb.conn.execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
+    row = kb._reader().execute(_SQL_DECISION_INPUTS, (decision_id,)).fetchone()
     if not row:
         return {"error": "decision not found"}
 
-    weights = json.loads(row['weights'])
-    criteria = json.loads(row['criteria'])
+    criteria, weights, _ = _parse_inputs(row['criteria'], row['weights'], row['scores'])
 
-    results = {}
-    for alt, alt_scores in scores.items():
-        weighted = 0.0
-        for c in criteria:
-            cname = c['name']
-            if cname in alt_scores and cname in weights:
-                weighted += alt_scores[cname] * weights[cname]
-        results[alt] = round(weighted, 4)
+    if np is not None and scores:
+        # One matrix-vector product for every alternative
+        alts, _, S, w = _pack(criteria, weights, scores)
+        results = {alt: round(v, 4) for alt, v in zip(alts, (S @ w).tolist())}
+    else:
+        results = {}
+        for alt, alt_scores in scores.items():
+            weighted = 0.0
+            for c in criteria:
+                cname = c['name']
+                if cname in alt_scores and cname in weights:
+                    weighted += alt_scores[cname] * weights[cname]
+            results[alt] = round(weighted, 4)
 
     if results:
         recommendation = max(results, key=results.get)
@@ -53,12 +104,11 @@ def score_alternatives(kb, decision_id, scores):
         recommendation = None
         rationale = "No alternatives scored."
 
-    now = kb._now()
-    kb.conn.execute(
-        "UPDATE decisions SET scores = ?, recommendation = ?, rationale = ?, status = 'scored', updated_at = ? WHERE id = ?",
-        (json.dumps(scores), recommendation, rationale, now, decision_id)
-    )
-    kb.conn.commit()
+    with kb.bulk():
+        kb.conn.execute(
+            "UPDATE decisions SET scores = ?, recommendation = ?, rationale = ?, status = 'scored', updated_at = ? WHERE id = ?",
+            (dumps(scores), recommendation, rationale, kb._now(), decision_id)
+        )
 
     return {
         'decision_id': decision_id,
@@ -71,42 +121,43 @@ def score_alternatives(kb, decision_id, scores):
 
 def sensitivity_analysis(kb, decision_id, perturbation=0.1):
     """Check how sensitive the recommendation is to weight changes."""
-    row = kb.conn.execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
+    row = kb._reader().execute(_SQL_DECISION_INPUTS, (decision_id,)).fetchone()
     if not row:
         return {"error": "decision not found"}
 
-    weights = json.loads(row['weights'])
-    scores = json.loads(row['scores'])
-    criteria = json.loads(row['criteria'])
+    criteria, weights, scores = _parse_inputs(row['criteria'], row['weights'], row['scores'])
     original_rec = row['recommendation']
 
     if not scores:
         return {"error": "decision not yet scored"}
 
-    flips = []
-    for c in criteria:
-        cname = c['name']
-        for direction in [-perturbation, perturbation]:
-            test_weights = dict(weights)
-            test_weights[cname] = max(0, min(1, test_weights[cname] + direction))
-            total = sum(test_weights.values())
-            if total > 0:
-                test_weights = {k: v / total for k, v in test_weights.items()}
-
-            results = {}
-            for alt, alt_scores in scores.items():
-                weighted = sum(alt_scores.get(cn, 0) * test_weights.get(cn, 0) for cn in [cr['name'] for cr in criteria])
-                results[alt] = round(weighted, 4)
-
-            new_rec = max(results, key=results.get) if results else None
-            if new_rec != original_rec:
-                flips.append({
-                    'criterion': cname,
-                    'weight_change': round(direction, 3),
-                    'original': original_rec,
-                    'flipped_to': new_rec,
-                    'new_scores': results
-                })
+    if np is not None:
+        flips = _sensitivity_flips(criteria, weights, scores, original_rec, perturbation)
+    else:
+        flips = []
+        for c in criteria:
+            cname = c['name']
+            for direction in [-perturbation, perturbation]:
+                test_weights = dict(weights)
+                test_weights[cname] = max(0, min(1, test_weights[cname] + direction))
+                total = sum(test_weights.values())
+                if total > 0:
+                    test_weights = {k: v / total for k, v in test_weights.items()}
+
+                results = {}
+                for alt, alt_scores in scores.items():
+                    weighted = sum(alt_scores.get(cn, 0) * test_weights.get(cn, 0) for cn in [cr['name'] for cr in criteria])
+                    results[alt] = round(weighted, 4)
+
+                new_rec = max(results, key=results.get) if results else None
+                if new_rec != original_rec:
+                    flips.append({
+                        'criterion': cname,
+                        'weight_change': round(direction, 3),
+                        'original': original_rec,
+                        'flipped_to': new_rec,
+                        'new_scores': results
+                    })
 
     return {
         'decision_id': decision_id,
@@ -118,12 +169,61 @@ def sensitivity_analysis(kb, decision_id, perturbation=0.1):
     }
 
 
+def _scenario_totals(weights, names, perturbation):
+    """Renormalization total per sensitivity scenario (criterion i nudged
+    down, then up), summed over all stored weights with Python's sum() in
+    dict order, exactly as the scalar path computes it."""
+    totals = []
+    for name in names:
+        for direction in (-perturbation, perturbation):
+            test_weights = dict(weights)
+            test_weights[name] = max(0, min(1, weights.get(name, 0.0) + direction))
+            totals.append(sum(test_weights.values()))
+    return np.array(totals, dtype=np.float64)
+
+
+def _sensitivity_flips(criteria, weights, scores, original_rec, perturbation):
+    """Vectorized sensitivity sweep: every perturbed weight vector is a row
+    of W (criterion i nudged down, then up, then renormalized), so one
+    W @ S.T scores all 2 * n_criteria scenarios at once."""
+    alts, names, S, w = _pack(criteria, weights, scores)
+    k = len(names)
+    directions = [-perturbation, perturbation] * k
+    totals = _scenario_totals(weights, names, perturbation)
+    sweep = _numba_sweep()
+    if sweep is not None:
+        # Fused nudge / renormalize / score loops, compiled once per shape
+        R = sweep(S, w, totals, float(perturbation))
+    else:
+        idx = np.repeat(np.arange(k), 2)
+        nudged = np.clip(w[idx] + directions, 0.0, 1.0)
+        W = np.tile(w, (2 * k, 1))
+        W[np.arange(2 * k), idx] = nudged
+        W /= np.where(totals > 0, totals, 1.0)[:, None]
+        R = W @ S.T
+
+    # One row of alternative scores per scenario
+    R = R.tolist()
+    flips = []
+    for j, row in enumerate(R):
+        results = {alt: round(v, 4) for alt, v in zip(alts, row)}
+        new_rec = max(results, key=results.get)
+        if new_rec != original_rec:
+            flips.append({
+                'criterion': names[j // 2],
+                'weight_change': round(directions[j], 3),
+                'original': original_rec,
+                'flipped_to': new_rec,
+                'new_scores': results
+            })
+    return flips
+
+
 def get_decision(kb, decision_id):
     """Get a decision by ID."""
-    row = kb.conn.execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
+    row = kb._reader().execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
     if not row:
         return None
-    d = {k: row[k] for k in row.keys()}
-    for field in ('criteria', 'alternatives', 'scores', 'weights'):
-        d[field] = json.loads(d[field])
+    d = row_dict(row)
+    d.update({field: loads(d[field]) for field in _JSON_FIELDS})
     return d
@@ -40,6 +40,14 @@ DOMAIN_PROFILES = {
 }
 
 
+# Per-domain keywords and the static fields match_domain_expert reports,
+# unpacked once at import
+_DOMAIN_MATCHERS = tuple(
+    (domain, tuple(p['knowledge_keywords']), p['role'], p['goal'], p['verification_focus'])
+    for domain, p in DOMAIN_PROFILES.items()
+)
+
+
 def get_domain_profile(kb, domain):
     """Get a domain expert profile by name."""
     return DOMAIN_PROFILES.get(domain)
@@ -49,15 +57,15 @@ def match_domain_expert(kb, text):
     """Match text to relevant domain expert profiles, ranked by relevance."""
     text_lower = text.lower()
     scored = []
-    for domain, profile in DOMAIN_PROFILES.items():
-        score = sum(1 for kw in profile['knowledge_keywords'] if kw in text_lower)
+    for domain, keywords, role, goal, focus in _DOMAIN_MATCHERS:
+        score = sum(kw in text_lower for kw in keywords)
         if score > 0:
             scored.append({
                 'domain': domain,
                 'score': score,
-                'role': profile['role'],
-                'goal': profile['goal'],
-                'verification_focus': profile['verification_focus']
+                'role': role,
+                'goal': goal,
+                'verification_focus': focus
             })
     scored.sort(key=lambda x: x['score'], reverse=True)
     return scored
@@ -69,7 +77,7 @@ def domain_review(kb, entity_id, domain):
     if not profile:
         return {"error": f"unknown domain: {domain}"}
 
-    claims = kb.list_claims(entity_id=entity_id)
+    claims = kb.list_claims(entity_id=entity_id, parse_metadata=False)
     relevant = []
     irrelevant = []
 
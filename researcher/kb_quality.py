@@ -22,7 +22,7 @@ def review(kb, entity_id, depth='full'):
     all_issues = []
 
     # ── Structural reflection (always) ──────────────────────────
-    claims = kb.list_claims(entity_id=entity_id)
+    claims = kb.list_claims(entity_id=entity_id, parse_metadata=False)
     sources = kb.list_sources(entity_id=entity_id)
 
     reflect_issues = []
@@ -83,7 +83,7 @@ def review(kb, entity_id, depth='full'):
     children = kb.get_links_from(entity_id)
     empty_children = []
     for child in children:
-        child_claims = kb.list_claims(entity_id=child['id'])
+        child_claims = kb.list_claims(entity_id=child['id'], parse_metadata=False)
         if not child_claims:
             empty_children.append(child['title'][:60])
     if empty_children:
@@ -121,7 +121,7 @@ def review(kb, entity_id, depth='full'):
             # 1. Circular reasoning detection
             claim_texts = {c['id']: c['claim_text'].lower() for c in claims}
             for c in claims:
-                c_sources = kb.conn.execute("""
+                c_sources = kb._reader().execute("""
                     SELECT s.snippet FROM sources s
                     JOIN claim_sources cs ON s.id = cs.source_id
                     WHERE cs.claim_id = ?
@@ -284,7 +284,7 @@ def review(kb, entity_id, depth='full'):
         # 5. Weak coverage
         thin = []
         for child in children:
-            child_claims = kb.list_claims(entity_id=child['id'])
+            child_claims = kb.list_claims(entity_id=child['id'], parse_metadata=False)
             if 0 < len(child_claims) < 3:
                 child_entity = kb.get_entity(child['id'])
                 if child_entity:
@@ -453,7 +453,7 @@ def review(kb, entity_id, depth='full'):
 
 def qa(kb, entity_id, n_samples=5, search_fn=None):
     """Unified quality assurance: self-consistency grading + SAFE verification."""
-    claims = kb.list_claims(entity_id=entity_id)
+    claims = kb.list_claims(entity_id=entity_id, parse_metadata=False)
 
     # ── Self-consistency grading ────────────────────────────────
     from researcher.kb_verify import grade_claim_sc, verify_claim
@@ -3,6 +3,8 @@
 import json
 from datetime import datetime
 
+from researcher._util import row_dict
+
 
 def generate_report(kb, entity_id, include_children=True):
     """Generate a structured report with inline citations from an entity tree."""
@@ -26,7 +28,7 @@ def generate_report(kb, entity_id, include_children=True):
     # Get all claims for these entities
     all_claims = []
     for eid in entity_ids:
-        all_claims.extend(kb.list_claims(entity_id=eid))
+        all_claims.extend(kb.list_claims(entity_id=eid, parse_metadata=False))
 
     # Batch-load all claim-source mappings (avoids N+1)
     source_map = {}  # source_id -> source + ref number
@@ -35,7 +37,7 @@ def generate_report(kb, entity_id, include_children=True):
     if all_claims:
         claim_ids = [c['id'] for c in all_claims]
         placeholders = ','.join('?' * len(claim_ids))
-        rows = kb.conn.execute(f"""
+        rows = kb._reader().execute(f"""
             SELECT cs.claim_id, s.* FROM sources s
             JOIN claim_sources cs ON s.id = cs.source_id
             WHERE cs.claim_id IN ({placeholders})
@@ -43,7 +45,8 @@ def generate_report(kb, entity_id, include_children=True):
         for r in rows:
             sid = r['id']
             if sid not in source_map:
-                source_map[sid] = {k: r[k] for k in r.keys() if k != 'claim_id'}
+                source_map[sid] = row_dict(r)
+                del source_map[sid]['claim_id']
                 source_map[sid]['ref'] = ref_counter
                 ref_counter += 1
             claim_source_map.setdefault(r['claim_id'], []).append(sid)
@@ -132,7 +135,7 @@ def generate_outline(kb, entity_id):
     sections = []
 
     # Summary section
-    claims = kb.list_claims(entity_id=entity_id)
+    claims = kb.list_claims(entity_id=entity_id, parse_metadata=False)
     strong = [c for c in claims if c['evidence_grade'] == 'strong']
     moderate = [c for c in claims if c['evidence_grade'] == 'moderate']
 
@@ -152,7 +155,7 @@ def generate_outline(kb, entity_id):
         if not child_entity:
             continue
 
-        child_claims = kb.list_claims(entity_id=child['id'])
+        child_claims = kb.list_claims(entity_id=child['id'], parse_metadata=False)
         child_strong = [c for c in child_claims if c['evidence_grade'] == 'strong']
         child_mod = [c for c in child_claims if c['evidence_grade'] == 'moderate']
         child_contested = [c for c in child_claims if c['evidence_grade'] == 'contested']
@@ -175,7 +178,7 @@ def generate_outline(kb, entity_id):
             gc_entity = kb.get_entity(gc['id'])
             if not gc_entity:
                 continue
-            gc_claims = kb.list_claims(entity_id=gc['id'])
+            gc_claims = kb.list_claims(entity_id=gc['id'], parse_metadata=False)
             section['subsections'].append({
                 'title': gc_entity['title'],
                 'level': 3,
@@ -200,7 +203,7 @@ def synthesize_entity(kb, entity_id, audience='technical'):
     if entity is None:
         return {"error": "entity not found"}
 
-    claims = kb.list_claims(entity_id=entity_id)
+    claims = kb.list_claims(entity_id=entity_id, parse_metadata=False)
     children = kb.get_links_from(entity_id)
 
     # Phase 1: Outline — group claims into themes
@@ -233,7 +236,7 @@ def synthesize_entity(kb, entity_id, audience='technical'):
 
         section_claims = []
         for c in theme_claims:
-            claim_sources = kb.conn.execute("""
+            claim_sources = kb._reader().execute("""
                 SELECT s.id, s.title, s.url FROM sources s
                 JOIN claim_sources cs ON s.id = cs.source_id
                 WHERE cs.claim_id = ?
@@ -294,14 +297,11 @@ def synthesize_entity(kb, entity_id, audience='technical'):
 
 def export_entity_markdown(kb, entity_id):
     """Export an entity as markdown with frontmatter."""
-    entity = kb._require_entity(entity_id)
+    entity = kb.get_entity_with_neighbors(entity_id)
     if entity is None:
         return None
 
-    links_from = kb.get_links_from(entity_id)
-    links_to = kb.get_links_to(entity_id)
-
-    md = f"""---
+    parts = [f"""---
 id: {entity['id']}
 title: {entity['title']}
 created_at: {entity['created_at']}
@@ -313,16 +313,16 @@ metadata: {json.dumps(entity['metadata'])}
 
 {entity['content']}
 
-"""
+"""]
 
-    if links_from:
-        md += "\n## Linked Entities\n\n"
-        for link in links_from:
-            md += f"- [{link['title']}](./{link['id']}.md) ({link['link_type']})\n"
+    if entity['links_from']:
+        parts.append("\n## Linked Entities\n\n")
+        for link in entity['links_from']:
+            parts.append(f"- [{link['title']}](./{link['id']}.md) ({link['link_type']})\n")
 
-    if links_to:
-        md += "\n## Referenced By\n\n"
-        for link in links_to:
-            md += f"- [{link['title']}](./{link['id']}.md) ({link['link_type']})\n"
+    if entity['links_to']:
+        parts.append("\n## Referenced By\n\n")
+        for link in entity['links_to']:
+            parts.append(f"- [{link['title']}](./{link['id']}.md) ({link['link_type']})\n")
 
-    return md
+    return "".join(parts)
@@ -1,5 +1,17 @@
 """Spawn budget and context functions extracted from KnowledgeBase."""
 
+# Distinct ids reachable from the root, root included. UNION (not UNION
+# ALL) drops ids already reached, which also stops the walk on cycles.
+_SQL_COUNT_TREE = """
+WITH RECURSIVE reach(id) AS (
+    SELECT ?
+    UNION
+    SELECT l.to_id FROM reach r JOIN links l ON l.from_id = r.id
+    WHERE l.link_type IN ('child', 'wave', 'spawned')
+)
+SELECT COUNT(*) FROM reach
+"""
+
 
 def check_spawn_budget(kb, entity_id, max_depth=8, max_total=400):
     """Check if an agent can spawn sub-agents from this entity."""
@@ -9,14 +21,14 @@ def check_spawn_budget(kb, entity_id, max_depth=8, max_total=400):
     root = entity_id
     visited = {entity_id}
     while True:
-        parents = kb.conn.execute(
+        parent = kb._raw_execute(
             "SELECT from_id FROM links WHERE to_id = ? AND link_type IN ('child', 'wave', 'spawned')",
             (current,)
-        ).fetchall()
-        if not parents:
+        ).fetchone()
+        if not parent:
             root = current
             break
-        parent_id = parents[0]['from_id']
+        parent_id = parent[0]
         if parent_id in visited:
             root = current
             break
@@ -50,22 +62,7 @@ def check_spawn_budget(kb, entity_id, max_depth=8, max_total=400):
 
 def _count_tree(kb, root_id):
     """Count all entities reachable from root via child/wave/spawned links."""
-    count = 1
-    visited = {root_id}
-    queue = [root_id]
-    while queue:
-        current = queue.pop(0)
-        children = kb.conn.execute(
-            "SELECT to_id FROM links WHERE from_id = ? AND link_type IN ('child', 'wave', 'spawned')",
-            (current,)
-        ).fetchall()
-        for row in children:
-            child_id = row['to_id']
-            if child_id not in visited:
-                visited.add(child_id)
-                queue.append(child_id)
-                count += 1
-    return count
+    return kb._raw_execute(_SQL_COUNT_TREE, (root_id,)).fetchone()[0]
 
 
 def record_spawn(kb, parent_id, title, content="", agent_type="researcher",
@@ -111,7 +108,7 @@ def get_spawn_context(kb, entity_id):
     if entity is None:
         return {'error': f'Entity {entity_id} not found'}
 
-    parents = kb.get_links_to(entity_id)
+    parents = kb.get_links_to_full(entity_id)
     parent_summaries = []
     for p in parents:
         if p.get('link_type') in ('child', 'wave', 'spawned'):
@@ -123,7 +120,7 @@ def get_spawn_context(kb, entity_id):
 
     siblings = []
     for p in parents:
-        children = kb.get_links_from(p['id'])
+        children = kb.get_links_from_full(p['id'])
         for c in children:
             if c['id'] != entity_id and c.get('link_type') in ('child', 'wave', 'spawned'):
                 siblings.append({
@@ -3,6 +3,32 @@
 import hashlib
 from datetime import datetime
 
+from researcher._util import dumps
+
+
+# k-nearest-neighbour query per vector backend: vec0 scans every vector,
+# vectorlite walks its HNSW graph. All yield (rowid, distance).
+_SQL_KNN = {
+    'vec0': "SELECT rowid, distance FROM vec_embeddings "
+            "WHERE embedding MATCH ? ORDER BY distance LIMIT ?",
+    'vec0_int8': "SELECT rowid, distance FROM vec_embeddings "
+                 "WHERE embedding MATCH vec_int8(?) ORDER BY distance LIMIT ?",
+    'vectorlite': "SELECT rowid, distance FROM vec_embeddings "
+                  "WHERE knn_search(embedding, knn_param(?, ?)) ORDER BY distance",
+}
+
+_SQL_VEC_INSERT = (
+    "INSERT INTO vec_embeddings (rowid, embedding) VALUES (?, ?)",
+    # Untagged blobs are read as float32; int8 ones must say so
+    "INSERT INTO vec_embeddings (rowid, embedding) VALUES (?, vec_int8(?))",
+)
+
+# Buffered single embeds (embed_entity/embed_claim) written per transaction
+_VEC_FLUSH_SIZE = 512
+
+# Search hits carry a 200-char content preview; don't fetch the rest
+_SQL_ENTITY_PREVIEW = "SELECT id, title, substr(content, 1, 200) AS content FROM entities WHERE id = ?"
+
 
 def _get_embedding_model(kb):
     """Lazy-load sentence-transformers model."""
@@ -16,11 +42,9 @@ def _get_embedding_model(kb):
 
 
 def _embed_text(kb, text):
-    """Embed text and return serialized float32 vector for sqlite-vec."""
-    import struct
+    """Embed text and return serialized float32 vector for the vector index."""
     model = _get_embedding_model(kb)
-    embedding = model.encode(text, normalize_embeddings=True)
-    return struct.pack(f'{len(embedding)}f', *embedding)
+    return _serialize(model.encode(text, normalize_embeddings=True), kb._vec_backend)
 
 
 def _text_hash(text):
@@ -35,32 +59,7 @@ def embed_entity(kb, entity_id):
     if not entity:
         return False
     text = f"{entity['title']}. {entity.get('content', '')}"[:2000]
-    text_h = _text_hash(text)
-
-    existing = kb.conn.execute(
-        "SELECT vec_rowid, text_hash FROM embedding_map WHERE source_table = 'entities' AND source_id = ?",
-        (entity_id,)
-    ).fetchone()
-    if existing and existing['text_hash'] == text_h:
-        return True
-
-    vec = _embed_text(kb, text)
-    now = kb._now()
-
-    if existing:
-        kb.conn.execute("UPDATE vec_embeddings SET embedding = ? WHERE rowid = ?",
-                          (vec, existing['vec_rowid']))
-        kb.conn.execute("UPDATE embedding_map SET text_hash = ?, embedded_at = ? WHERE vec_rowid = ?",
-                          (text_h, now, existing['vec_rowid']))
-    else:
-        cursor = kb.conn.execute("INSERT INTO vec_embeddings (embedding) VALUES (?)", (vec,))
-        rowid = cursor.lastrowid
-        kb.conn.execute(
-            "INSERT INTO embedding_map (vec_rowid, source_table, source_id, text_hash, embedded_at) "
-            "VALUES (?, 'entities', ?, ?, ?)",
-            (rowid, entity_id, text_h, now)
-        )
-    kb.conn.commit()
+    _queue_embedding(kb, 'entities', entity_id, text)
     return True
 
 
@@ -72,44 +71,194 @@ def embed_claim(kb, claim_id):
     if not claim:
         return False
     text = claim['claim_text'][:1000]
+    _queue_embedding(kb, 'claims', str(claim_id), text)
+    return True
+
+
+def _serialize(embedding, backend=None):
+    """Pack one embedding as float32 bytes, or as int8 for the vec0_int8
+    backend. Embeddings are unit-normalized, so every component fits a fixed
+    [-1, 1] -> [-127, 127] scale and cosine distance needs no per-vector one."""
+    if backend == 'vec0_int8':
+        if hasattr(embedding, 'astype'):
+            return (embedding * 127).round().clip(-127, 127).astype('int8').tobytes()
+        return bytes(max(-127, min(127, round(x * 127))) & 0xFF for x in embedding)
+    if hasattr(embedding, 'astype'):
+        return embedding.astype('float32').tobytes()
+    import struct
+    return struct.pack(f'{len(embedding)}f', *embedding)
+
+
+def _embed_pending(kb, source_table, items, batch_size, encode):
+    """Embed (source_id, text) items whose text changed since last embed.
+    Passes batch_size texts per encode() call and writes each batch in one
+    transaction. Returns how many items are now embedded."""
+    # Only picks what to encode; each write re-checks the map inside its
+    # own transaction, so a concurrent embed_all can't make a source
+    # look new twice
+    existing = {
+        row['source_id']: row['text_hash']
+        for row in kb._reader().execute(
+            "SELECT source_id, text_hash FROM embedding_map WHERE source_table = ?",
+            (source_table,)
+        )
+    }
+    pending = []
+    for source_id, text in items:
+        text_h = _text_hash(text)
+        if existing.get(source_id) != text_h:
+            pending.append((source_id, text, text_h))
+    if not pending:
+        return len(items)
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        embeddings = encode([b[1] for b in batch])
+        _write_embeddings(kb, source_table, [
+            (source_id, text_h, _serialize(emb, kb._vec_backend))
+            for (source_id, _, text_h), emb in zip(batch, embeddings)
+        ])
+    return len(items)
+
+
+def _write_embeddings(kb, source_table, rows):
+    """Write (source_id, text_hash, vector_bytes) rows in one transaction."""
+    with kb.bulk():
+        _write_embedding_rows(kb.conn, kb._vec_backend, kb._now(), source_table, rows)
+
+
+def _write_embedding_rows(conn, backend, now, source_table, rows):
+    """_write_embeddings' statements, inside a transaction the caller owns.
+    Existing vectors are looked up here, under that transaction: a source
+    already stored with the same hash is skipped, a changed one is deleted
+    and re-inserted under the same rowid, which works on both vec0 and
+    vectorlite (HNSW) tables."""
+    existing = {
+        row['source_id']: (row['vec_rowid'], row['text_hash'])
+        for row in conn.execute(
+            "SELECT source_id, vec_rowid, text_hash FROM embedding_map "
+            "WHERE source_table = ? AND source_id IN (SELECT value FROM json_each(?))",
+            (source_table, dumps([r[0] for r in rows]))
+        )
+    }
+    next_rowid = conn.execute(
+        "SELECT COALESCE(MAX(vec_rowid), 0) + 1 FROM embedding_map"
+    ).fetchone()[0]
+    vec_deletes, map_updates, vec_inserts, map_inserts = [], [], [], []
+    for source_id, text_h, vec in rows:
+        prev = existing.get(source_id)
+        if prev is None:
+            vec_inserts.append((next_rowid, vec))
+            map_inserts.append((next_rowid, source_table, source_id, text_h, now))
+            next_rowid += 1
+        elif prev[1] != text_h:
+            vec_deletes.append((prev[0],))
+            vec_inserts.append((prev[0], vec))
+            map_updates.append((text_h, now, prev[0]))
+    conn.executemany("DELETE FROM vec_embeddings WHERE rowid = ?", vec_deletes)
+    conn.executemany(
+        "UPDATE embedding_map SET text_hash = ?, embedded_at = ? WHERE vec_rowid = ?", map_updates)
+    conn.executemany(_SQL_VEC_INSERT[backend == 'vec0_int8'], vec_inserts)
+    conn.executemany(
+        "INSERT INTO embedding_map (vec_rowid, source_table, source_id, text_hash, embedded_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        map_inserts
+    )
+
+
+def _queue_embedding(kb, source_table, source_id, text):
+    """Write-behind for single embeds: encode now, buffer the vector, and
+    write buffered vectors in one transaction once _VEC_FLUSH_SIZE are
+    pending (or on flush_embeddings(), search, embed_all and close(); a KB
+    dropped without close() writes them from its finalizer).
+    A source queued twice keeps only its latest vector."""
     text_h = _text_hash(text)
-    claim_id_str = str(claim_id)
-
-    existing = kb.conn.execute(
-        "SELECT vec_rowid, text_hash FROM embedding_map WHERE source_table = 'claims' AND source_id = ?",
-        (claim_id_str,)
-    ).fetchone()
-    if existing and existing['text_hash'] == text_h:
-        return True
-
-    vec = _embed_text(kb, text)
-    now = kb._now()
-
-    if existing:
-        kb.conn.execute("UPDATE vec_embeddings SET embedding = ? WHERE rowid = ?",
-                          (vec, existing['vec_rowid']))
-        kb.conn.execute("UPDATE embedding_map SET text_hash = ?, embedded_at = ? WHERE vec_rowid = ?",
-                          (text_h, now, existing['vec_rowid']))
+    key = (source_table, source_id)
+    with kb._write_lock:
+        queued = kb._vec_buffer.get(key)
+    if queued is not None:
+        if queued[0] == text_h:
+            return
     else:
-        cursor = kb.conn.execute("INSERT INTO vec_embeddings (embedding) VALUES (?)", (vec,))
-        rowid = cursor.lastrowid
-        kb.conn.execute(
-            "INSERT INTO embedding_map (vec_rowid, source_table, source_id, text_hash, embedded_at) "
-            "VALUES (?, 'claims', ?, ?, ?)",
-            (rowid, claim_id_str, text_h, now)
-        )
-    kb.conn.commit()
-    return True
+        row = kb._reader().execute(
+            "SELECT text_hash FROM embedding_map WHERE source_table = ? AND source_id = ?", key
+        ).fetchone()
+        if row is not None and row['text_hash'] == text_h:
+            return
+    emb = _get_embedding_model(kb).encode(text, normalize_embeddings=True)
+    # The buffer is shared by every thread using this KB; it changes only
+    # under the write lock, so a flush can't drop an entry queued mid-write
+    with kb._write_lock:
+        kb._vec_buffer[key] = (text_h, _serialize(emb, kb._vec_backend))
+        if len(kb._vec_buffer) >= _VEC_FLUSH_SIZE:
+            flush_embeddings(kb)
+
+
+def flush_embeddings(kb):
+    """Write all buffered single embeds. Returns how many were written."""
+    if not kb._vec_buffer:
+        return 0
+    # bulk() holds the write lock, so nothing is queued between the write
+    # and the clear
+    with kb.bulk():
+        if not kb._vec_buffer:
+            return 0
+        count = _write_buffer(kb.conn, kb._vec_backend, kb._now(), kb._vec_buffer)
+        kb._vec_buffer.clear()
+    return count
+
 
+def _write_buffer(conn, backend, now, buffer):
+    """Write a {(source_table, source_id): (text_hash, vector)} buffer inside
+    a transaction the caller owns. Takes no kb, so the finalizer of a KB
+    that was never closed can still write what it buffered."""
+    by_table = {}
+    for (source_table, source_id), (text_h, vec) in buffer.items():
+        by_table.setdefault(source_table, []).append((source_id, text_h, vec))
+    for source_table, rows in by_table.items():
+        _write_embedding_rows(conn, backend, now, source_table, rows)
+    return len(buffer)
 
-def embed_all(kb):
-    """Embed all entities and claims. Returns counts."""
+
+def embed_all(kb, batch_size=64, workers=1):
+    """Embed all entities and claims, batch_size texts per model call.
+    Unchanged texts (same hash) are skipped. With workers > 1, encoding
+    is spread over a sentence-transformers multi-process pool (CPU), each
+    worker taking batch_size texts per round. Returns counts."""
     if not kb._vec_available:
         return {'error': 'sqlite-vec not available', 'entities': 0, 'claims': 0}
-    entities = kb.conn.execute("SELECT id FROM entities").fetchall()
-    claims = kb.conn.execute("SELECT id FROM claims WHERE is_atomic = 0").fetchall()
-    e_count = sum(1 for e in entities if embed_entity(kb, e['id']))
-    c_count = sum(1 for c in claims if embed_claim(kb, c['id']))
+    flush_embeddings(kb)
+    db = kb._reader()
+    entities = [
+        (row['id'], f"{row['title']}. {row['content'] or ''}"[:2000])
+        for row in db.execute("SELECT id, title, content FROM entities")
+    ]
+    claims = [
+        (str(row['id']), row['claim_text'][:1000])
+        for row in db.execute("SELECT id, claim_text FROM claims WHERE is_atomic = 0")
+    ]
+    # Model and worker pool load on first use — nothing pending, no cost
+    pool = None
+
+    def encode(texts):
+        nonlocal pool
+        model = _get_embedding_model(kb)
+        if workers <= 1:
+            return model.encode(texts, batch_size=batch_size,
+                                normalize_embeddings=True, convert_to_numpy=True)
+        if pool is None:
+            pool = model.start_multi_process_pool(target_devices=['cpu'] * workers)
+        return model.encode_multi_process(texts, pool, batch_size=batch_size,
+                                          normalize_embeddings=True)
+
+    # One round = one batch per worker; each round's writes commit together
+    per_round = batch_size * max(1, workers)
+    try:
+        e_count = _embed_pending(kb, 'entities', entities, per_round, encode)
+        c_count = _embed_pending(kb, 'claims', claims, per_round, encode)
+    finally:
+        if pool is not None:
+            _get_embedding_model(kb).stop_multi_process_pool(pool)
     return {'entities': e_count, 'claims': c_count}
 
 
@@ -119,15 +268,17 @@ def semantic_search(kb, query, limit=10, source_table=None):
         return [{'id': e['id'], 'title': e['title'], 'score': 1.0, 'source': 'entities', 'method': 'fts5_fallback'}
                 for e in kb.search_entities(query)[:limit]]
 
+    flush_embeddings(kb)
     vec = _embed_text(kb, query)
-    rows = kb.conn.execute(
-        "SELECT rowid, distance FROM vec_embeddings WHERE embedding MATCH ? ORDER BY distance LIMIT ?",
-        (vec, limit * 2)
-    ).fetchall()
+    # Only the KNN query needs the vector extension, which is loaded on the
+    # writer alone; a hit from another thread's uncommitted write has no
+    # committed mapping on the reader and is skipped below
+    rows = kb.conn.execute(_SQL_KNN[kb._vec_backend], (vec, limit * 2)).fetchall()
 
+    db = kb._reader()
     results = []
     for row in rows:
-        mapping = kb.conn.execute(
+        mapping = db.execute(
             "SELECT source_table, source_id FROM embedding_map WHERE vec_rowid = ?",
             (row['rowid'],)
         ).fetchone()
@@ -143,10 +294,10 @@ def semantic_search(kb, query, limit=10, source_table=None):
             'method': 'vector'
         }
         if mapping['source_table'] == 'entities':
-            entity = kb.get_entity(mapping['source_id'])
+            entity = db.execute(_SQL_ENTITY_PREVIEW, (mapping['source_id'],)).fetchone()
             if entity:
                 result.update({'id': entity['id'], 'title': entity['title'],
-                               'content': entity['content'][:200] if entity.get('content') else ''})
+                               'content': entity['content'] or ''})
         elif mapping['source_table'] == 'claims':
             claim = kb.get_claim(int(mapping['source_id']))
             if claim:
@@ -162,6 +313,8 @@ def hybrid_search(kb, query, limit=10, source_table=None):
     """Reciprocal Rank Fusion of FTS5 keyword search + vector similarity search."""
     k = 60
 
+    db = kb._reader()
+
     # FTS5 keyword results
     fts_results = {}
     if source_table in (None, 'entities'):
@@ -169,8 +322,8 @@ def hybrid_search(kb, query, limit=10, source_table=None):
             fts_results[('entities', entity['id'])] = rank + 1
     if source_table in (None, 'claims'):
         try:
-            rows = kb.conn.execute(
-                "SELECT claim_id, rank FROM claims_fts WHERE claims_fts MATCH ? ORDER BY rank LIMIT ?",
+            rows = db.execute(
+                "SELECT rowid AS claim_id, rank FROM claims_fts WHERE claims_fts MATCH ? ORDER BY rank LIMIT ?",
                 (query, limit * 2)
             ).fetchall()
             for rank, row in enumerate(rows):
@@ -199,10 +352,10 @@ def hybrid_search(kb, query, limit=10, source_table=None):
     for (src_table, src_id), rrf_score in scored[:limit]:
         result = {'source': src_table, 'rrf_score': round(rrf_score, 6), 'method': 'hybrid'}
         if src_table == 'entities':
-            entity = kb.get_entity(src_id)
+            entity = db.execute(_SQL_ENTITY_PREVIEW, (src_id,)).fetchone()
             if entity:
                 result.update({'id': entity['id'], 'title': entity['title'],
-                               'content': entity['content'][:200] if entity.get('content') else ''})
+                               'content': entity['content'] or ''})
         elif src_table == 'claims':
             claim = kb.get_claim(int(src_id))
             if claim:
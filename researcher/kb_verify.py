@@ -1,10 +1,11 @@
 """Claim verification functions extracted from KnowledgeBase."""
 
-import json
 import re
 import random
 from datetime import datetime
 
+from researcher._util import dumps, load_meta
+
 
 def verify_claim(kb, claim_id, search_fn=None):
     """SAFE-style search-augmented claim verification."""
@@ -13,7 +14,7 @@ def verify_claim(kb, claim_id, search_fn=None):
         return {"error": "claim not found"}
 
     # Step 1: Get atomic facts (decompose if needed)
-    atoms = kb.get_atomic_claims(claim_id)
+    atoms = kb.get_atomic_claims(claim_id, parse_metadata=False)
     if not atoms:
         atoms = [claim]  # treat as single atomic fact
 
@@ -24,10 +25,10 @@ def verify_claim(kb, claim_id, search_fn=None):
         evidence = {'supporting': [], 'contradicting': [], 'neutral': []}
 
         # Search KB first (FTS5)
-        kb_hits = kb.conn.execute("""
+        kb_hits = kb._reader().execute("""
             SELECT c.id, c.claim_text, c.confidence, c.evidence_grade
             FROM claims_fts f
-            JOIN claims c ON CAST(f.claim_id AS INTEGER) = c.id
+            JOIN claims c ON c.id = f.rowid
             WHERE claims_fts MATCH ? AND c.id != ?
             LIMIT 10
         """, (_fts_safe(atom_text), atom.get('id', claim_id))).fetchall()
@@ -100,26 +101,26 @@ def verify_claim(kb, claim_id, search_fn=None):
         verified_count = 0
 
     # Update claim with verification metadata
-    meta = claim.get('metadata', {})
-    meta['verification'] = {
+    verification = {
         'avg_score': round(avg_score, 3),
         'min_score': round(min_score, 3),
         'verified_atoms': verified_count,
         'total_atoms': len(results),
         'method': 'safe_search' if search_fn else 'kb_only'
     }
-    now = kb._now()
-    kb.conn.execute(
-        "UPDATE claims SET metadata = ?, updated_at = ? WHERE id = ?",
-        (json.dumps(meta), now, claim_id)
-    )
-
     factuality = round(avg_score * 0.6 + min_score * 0.4, 3)
-    kb.conn.execute(
-        "UPDATE claims SET confidence = ?, updated_at = ? WHERE id = ?",
-        (factuality, now, claim_id)
-    )
-    kb.conn.commit()
+    with kb.bulk():
+        meta = _current_meta(kb, claim_id)
+        meta['verification'] = verification
+        now = kb._now()
+        kb.conn.execute(
+            "UPDATE claims SET metadata = ?, updated_at = ? WHERE id = ?",
+            (dumps(meta), now, claim_id)
+        )
+        kb.conn.execute(
+            "UPDATE claims SET confidence = ?, updated_at = ? WHERE id = ?",
+            (factuality, now, claim_id)
+        )
 
     return {
         'claim_id': claim_id,
@@ -134,6 +135,14 @@ def verify_claim(kb, claim_id, search_fn=None):
     }
 
 
+def _current_meta(kb, claim_id):
+    """A claim's metadata as stored now. Called inside the bulk() that
+    writes it back, so keys other writers added since the claim was
+    first read are kept."""
+    row = kb.conn.execute("SELECT metadata FROM claims WHERE id = ?", (claim_id,)).fetchone()
+    return load_meta(row['metadata']) if row else {}
+
+
 def _fts_safe(text):
     """Make text safe for FTS5 MATCH queries by extracting key terms."""
     words = re.findall(r'\b[a-zA-Z]{3,}\b', text)
@@ -149,17 +158,23 @@ def grade_claim_sc(kb, claim_id, n_samples=5):
     if not claim:
         return {"error": "claim not found"}
 
-    sources = claim.get('sources', [])
-    supporting = [s for s in sources if s.get('relationship', 'supports') in ('supports', 'confirms')]
-    contradicting = [s for s in sources if s.get('relationship') in ('contradicts', 'refutes')]
+    # Tally the sources once; only the noise differs between samples
+    n_sup = n_con = 0
+    sum_sup = 0.0
+    for s in claim.get('sources', []):
+        rel = s.get('relationship', 'supports')
+        if rel in ('supports', 'confirms'):
+            n_sup += 1
+            sum_sup += s.get('credibility', 0.5)
+        elif rel in ('contradicts', 'refutes'):
+            n_con += 1
+    avg_cred = sum_sup / n_sup if n_sup else 0.0
 
     grades = []
     confidences = []
 
     for i in range(n_samples):
         noise = random.gauss(0, 0.08)
-        n_sup = len(supporting)
-        n_con = len(contradicting)
 
         if n_con > 0 and n_sup > 0:
             grade = 'contested'
@@ -168,7 +183,6 @@ def grade_claim_sc(kb, claim_id, n_samples=5):
             grade = 'ungraded'
             conf = 0.3 + noise
         else:
-            avg_cred = sum(s.get('credibility', 0.5) for s in supporting) / n_sup
             avg_cred_p = max(0, min(1, avg_cred + random.gauss(0, 0.06)))
             n_sup_eff = max(1, n_sup + random.choice([-1, 0, 0, 0, 1]))
 
@@ -196,29 +210,29 @@ def grade_claim_sc(kb, claim_id, n_samples=5):
 
     final_confidence = round(avg_confidence * (0.8 + 0.2 * agreement), 3)
 
-    now = kb._now()
-    kb.conn.execute(
-        "UPDATE claims SET evidence_grade = ?, confidence = ?, updated_at = ? WHERE id = ?",
-        (majority_grade, final_confidence, now, claim_id)
-    )
-
-    meta = claim.get('metadata', {})
-    meta['self_consistency'] = {
+    self_consistency = {
         'n_samples': n_samples,
         'grade_distribution': dict(grade_counts),
         'agreement': round(agreement, 3),
         'confidence_range': [round(min(confidences), 3), round(max(confidences), 3)]
     }
-    kb.conn.execute(
-        "UPDATE claims SET metadata = ? WHERE id = ?",
-        (json.dumps(meta), claim_id)
-    )
-    kb.conn.commit()
-
-    # Re-grade composite parent if applicable
-    row = kb.conn.execute("SELECT parent_claim_id FROM claims WHERE id = ?", (claim_id,)).fetchone()
-    if row and row['parent_claim_id']:
-        kb._grade_composite_claim(row['parent_claim_id'])
+    # Grade, metadata and the composite parent's rollup commit together
+    with kb.bulk():
+        meta = _current_meta(kb, claim_id)
+        meta['self_consistency'] = self_consistency
+        kb.conn.execute(
+            "UPDATE claims SET evidence_grade = ?, confidence = ?, updated_at = ? WHERE id = ?",
+            (majority_grade, final_confidence, kb._now(), claim_id)
+        )
+        kb.conn.execute(
+            "UPDATE claims SET metadata = ? WHERE id = ?",
+            (dumps(meta), claim_id)
+        )
+
+        # Re-grade composite parent if applicable
+        row = kb.conn.execute("SELECT parent_claim_id FROM claims WHERE id = ?", (claim_id,)).fetchone()
+        if row and row['parent_claim_id']:
+            kb._grade_composite_claim(row['parent_claim_id'])
 
     return {
         'claim_id': claim_id,